@@ -29,9 +29,11 @@ class RobotAlertCreateAPIView(generics.CreateAPIView):
 
 class RobotAlertListAPIView(generics.ListAPIView):
     """
-    Lista alertas do sistema, podendo filtrar por `created_at` com ?since=timestamp
+    Lista alertas do sistema, podendo filtrar por `created_at` com ?since=timestamp.
+    Paginado por cursor, do mais recente para o mais antigo.
     """
     serializer_class = RobotAlertSerializer
+    keyset_ordering = ("-created_at", "-id")
 
     def get_queryset(self):
         queryset = RobotAlert.objects.all().order_by("-created_at")
@@ -0,0 +1,61 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+
+
+def get_data_version(querysets):
+    """
+    Calcula a versão dos dados de uma lista de querysets.
+
+    A versão de cada queryset é `(COUNT(*), MAX(updated_at))`: muda quando
+    uma linha é criada, alterada, removida ou sai do filtro.
+
+    Retorna:
+    Tuple[List[tuple], datetime]: Versões e a última alteração entre elas.
+    """
+    versions = []
+    last_modified = None
+    for queryset in querysets:
+        version = queryset.order_by().aggregate(
+            count=Count('pk'), last=Max('updated_at')
+        )
+        versions.append((version['count'], version['last']))
+        if version['last'] and (last_modified is None or version['last'] > last_modified):
+            last_modified = version['last']
+    return versions, last_modified
+
+
+def versioned_get(get_querysets):
+    """
+    Decorador de ações GET que responde `304 Not Modified` quando os dados
+    não mudaram desde a última chamada do cliente.
+
+    `get_querysets(request, *args, **kwargs)` retorna os querysets dos quais a
+    resposta depende. A versão é calculada uma única vez por requisição e
+    exposta nos cabeçalhos `ETag` e `Last-Modified`; o ETag inclui a URL
+    completa, pois a resposta varia com os parâmetros (etapa, cursor, ...).
+    """
+    def get_version(request, *args, **kwargs):
+        if not hasattr(request, '_data_version'):
+            request._data_version = get_data_version(
+                get_querysets(request, *args, **kwargs)
+            )
+        return request._data_version
+
+    def etag(request, *args, **kwargs):
+        versions, _ = get_version(request, *args, **kwargs)
+        raw = '|'.join(
+            [request.get_full_path()]
+            + [f'{count}:{last.isoformat() if last else ""}' for count, last in versions]
+        )
+        return hashlib.md5(raw.encode()).hexdigest()
+
+    def last_modified(request, *args, **kwargs):
+        _, last = get_version(request, *args, **kwargs)
+        return last
+
+    return method_decorator(
+        condition(etag_func=etag, last_modified_func=last_modified)
+    )
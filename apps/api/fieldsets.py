@@ -0,0 +1,152 @@
+from drf_yasg import openapi
+from rest_framework.exceptions import ValidationError
+
+# Parâmetros de seleção de campos, para os `manual_parameters` do swagger
+SPARSE_FIELDS_PARAMETERS = [
+    openapi.Parameter(
+        'fields',
+        openapi.IN_QUERY,
+        type=openapi.TYPE_STRING,
+        required=False,
+        description=(
+            'Campos a retornar, separados por vírgula (ex.: `id,status`). '
+            'Campos de relações usam ponto (ex.: `items.id,items.status`). '
+            'O `id` sempre é retornado.'
+        ),
+    ),
+    openapi.Parameter(
+        'expand',
+        openapi.IN_QUERY,
+        type=openapi.TYPE_STRING,
+        required=False,
+        description='Relações a incluir com todos os campos (ex.: `items`).',
+    ),
+    openapi.Parameter(
+        'exclude',
+        openapi.IN_QUERY,
+        type=openapi.TYPE_STRING,
+        required=False,
+        description=(
+            'Campos ou relações a omitir, separados por vírgula '
+            '(ex.: `items.image_result,items.shift_result`).'
+        ),
+    ),
+]
+
+
+def parse_field_list(value):
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+
+def get_sparse_fields(request, fields, expandable=None):
+    """
+    Lê a seleção de campos de `?fields=`, `?expand=` e `?exclude=`.
+
+    Sem `fields`, a resposta tem todos os campos e as relações incluídas por
+    padrão. Com `fields`, só os campos listados; uma relação entra se for
+    listada (`items`), se algum campo dela for listado (`items.status`) ou
+    se vier em `expand`. `exclude` é aplicado por último.
+
+    Parâmetros:
+    - fields (List[str]): Campos do recurso, na ordem da resposta.
+    - expandable (Dict[str, Tuple[List[str], bool]], opcional): Para cada
+      relação aninhada, seus campos e se ela é incluída por padrão.
+
+    Retorna:
+    Tuple[List[str], Dict[str, List[str]]]: Campos escolhidos e, para cada
+    relação incluída, os campos dela.
+
+    Lança:
+    ValidationError: Se algum nome não existir.
+    """
+    expandable = expandable or {}
+    requested = parse_field_list(request.query_params.get('fields'))
+    errors = []
+
+    def split(name):
+        relation, _, field = name.partition('.')
+        if field:
+            if relation not in expandable or field not in expandable[relation][0]:
+                errors.append(name)
+                return None, None
+            return relation, field
+        if name not in fields and name not in expandable:
+            errors.append(name)
+            return None, None
+        return name, None
+
+    if requested:
+        selected = {'id'}
+        nested = {}
+        for name in requested:
+            relation, field = split(name)
+            if relation in expandable:
+                if field is None:
+                    nested[relation] = set(expandable[relation][0])
+                else:
+                    nested.setdefault(relation, set()).add(field)
+            elif relation:
+                selected.add(relation)
+    else:
+        selected = set(fields)
+        nested = {
+            relation: set(relation_fields)
+            for relation, (relation_fields, default) in expandable.items()
+            if default
+        }
+
+    for name in parse_field_list(request.query_params.get('expand')):
+        if name not in expandable:
+            errors.append(name)
+        elif name not in nested:
+            nested[name] = set(expandable[name][0])
+
+    for name in parse_field_list(request.query_params.get('exclude')):
+        relation, field = split(name)
+        if relation in expandable:
+            if field is None:
+                nested.pop(relation, None)
+            elif relation in nested:
+                nested[relation].discard(field)
+        elif relation and relation != 'id':
+            selected.discard(relation)
+
+    if errors:
+        raise ValidationError({
+            'fields': [f'Campo inválido: {name}.' for name in errors],
+        })
+
+    return (
+        [name for name in fields if name in selected],
+        {
+            relation: [
+                name for name in expandable[relation][0]
+                if name in relation_fields or name == 'id'
+            ]
+            for relation, relation_fields in nested.items()
+        },
+    )
+
+
+def get_only_fields(model, fields, required=()):
+    """
+    Colunas para `.only()` a partir dos campos da resposta: apenas os campos
+    concretos do modelo, mais os `required` (chaves de paginação, FKs de
+    `select_related`, ...).
+    """
+    concrete = {field.name for field in model._meta.concrete_fields}
+    return list(dict.fromkeys(
+        [name for name in fields if name in concrete] + list(required)
+    ))
+
+
+class SparseFieldsMixin:
+    """
+    Serializer que aceita `fields=[...]` e mantém apenas esses campos.
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
@@ -0,0 +1,174 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginação por cursor (keyset) sobre colunas indexadas.
+
+    Ao contrário da paginação por OFFSET, a página seguinte é obtida com
+    `WHERE (created_at, id) > (cursor)`, então o custo de cada página não
+    cresce com a profundidade da navegação. O cursor é opaco para o
+    cliente (base64 dos valores da última linha da página).
+
+    É a paginação padrão da API. A ordenação pode ser trocada por view com
+    o atributo `keyset_ordering`, desde que termine em uma coluna única;
+    modelos sem `created_at` são ordenados pelo `id`.
+    Ações customizadas (`@action`) não são paginadas automaticamente e
+    precisam instanciar o paginador explicitamente.
+    """
+
+    ordering = ('created_at', 'id')
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = settings.API_MAX_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Cursor inválido.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Retorna a lista de objetos da página atual.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(view, queryset)
+
+        cursor = self.decode_cursor(request)
+        queryset = queryset.order_by(*self.ordering)
+        if cursor is not None:
+            try:
+                queryset = queryset.filter(self.get_cursor_filter(cursor))
+            except (ValueError, DjangoValidationError):
+                raise NotFound(self.invalid_cursor_message)
+
+        page = list(queryset[:self.page_size + 1])
+        self.has_next = len(page) > self.page_size
+        self.page = page[:self.page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                    'format': 'uri',
+                },
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        """
+        Obtém o tamanho da página da query string, limitado a `max_page_size`.
+        """
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_ordering(self, view, queryset=None):
+        """
+        Ordenação da view (`keyset_ordering`) ou a padrão; modelos sem
+        `created_at` são ordenados apenas pelo `id`.
+        """
+        ordering = getattr(view, 'keyset_ordering', None)
+        if ordering is not None:
+            return tuple(ordering)
+        if queryset is None:
+            queryset = getattr(view, 'queryset', None)
+        model = getattr(queryset, 'model', None)
+        if model is not None:
+            try:
+                model._meta.get_field('created_at')
+            except FieldDoesNotExist:
+                return ('id',)
+        return self.ordering
+
+    def get_ordering_fields(self, view):
+        """
+        Campos da ordenação (sem o `-`), que as linhas paginadas precisam ter.
+        """
+        return tuple(field.lstrip('-') for field in self.get_ordering(view))
+
+    def get_cursor_filter(self, cursor):
+        """
+        Monta o filtro `(a, b, ...) > (x, y, ...)` respeitando a direção de
+        cada campo da ordenação.
+        """
+        condition = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, cursor):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def get_next_cursor(self):
+        """
+        Retorna o cursor da próxima página ou None se esta for a última.
+        """
+        if not self.has_next or not self.page:
+            return None
+        last = self.page[-1]
+        values = [
+            self._cursor_value(
+                last[field.lstrip('-')]
+                if isinstance(last, dict)
+                else getattr(last, field.lstrip('-'))
+            )
+            for field in self.ordering
+        ]
+        return self.encode_cursor(values)
+
+    def get_next_link(self):
+        cursor = self.get_next_cursor()
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    @staticmethod
+    def encode_cursor(values):
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    @staticmethod
+    def _cursor_value(value):
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        if hasattr(value, 'pk'):
+            return value.pk
+        return value if isinstance(value, (int, float)) else str(value)
@@ -1,4 +1,10 @@
-from rest_framework.test import APIRequestFactory
+import json
+from datetime import date, timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory
 from rest_framework.authtoken.models import Token
 from django.contrib.auth.models import User
 from apps.robots.models import Robot
@@ -6,7 +12,10 @@ from apps.processes.models import Process
 from apps.tasks.models import Task
 from apps.items.models import Item
 from apps.values.models import ShiftData
-from apps.utils.choices import StatusRobot
+from apps.utils.choices import Status, StatusRobot
+from apps.items.serializer import ItemSerializer, ItemValuesSerializer
+from apps.tasks.serializer import TaskSerializer, TaskValuesSerializer
+from apps.values.serializer import ShiftDataSerializer, ShiftDataValuesSerializer
 
 # Create your tests here.
 
@@ -23,5 +32,58 @@ def setUp_Test_Case(self):
                                       status=StatusRobot.ACTIVE)
     self.task = Task.objects.create(
         user_id=self.user, process_id=self.process, robot_id=self.robot)
-    self.item = Item.objects.create(task_id=self.task)
-    self.value = ShiftData.objects.create(item_id=self.item, value_number=10)
+    self.item = Item.objects.create(task_id=self.task, robot_id=self.robot, os_number='1')
+    self.value = ShiftData.objects.create(
+        task=self.task, item=self.item, os_number='1')
+    self.client = APIClient()
+    self.client.force_authenticate(self.user)
+
+
+class ValuesSerializerTestCase(TestCase):
+    """
+    Test case for the `.values()` serializers: same output as the
+    ModelSerializers they replace on the read paths.
+    """
+
+    def setUp(self):
+        setUp_Test_Case(self)
+        now = timezone.now()
+        Item.objects.filter(id=self.item.id).update(
+            started_at=now - timedelta(seconds=1, microseconds=5), ended_at=now,
+            status=Status.COMPLETED, bot_error_message='erro', is_authorized=True,
+        )
+        ShiftData.objects.filter(id=self.value.id).update(
+            recipiente='R1', idade_paciente=40, data_nascimento=date(1984, 5, 6),
+            data_coleta=now,
+        )
+        Item.objects.create(task_id=self.task, robot_id=self.robot, os_number='2', os_name='Nome')
+        Task.objects.create(user_id=self.user, process_id=self.process)
+
+    def render(self, data):
+        return json.loads(JSONRenderer().render(data))
+
+    def test_items(self):
+        items = Item.objects.order_by('id')
+        expected = ItemSerializer(items.prefetch_related('shift_data'), many=True).data
+        self.assertEqual(self.render(ItemValuesSerializer.serialize(items)), self.render(expected))
+
+        fields = ['id', 'status', 'shift_data']
+        expected = ItemSerializer(items.prefetch_related('shift_data'), many=True, fields=fields).data
+        self.assertEqual(
+            self.render(ItemValuesSerializer.serialize(items, fields)), self.render(expected)
+        )
+
+    def test_tasks_with_items(self):
+        tasks = Task.objects.order_by('id')
+        expected = self.render(TaskSerializer(tasks, many=True).data)
+        for task in expected:
+            task['items'].sort(key=lambda item: item['id'])
+        rows = TaskValuesSerializer.get_values(tasks)
+        self.assertEqual(self.render(TaskValuesSerializer.serialize_rows(rows)), expected)
+
+    def test_shift_data(self):
+        shift_data = ShiftData.objects.order_by('id')
+        self.assertEqual(
+            self.render(ShiftDataValuesSerializer.serialize(shift_data)),
+            self.render(ShiftDataSerializer(shift_data, many=True).data),
+        )
@@ -66,6 +66,6 @@ def token_login(function):
     def wrapper(self, request):
         user = request.user
         user.last_login = timezone.now()
-        user.save()
+        user.save(update_fields=['last_login'])
         return function(self, request)
     return wrapper
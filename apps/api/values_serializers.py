@@ -0,0 +1,94 @@
+from django.db import models
+from django.utils import timezone
+
+
+def datetime_to_representation(value):
+    """
+    Formata um datetime como o `serializers.DateTimeField` do DRF: ISO 8601
+    no fuso atual, com `Z` no lugar de `+00:00`.
+    """
+    if value is None:
+        return None
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def date_to_representation(value):
+    return value.isoformat() if value is not None else None
+
+
+def identity(value):
+    return value
+
+
+class ValuesSerializer:
+    """
+    Serializador somente leitura a partir de linhas de `.values()`.
+
+    Produz os mesmos dicionários que o ModelSerializer equivalente, mas sem
+    instanciar modelos nem objetos de campo por linha. Deve ser usado apenas
+    em caminhos de leitura quentes; validação e escrita continuam com os
+    serializers do DRF.
+
+    Os métodos aceitam `fields` para serializar só parte dos campos (ver
+    `apps.api.fieldsets.get_sparse_fields`); None significa todos.
+    """
+
+    model = None
+    fields = ()
+
+    @classmethod
+    def get_formatters(cls, fields=None):
+        if '_formatters' not in cls.__dict__:
+            formatters = []
+            for name in cls.fields:
+                field = cls.model._meta.get_field(name)
+                if isinstance(field, models.DateTimeField):
+                    formatter = datetime_to_representation
+                elif isinstance(field, models.DateField):
+                    formatter = date_to_representation
+                else:
+                    formatter = identity
+                formatters.append((name, formatter))
+            cls._formatters = formatters
+        if fields is None:
+            return cls._formatters
+        return [(name, formatter) for name, formatter in cls._formatters if name in fields]
+
+    @classmethod
+    def to_representation(cls, row, formatters=None):
+        if formatters is None:
+            formatters = cls.get_formatters()
+        return {name: formatter(row[name]) for name, formatter in formatters}
+
+    @classmethod
+    def get_value_names(cls, fields=None):
+        """
+        Colunas lidas por `.values()` para os campos informados.
+        """
+        if fields is None:
+            return list(cls.fields)
+        return [name for name in cls.fields if name in fields]
+
+    @classmethod
+    def get_values(cls, queryset, fields=None):
+        return queryset.values(*cls.get_value_names(fields))
+
+    @classmethod
+    def serialize_rows(cls, rows, fields=None):
+        """
+        Retorna a lista de dicionários de linhas já lidas com `get_values`.
+        """
+        formatters = cls.get_formatters(fields)
+        return [cls.to_representation(row, formatters) for row in rows]
+
+    @classmethod
+    def serialize(cls, queryset, fields=None):
+        """
+        Retorna a lista de dicionários de todas as linhas do queryset.
+        """
+        return cls.serialize_rows(cls.get_values(queryset, fields), fields)
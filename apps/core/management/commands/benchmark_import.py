@@ -0,0 +1,133 @@
+import csv
+import os
+import tempfile
+import time
+import tracemalloc
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import UploadedFile
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+
+from apps.items.models import Item
+from apps.processes.models import Process
+from apps.robots.models import Robot
+from apps.tasks.utils import read_file
+from apps.utils.choices import StatusRobot
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede tempo e pico de memória da importação de CSV de tarefas "
+        "(`read_file`) para arquivos de tamanhos diferentes, com cada backend "
+        "de importação (bulk_create e COPY), comparando com a leitura do "
+        "arquivo inteiro em memória. Os dados criados são desfeitos ao final. "
+        "Com medição de memória, os tempos incluem o custo do tracemalloc."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+',
+                            default=[10000, 100000, 1000000],
+                            help='Quantidades de linhas dos arquivos gerados.')
+        parser.add_argument('--skip-legacy', action='store_true',
+                            help='Não mede a leitura do arquivo inteiro em memória.')
+        parser.add_argument('--backends', nargs='+', default=['bulk_create', 'copy'],
+                            choices=['bulk_create', 'copy'],
+                            help='Backends de importação a medir.')
+        parser.add_argument('--no-memory', action='store_true',
+                            help='Mede só o tempo, sem tracemalloc.')
+
+    def handle(self, *args, **options):
+        # Com DEBUG ligado o Django guarda o SQL de toda query em
+        # `connection.queries`, o que cresce com o arquivo e mascara a medição
+        with override_settings(DEBUG=False):
+            self.run(options)
+
+    def run(self, options):
+        self.memory = not options['no_memory']
+        for rows in options['rows']:
+            path = self.write_csv(rows)
+            try:
+                size_mb = os.path.getsize(path) / 1024 / 1024
+                self.stdout.write(self.style.MIGRATE_HEADING(
+                    f'{rows} linhas ({size_mb:.1f} MB)'
+                ))
+                if not options['skip_legacy']:
+                    elapsed, peak = self.measure(self.legacy_parse, path)
+                    self.report('arquivo inteiro (só leitura)', elapsed, peak)
+                for backend in options['backends']:
+                    with override_settings(TASK_IMPORT_BACKEND=backend):
+                        elapsed, peak = self.measure(self.streaming_import, path, rows)
+                    self.report(f'read_file ({backend})', elapsed, peak)
+            finally:
+                os.remove(path)
+
+    def write_csv(self, rows):
+        """
+        Gera um CSV no formato exportado pelo sistema do laboratório.
+        """
+        with tempfile.NamedTemporaryFile(
+            'w', suffix='.csv', delete=False, newline='', encoding='utf-8'
+        ) as file:
+            writer = csv.writer(file)
+            writer.writerow(['O.S.', 'Data', 'Exame'])
+            for i in range(rows):
+                writer.writerow([f'{i} - PACIENTE JOSÉ {i};', '01/01/2024', 'MAMOGRAFIA'])
+        return file.name
+
+    def report(self, name, elapsed, peak):
+        line = f'{name:<30} {elapsed:>8.2f} s'
+        if peak is not None:
+            line += f'   pico: {peak:>8.1f} MB'
+        self.stdout.write(line)
+
+    def measure(self, func, *args):
+        if not self.memory:
+            start = time.perf_counter()
+            func(*args)
+            return time.perf_counter() - start, None
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            func(*args)
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return elapsed, peak / 1024 / 1024
+
+    def legacy_parse(self, path):
+        """
+        Leitura anterior: arquivo, texto e linhas inteiros em memória e todos
+        os itens montados antes de inserir (a inserção não é medida).
+        """
+        with open(path, 'rb') as file:
+            reader = csv.DictReader(file.read().decode('utf-8').splitlines())
+            items = [
+                Item(os_number=os_number.strip(), os_name=os_name.strip())
+                for os_number, os_name in (
+                    row['O.S.'].rstrip(';').split(' - ', 1) for row in reader
+                )
+            ]
+        return items
+
+    def streaming_import(self, path, rows):
+        with transaction.atomic():
+            user = User.objects.create_user(username='benchmark-user')
+            process = Process.objects.create(title='benchmark')
+            Robot.objects.create(
+                user_id=User.objects.create_user(username='benchmark-robot'),
+                ip_address='bench-0',
+                status=StatusRobot.ACTIVE,
+            )
+            with open(path, 'rb') as file:
+                read_file(UploadedFile(file, name='benchmark.csv'), user, process)
+
+            created = Item.objects.filter(task_id__user_id=user).count()
+            if created != rows:
+                self.stdout.write(self.style.ERROR(
+                    f'Esperados {rows} itens, criados {created}.'
+                ))
+            transaction.set_rollback(True)
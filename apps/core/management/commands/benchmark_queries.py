@@ -0,0 +1,172 @@
+import random
+import re
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.items.models import Item
+from apps.processes.models import Process
+from apps.robots.models import Robot
+from apps.robots.utils import get_robots_by_load
+from apps.tasks.models import Task
+from apps.utils.choices import Status, StatusRobot
+
+
+EXECUTION_TIME = re.compile(r'Execution Time: ([\d.]+) ms')
+
+
+class Command(BaseCommand):
+    help = (
+        "Popula o banco com um volume realista de tarefas e itens e mostra o "
+        "EXPLAIN ANALYZE das queries mais usadas da fila, sem e com os "
+        "índices de acesso. Tudo roda em uma transação desfeita ao final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=200000,
+                            help='Quantidade de itens a criar.')
+        parser.add_argument('--robots', type=int, default=10,
+                            help='Quantidade de robôs ativos a criar.')
+        parser.add_argument('--items-per-task', type=int, default=2000,
+                            help='Quantidade de itens por tarefa.')
+        parser.add_argument('--verbose-plan', action='store_true',
+                            help='Mostra o plano completo de cada query.')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            self.stdout.write(self.style.ERROR(
+                'Este benchmark precisa de PostgreSQL.'
+            ))
+            return
+
+        self.verbose_plan = options['verbose_plan']
+
+        with transaction.atomic():
+            user, robots = self.seed(
+                options['items'], options['robots'], options['items_per_task']
+            )
+            queries = self.get_queries(user, robots)
+
+            self.set_indexes(remove=True)
+            self.stdout.write(self.style.MIGRATE_HEADING('Sem índices'))
+            before = self.explain_all(queries)
+
+            self.set_indexes(remove=False)
+            self.stdout.write(self.style.MIGRATE_HEADING('Com índices'))
+            after = self.explain_all(queries)
+
+            self.stdout.write(self.style.MIGRATE_HEADING('Resumo (ms)'))
+            for name in queries:
+                self.stdout.write(
+                    f'{name:<28} sem: {before[name]:>10.3f}   '
+                    f'com: {after[name]:>10.3f}'
+                )
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS(
+            'Benchmark concluído; dados e alterações de índices desfeitos.'
+        ))
+
+    def seed(self, total_items, total_robots, items_per_task):
+        """
+        Cria usuário, robôs, tarefas e itens distribuídos entre etapas,
+        status e dias, como em uma base de produção.
+        """
+        self.stdout.write(f'Criando {total_items} itens...')
+        now = timezone.now()
+        user = User.objects.create_user(username='benchmark-user')
+        process = Process.objects.create(title='benchmark')
+        robots = [
+            Robot.objects.create(
+                user_id=User.objects.create_user(username=f'benchmark-robot-{i}'),
+                ip_address=f'bench-{i}',
+                status=StatusRobot.ACTIVE,
+            )
+            for i in range(total_robots)
+        ]
+
+        stages = ['SHIFT'] * 5 + ['IMAGE_PROCESS'] * 2 + ['SISMAMA', 'COMPLETED']
+        statuses = [Status.CREATED] * 3 + [Status.STARTED, Status.COMPLETED, Status.ERROR]
+
+        for start in range(0, total_items, items_per_task):
+            task = Task.objects.create(
+                user_id=user, process_id=process, robot_id=random.choice(robots)
+            )
+            items = [
+                Item(
+                    task_id=task,
+                    robot_id=task.robot_id,
+                    os_number=str(start + i),
+                    os_name=f'Paciente {start + i}',
+                    stage=random.choice(stages),
+                    status=random.choice(statuses),
+                    is_authorized=random.random() < 0.3,
+                )
+                for i in range(min(items_per_task, total_items - start))
+            ]
+            Item.objects.bulk_create(items, batch_size=5000)
+
+        # Espalha a data de criação pelos últimos 30 dias. As FKs são
+        # verificadas já aqui para permitir DDL na mesma transação.
+        with connection.cursor() as cursor:
+            cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+            cursor.execute(
+                f'UPDATE {Item._meta.db_table} '
+                "SET created_at = %s - (random() * interval '30 days')",
+                [now],
+            )
+            cursor.execute(f'ANALYZE {Item._meta.db_table}')
+            cursor.execute(f'ANALYZE {Task._meta.db_table}')
+        return user, robots
+
+    def get_queries(self, user, robots):
+        """
+        Queries dos caminhos quentes: by-stage, claim, sismama-data,
+        get_robots_by_load e DashboardListView.
+        """
+        return {
+            'list_by_stage': Item.objects.filter(stage='SHIFT').order_by(
+                'created_at', 'id'
+            )[:100],
+            'claim': Item.objects.select_for_update(skip_locked=True)
+            .filter(stage='SHIFT', lease_expires_at__isnull=True)
+            .exclude(status=Status.ERROR)
+            .order_by('created_at', 'id')
+            .values('id')[:50],
+            'sismama_data': Item.objects.filter(
+                is_authorized=True, stage='SISMAMA'
+            ),
+            'robots_by_load': get_robots_by_load()[:1],
+            'dashboard_tasks': Task.objects.filter(user_id=user).order_by('-id')[:10],
+        }
+
+    def explain_all(self, queries):
+        timings = {}
+        for name, queryset in queries.items():
+            plan = queryset.explain(analyze=True, buffers=True)
+            match = EXECUTION_TIME.search(plan)
+            timings[name] = float(match.group(1)) if match else float('nan')
+            first_line = plan.splitlines()[0]
+            self.stdout.write(f'{name:<28} {timings[name]:>10.3f} ms  {first_line}')
+            if self.verbose_plan:
+                self.stdout.write(plan + '\n')
+        return timings
+
+    def set_indexes(self, remove):
+        """
+        Remove ou recria (dentro da transação) os índices de acesso de Item
+        e Task e atualiza as estatísticas do planejador.
+        """
+        with connection.schema_editor(atomic=False) as schema_editor:
+            for model in (Item, Task):
+                for index in model._meta.indexes:
+                    if remove:
+                        schema_editor.remove_index(model, index)
+                    else:
+                        schema_editor.add_index(model, index)
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Item._meta.db_table}')
+            cursor.execute(f'ANALYZE {Task._meta.db_table}')
@@ -0,0 +1,123 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Prefetch
+
+from apps.items.models import Item
+from apps.items.serializer import ItemSerializer, ItemValuesSerializer
+from apps.processes.models import Process
+from apps.robots.models import Robot
+from apps.tasks.models import Task
+from apps.tasks.serializer import TaskSerializer, TaskValuesSerializer
+from apps.utils.choices import StatusRobot
+from apps.values.models import ShiftData
+from apps.values.serializer import ShiftDataSerializer, ShiftDataValuesSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara os serializers do DRF com os serializers por `.values()` "
+        "nos endpoints de leitura dos robôs e confere que a saída é a mesma. "
+        "Os dados criados são desfeitos ao final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=10000,
+                            help='Quantidade de itens a criar.')
+        parser.add_argument('--tasks', type=int, default=10,
+                            help='Quantidade de tarefas entre as quais os itens são divididos.')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Execuções por caminho; vale o melhor tempo.')
+
+    def handle(self, *args, **options):
+        self.repeat = options['repeat']
+
+        with transaction.atomic():
+            robot = self.seed(options['items'], options['tasks'])
+
+            tasks = Task.objects.filter(robot_id=robot).order_by('id')
+            items = Item.objects.filter(robot_id=robot).order_by('id')
+            shift_data = ShiftData.objects.filter(item__robot_id=robot).order_by('id')
+
+            self.compare(
+                'list_tasks (TaskSerializer)',
+                lambda: TaskSerializer(
+                    tasks.prefetch_related(Prefetch(
+                        'item_set',
+                        queryset=Item.objects.order_by('id').prefetch_related('shift_data'),
+                    )),
+                    many=True,
+                ).data,
+                lambda: TaskValuesSerializer.serialize(tasks),
+            )
+            self.compare(
+                'items (ItemSerializer)',
+                lambda: ItemSerializer(items.prefetch_related('shift_data'), many=True).data,
+                lambda: ItemValuesSerializer.serialize(items),
+            )
+            self.compare(
+                'shift-data (ShiftDataSerializer)',
+                lambda: ShiftDataSerializer(shift_data, many=True).data,
+                lambda: ShiftDataValuesSerializer.serialize(shift_data),
+            )
+
+            transaction.set_rollback(True)
+
+    def seed(self, total_items, total_tasks):
+        self.stdout.write(f'Criando {total_items} itens em {total_tasks} tarefas...')
+        user = User.objects.create_user(username='benchmark-user')
+        process = Process.objects.create(title='benchmark')
+        robot = Robot.objects.create(
+            user_id=User.objects.create_user(username='benchmark-robot'),
+            ip_address='bench-0',
+            status=StatusRobot.ACTIVE,
+        )
+        per_task = max(total_items // total_tasks, 1)
+        for start in range(0, total_items, per_task):
+            task = Task.objects.create(user_id=user, process_id=process, robot_id=robot)
+            created = Item.objects.bulk_create(
+                [
+                    Item(
+                        task_id=task,
+                        robot_id=robot,
+                        os_number=str(start + i),
+                        os_name=f'Paciente {start + i}',
+                        shift_result='OK',
+                        image_result='Resultado ' * 50,
+                    )
+                    for i in range(min(per_task, total_items - start))
+                ],
+                batch_size=5000,
+            )
+            # Metade dos itens com ShiftData, como após a etapa SHIFT
+            ShiftData.objects.bulk_create(
+                [
+                    ShiftData(task=task, item=item, os_number=item.os_number,
+                              recipiente='Frasco', nome_paciente=item.os_name)
+                    for item in created[::2]
+                ],
+                batch_size=5000,
+            )
+        return robot
+
+    def compare(self, name, drf, fast):
+        drf_time, drf_data = self.measure(drf)
+        fast_time, fast_data = self.measure(fast)
+        same = [dict(row) for row in drf_data] == fast_data
+        self.stdout.write(
+            f'{name:<34} drf: {drf_time * 1000:>9.1f} ms   '
+            f'values: {fast_time * 1000:>9.1f} ms   '
+            f'x{drf_time / fast_time:>5.1f}   '
+            + (self.style.SUCCESS('saída igual') if same else self.style.ERROR('SAÍDA DIFERENTE'))
+        )
+
+    def measure(self, func):
+        best, data = None, None
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            data = func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, data
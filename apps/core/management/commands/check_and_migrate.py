@@ -22,3 +22,7 @@ class Command(BaseCommand):
             self.stdout.write(self.style.SUCCESS("Migrate concluído com sucesso!"))
         else:
             self.stdout.write(self.style.SUCCESS("Nenhuma migration pendente."))
+
+        # Tabelas dos caches em banco (ex.: cache do dashboard); não faz nada
+        # para as que já existem ou para outros backends
+        call_command("createcachetable")
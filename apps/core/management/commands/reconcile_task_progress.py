@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from apps.tasks.models import Task
+from apps.tasks.progress import reconcile_task_progress
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula os contadores de itens das tarefas (TaskProgress) a partir "
+        "da tabela de itens e corrige os que divergirem."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, nargs='+',
+                            help='IDs das tarefas a conferir (padrão: todas).')
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Tarefas conferidas por query.')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Só informa as divergências, sem corrigir.')
+
+    def handle(self, *args, **options):
+        task_ids = options['tasks']
+        if not task_ids:
+            task_ids = list(Task.objects.order_by('id').values_list('id', flat=True))
+
+        batch_size = options['batch_size']
+        drifted = []
+        for start in range(0, len(task_ids), batch_size):
+            drifted += reconcile_task_progress(
+                task_ids[start:start + batch_size], dry_run=options['dry_run']
+            )
+
+        if drifted:
+            action = 'divergentes' if options['dry_run'] else 'corrigidas'
+            self.stdout.write(self.style.WARNING(
+                f'{len(drifted)} de {len(task_ids)} tarefas {action}: '
+                + ', '.join(str(task_id) for task_id in drifted[:50])
+                + (' ...' if len(drifted) > 50 else '')
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'{len(task_ids)} tarefas conferidas; nenhum contador divergente.'
+            ))
@@ -0,0 +1,96 @@
+from django.conf import settings
+from django.http import Http404
+
+
+class KeysetPage:
+    """
+    Página de uma listagem paginada por cursor, com os links para as páginas
+    vizinhas (query strings prontas para o template).
+    """
+
+    def __init__(self, object_list, query, has_next, has_previous):
+        self.object_list = object_list
+        self.has_next = has_next and bool(object_list)
+        self.has_previous = has_previous and bool(object_list)
+        self.next_query = self.previous_query = ''
+        if self.has_next:
+            self.next_query = self._query(query, 'after', object_list[-1].id)
+        if self.has_previous:
+            self.previous_query = self._query(query, 'before', object_list[0].id)
+
+    @staticmethod
+    def _query(query, name, value):
+        query = query.copy()
+        query.pop('after', None)
+        query.pop('before', None)
+        query[name] = value
+        return query.urlencode()
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginationMixin:
+    """
+    Paginação por cursor (keyset) para ListViews ordenadas do ID mais novo
+    para o mais antigo.
+
+    A página seguinte é `?after=<id>` (`WHERE id < <id>`) e a anterior
+    `?before=<id>`, então o custo de cada página não cresce com a
+    profundidade, ao contrário do OFFSET. O tamanho vem de `?paginate_by=`,
+    limitado a `WEB_MAX_PAGE_SIZE`. O template recebe `page_obj` (um
+    `KeysetPage`) e `paginate_by`; `includes/paginate_keyset.html` mostra a
+    navegação.
+    """
+
+    paginate_by = 10
+
+    def get_paginate_by(self, queryset=None) -> int:
+        try:
+            paginate_by = int(self.request.GET['paginate_by'])
+        except (KeyError, ValueError):
+            return self.paginate_by
+        if paginate_by <= 0:
+            return self.paginate_by
+        return min(paginate_by, settings.WEB_MAX_PAGE_SIZE)
+
+    def get_cursor(self, name):
+        value = self.request.GET.get(name)
+        if not value:
+            return None
+        if not value.isdigit():
+            raise Http404('Página inválida.')
+        return int(value)
+
+    def get_cursor_key(self) -> str:
+        """
+        Identifica a página pedida (para chaves de cache).
+        """
+        return f"{self.get_cursor('after') or ''}:{self.get_cursor('before') or ''}:{self.get_paginate_by()}"
+
+    def paginate_queryset(self, queryset, page_size):
+        """
+        Lê a página com uma única query de `page_size + 1` linhas.
+
+        Retorna a mesma tupla do `MultipleObjectMixin`:
+        (paginator, page, object_list, is_paginated); não há paginator, pois
+        o total de linhas não é contado.
+        """
+        after = self.get_cursor('after')
+        before = self.get_cursor('before')
+
+        if before is not None:
+            rows = list(queryset.filter(id__gt=before).order_by('id')[:page_size + 1])
+            has_previous = len(rows) > page_size
+            rows = rows[:page_size][::-1]
+            has_next = True
+        else:
+            if after is not None:
+                queryset = queryset.filter(id__lt=after)
+            rows = list(queryset.order_by('-id')[:page_size + 1])
+            has_next = len(rows) > page_size
+            rows = rows[:page_size]
+            has_previous = after is not None
+
+        page = KeysetPage(rows, self.request.GET, has_next, has_previous)
+        return None, page, rows, page.has_next or page.has_previous
@@ -178,6 +178,114 @@ REST_FRAMEWORK = {
         'rest_framework.parsers.MultiPartParser',
         'rest_framework.parsers.JSONParser',
     ],
+    # Paginação por cursor sobre (created_at, id), sem OFFSET
+    'DEFAULT_PAGINATION_CLASS': 'apps.api.pagination.KeysetPagination',
+    'PAGE_SIZE': int(os.getenv('API_PAGE_SIZE', 100)),
+}
+
+# Tamanho máximo de página que o cliente pode pedir com ?page_size=
+API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', 500))
+
+# Tamanho máximo de página das listagens das páginas web (?paginate_by=)
+WEB_MAX_PAGE_SIZE = int(os.getenv('WEB_MAX_PAGE_SIZE', 100))
+
+# ROBÔS
+# Intervalo mínimo (em segundos) entre duas gravações do heartbeat de um robô;
+# heartbeats mais frequentes são aceitos e descartados
+ROBOT_HEARTBEAT_INTERVAL = int(os.getenv('ROBOT_HEARTBEAT_INTERVAL', 30))
+
+# Tempo (em segundos) sem heartbeat para um robô ativo ser considerado
+# desconectado (`handle_disconnected_robots`)
+ROBOT_HEARTBEAT_TIMEOUT = int(os.getenv('ROBOT_HEARTBEAT_TIMEOUT', 180))
+
+# Itens da fila sem robô atribuídos por lote (`check_robots_every_minute`) e
+# lotes por execução; o restante da fila fica para a execução seguinte
+ROBOT_ASSIGN_BATCH_SIZE = int(os.getenv('ROBOT_ASSIGN_BATCH_SIZE', 1000))
+ROBOT_ASSIGN_MAX_BATCHES = int(os.getenv('ROBOT_ASSIGN_MAX_BATCHES', 20))
+
+# Rebalanceamento (`rebalance_robots`): excesso mínimo de itens abertos, acima
+# da parte justa do robô pela capacidade, para que ele ceda itens não
+# iniciados aos robôs ociosos, e máximo de itens movidos por execução
+ROBOT_REBALANCE_THRESHOLD = int(os.getenv('ROBOT_REBALANCE_THRESHOLD', 20))
+ROBOT_REBALANCE_MAX_ITEMS = int(os.getenv('ROBOT_REBALANCE_MAX_ITEMS', 5000))
+
+# ORQUESTRAÇÃO DOS ITENS
+# Tempo (em segundos) que um item fica reservado para o robô que o reivindicou
+ITEM_LEASE_SECONDS = int(os.getenv('ITEM_LEASE_SECONDS', 600))
+
+# Duração máxima (em segundos) da reserva que um robô pode pedir no claim
+ITEM_LEASE_MAX_SECONDS = int(os.getenv('ITEM_LEASE_MAX_SECONDS', 3600))
+
+# Quantidade máxima de itens reivindicados por chamada ao endpoint de claim
+ITEM_CLAIM_MAX_LIMIT = int(os.getenv('ITEM_CLAIM_MAX_LIMIT', 100))
+
+# Quantidade máxima de itens por chamada de atualização de status em lote
+ITEM_BULK_UPDATE_MAX = int(os.getenv('ITEM_BULK_UPDATE_MAX', 1000))
+
+# Espera máxima (em segundos) do long-poll `items/wait/`. Deve ficar abaixo do
+# `timeout` do gunicorn (30s), senão o worker síncrono é reiniciado
+ITEM_WAIT_MAX_TIMEOUT = int(os.getenv('ITEM_WAIT_MAX_TIMEOUT', 25))
+
+# Intervalo (em segundos) entre verificações da fila durante o long-poll,
+# além das notificações do PostgreSQL (cobre reservas que expiram)
+ITEM_WAIT_RECHECK_SECONDS = int(os.getenv('ITEM_WAIT_RECHECK_SECONDS', 5))
+
+# Esperas simultâneas do long-poll, somando todos os workers. Com workers
+# síncronos, cada espera ocupa um worker: deve ficar abaixo da quantidade de
+# workers do gunicorn (gunicorn-cfg.py). Excedentes respondem na hora, com
+# `Retry-After`; 0 desliga a espera
+ITEM_WAIT_MAX_CONCURRENT = int(os.getenv('ITEM_WAIT_MAX_CONCURRENT', 2))
+
+# Linhas lidas do banco por vez no export em streaming do SISMAMA
+SISMAMA_STREAM_CHUNK_SIZE = int(os.getenv('SISMAMA_STREAM_CHUNK_SIZE', 2000))
+
+# Quantidade máxima de ShiftData por chamada de upsert em lote
+SHIFT_DATA_BULK_MAX = int(os.getenv('SHIFT_DATA_BULK_MAX', 10000))
+
+# Itens inseridos por lote na importação do CSV de uma tarefa. Limita a
+# memória usada pelo worker independentemente do tamanho do arquivo
+TASK_IMPORT_BATCH_SIZE = int(os.getenv('TASK_IMPORT_BATCH_SIZE', 2000))
+
+# Tempo (em segundos) sem progresso para uma importação em andamento ser
+# considerada interrompida (worker morto) e marcada como FAILED
+TASK_IMPORT_STALE_SECONDS = int(os.getenv('TASK_IMPORT_STALE_SECONDS', 600))
+
+# Como os itens importados são gravados: 'bulk_create' (padrão) ou 'copy'
+# (COPY FROM STDIN, opcional e apenas PostgreSQL; nos demais bancos cai para
+# bulk_create)
+TASK_IMPORT_BACKEND = os.getenv('TASK_IMPORT_BACKEND', 'bulk_create')
+
+# Divide os itens de cada tarefa importada entre os robôs ativos (pela carga
+# e capacidade). Com 'false', todos os itens ficam com o robô da tarefa
+TASK_IMPORT_SHARDING = os.getenv('TASK_IMPORT_SHARDING', 'true').lower() == 'true'
+
+# Quantidade máxima de tarefas por chamada do resumo `tasks/summary/`
+TASK_SUMMARY_MAX_TASKS = int(os.getenv('TASK_SUMMARY_MAX_TASKS', 500))
+
+# CACHE DO DASHBOARD
+# Backend do cache das partes do dashboard. O padrão (tabela no banco, criada
+# pelo `check_and_migrate`) é compartilhado entre os workers do gunicorn e do
+# Celery; com um cache local (LocMemCache) a invalidação feita por um processo
+# não chega aos demais. Redis ou Memcached podem ser usados pelo backend e
+# pela localização
+DASHBOARD_CACHE_BACKEND = os.getenv(
+    'DASHBOARD_CACHE_BACKEND', 'django.core.cache.backends.db.DatabaseCache'
+)
+DASHBOARD_CACHE_LOCATION = os.getenv('DASHBOARD_CACHE_LOCATION', 'dashboard_cache')
+
+# Validade (em segundos) das partes guardadas. As escritas já invalidam o
+# cache; o prazo apenas descarta as versões antigas
+DASHBOARD_CACHE_TIMEOUT = int(os.getenv('DASHBOARD_CACHE_TIMEOUT', 300))
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'dashboard': {
+        'BACKEND': DASHBOARD_CACHE_BACKEND,
+        'LOCATION': DASHBOARD_CACHE_LOCATION,
+        'TIMEOUT': DASHBOARD_CACHE_TIMEOUT,
+    },
 }
 
 SWAGGER_SETTINGS = {
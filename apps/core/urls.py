@@ -3,8 +3,8 @@ from django.urls import path, include, re_path
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from .views import login_view, logout_view
-from apps.tasks.views import DashboardListView
-from apps.items.views import ItemListView, ItemUpdateView
+from apps.tasks.views import DashboardCacheStatsView, DashboardListView, ImportJobProgressView
+from apps.items.views import ItemDetailsView, ItemListView, ItemUpdateView
 from rest_framework import permissions
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from django.conf import settings
@@ -34,7 +34,10 @@ urlpatterns = [
     path("logout/", logout_view, name="logout"),
     path("admin/", admin.site.urls),
     path("tasks/<int:task_id>/", ItemListView.as_view(), name="items"),
+    path("tasks/imports/<int:pk>/", ImportJobProgressView.as_view(), name="import_progress"),
+    path("tasks/cache-stats/", DashboardCacheStatsView.as_view(), name="dashboard_cache_stats"),
     path("items/<int:pk>/update/", ItemUpdateView.as_view(), name="item_update"),
+    path("items/<int:pk>/details/", ItemDetailsView.as_view(), name="item_details"),
     path("api/", include("apps.api.urls")),
     path("api/v1/alerts/", include("apps.alerts.v1.urls")),
     path('alerts/', include("apps.alerts.urls")),
@@ -1,6 +1,9 @@
 from django.contrib import admin
+from django.db import transaction
 from django.utils.safestring import mark_safe
+from apps.tasks.progress import get_item_state, update_item_progress
 from .models import Item
+from .utils import delete_items, update_items
 
 
 @admin.register(Item)
@@ -56,6 +59,31 @@ class ItemAdmin(admin.ModelAdmin):
     # Descrição para o campo formatado
     pretty_image_result.short_description = "Resultado da Imagem (Texto)"
 
+    def save_model(self, request, obj, form, change):
+        """
+        Salva o item mantendo os contadores da tarefa.
+        """
+        with transaction.atomic():
+            previous_state = None
+            if change:
+                previous_state = get_item_state(
+                    Item.objects.select_for_update().only('task_id', 'status', 'stage').get(pk=obj.pk)
+                )
+            super().save_model(request, obj, form, change)
+            update_item_progress(previous_state, obj)
+
+    def delete_model(self, request, obj):
+        """
+        Remove o item mantendo os contadores da tarefa.
+        """
+        delete_items(Item.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        """
+        Remove os itens selecionados mantendo os contadores das tarefas.
+        """
+        delete_items(queryset)
+
     # Adicionar ações personalizadas no Django Admin
     actions = ['marcar_como_completed', 'marcar_como_pending', 'apagar_resultado_imagem']
 
@@ -63,7 +91,7 @@ class ItemAdmin(admin.ModelAdmin):
         """
         Ação para marcar os itens selecionados como COMPLETED.
         """
-        updated = queryset.update(status='COMPLETED')
+        updated = update_items(queryset, status='COMPLETED')
         self.message_user(request, f'{updated} itens marcados como COMPLETED com sucesso.')
 
     marcar_como_completed.short_description = 'Marcar como COMPLETED'
@@ -72,7 +100,7 @@ class ItemAdmin(admin.ModelAdmin):
         """
         Ação para marcar os itens selecionados como PENDING.
         """
-        updated = queryset.update(status='PENDING')
+        updated = update_items(queryset, status='PENDING')
         self.message_user(request, f'{updated} itens marcados como PENDING com sucesso.')
 
     marcar_como_pending.short_description = 'Marcar como PENDING'
@@ -81,7 +109,7 @@ class ItemAdmin(admin.ModelAdmin):
         """
         Ação personalizada para apagar o conteúdo de 'image_result'.
         """
-        updated = queryset.update(image_result=None)
+        updated = update_items(queryset, image_result=None)
         self.message_user(request, f'Resultado de imagem apagado para {updated} itens.')
 
     apagar_resultado_imagem.short_description = 'Apagar Resultado de Imagem'
@@ -10,3 +10,28 @@ class ShiftDataForm(forms.ModelForm):
             'data_liberacao', 'tamanho_lesao', 'caracteristica_lesao', 'localizacao_lesao', 
             'codigo_postal', 'logradouro', 'numero_residencial', 'cidade', 'estado'
         ]
+
+
+# Campos do ShiftData no modal "Ver valores" da lista de itens, na ordem de
+# exibição: (campo, rótulo, tipo do input)
+SHIFT_DATA_MODAL_FIELDS = [
+    ('cnes', 'CNES', 'text'),
+    ('os_number', 'O.S. Número', 'text'),
+    ('cartao_sus', 'Cartão SUS', 'text'),
+    ('nome_paciente', 'Nome do Paciente', 'text'),
+    ('recipiente', 'Número do recipiente', 'text'),
+    ('sexo', 'Sexo', 'text'),
+    ('raca_etinia', 'Raça / Etnia', 'text'),
+    ('idade_paciente', 'Idade do Paciente', 'number'),
+    ('data_nascimento', 'Data de Nascimento', 'date'),
+    ('data_coleta', 'Data de Coleta', 'datetime-local'),
+    ('data_liberacao', 'Data de Liberação', 'datetime-local'),
+    ('tamanho_lesao', 'Tamanho da Lesão', 'text'),
+    ('caracteristica_lesao', 'Característica da Lesão', 'text'),
+    ('localizacao_lesao', 'Localização da Lesão', 'text'),
+    ('codigo_postal', 'Código Postal', 'text'),
+    ('logradouro', 'Logradouro', 'text'),
+    ('numero_residencial', 'Número Residencial', 'text'),
+    ('cidade', 'Cidade', 'text'),
+    ('estado', 'Estado', 'text'),
+]
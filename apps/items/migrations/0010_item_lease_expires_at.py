@@ -0,0 +1,18 @@
+# Generated by Django 4.2.4 on 2026-10-18 06:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0009_item_bot_error_message'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='lease_expires_at',
+            field=models.DateTimeField(blank=True, help_text='Fim da reserva do item pelo robô (claim)', null=True),
+        ),
+    ]
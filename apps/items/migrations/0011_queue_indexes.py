@@ -0,0 +1,25 @@
+# Generated by Django 4.2.4 on 2026-10-18 06:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0010_item_lease_expires_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['stage', 'created_at', 'id'], name='item_stage_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(condition=models.Q(('is_authorized', True), ('stage', 'SISMAMA')), fields=['id'], name='item_sismama_authorized_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(condition=models.Q(('status__in', ['CREATED', 'STARTED'])), fields=['robot_id', 'created_at'], name='item_open_robot_idx'),
+        ),
+    ]
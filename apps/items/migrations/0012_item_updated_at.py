@@ -0,0 +1,22 @@
+# Generated by Django 4.2.4 on 2026-10-18 06:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0011_queue_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, help_text='Última alteração do item (base do ETag dos endpoints de polling)'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['stage', 'updated_at'], name='item_stage_updated_idx'),
+        ),
+    ]
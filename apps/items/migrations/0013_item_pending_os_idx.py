@@ -0,0 +1,17 @@
+# Generated by Django 4.2.4 on 2026-10-18 07:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0012_item_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(condition=models.Q(('status__in', ['CREATED', 'STARTED'])), fields=['os_number'], name='item_pending_os_idx'),
+        ),
+    ]
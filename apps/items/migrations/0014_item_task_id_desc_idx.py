@@ -0,0 +1,17 @@
+# Generated by Django 4.2.4 on 2026-10-18 07:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0013_item_pending_os_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['task_id', '-id'], name='item_task_id_desc_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.4 on 2026-10-18 07:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0014_item_task_id_desc_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(condition=models.Q(('robot_id__isnull', True), ('status__in', ['CREATED', 'STARTED'])), fields=['id'], name='item_unassigned_idx'),
+        ),
+    ]
@@ -57,6 +57,15 @@ class Item(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     started_at = models.DateTimeField(null=True, blank=True)
     ended_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        help_text="Última alteração do item (base do ETag dos endpoints de polling)"
+    )
+    lease_expires_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Fim da reserva do item pelo robô (claim)"
+    )
 
     # Resultados das etapas
     shift_result = models.TextField(null=True, blank=True)
@@ -76,5 +85,47 @@ class Item(models.Model):
     bot_error_message = models.TextField(null=True, blank=True, help_text="Mensagem de erro do bot, se houver")
 
 
+    class Meta:
+        indexes = [
+            # Fila por etapa (by-stage e claim), ordenada por (created_at, id)
+            models.Index(
+                fields=['stage', 'created_at', 'id'],
+                name='item_stage_created_idx',
+            ),
+            # Versão (ETag) da fila de cada etapa: COUNT + MAX(updated_at)
+            models.Index(
+                fields=['stage', 'updated_at'],
+                name='item_stage_updated_idx',
+            ),
+            # Itens autorizados aguardando o robô do SISMAMA
+            models.Index(
+                fields=['id'],
+                condition=models.Q(is_authorized=True, stage='SISMAMA'),
+                name='item_sismama_authorized_idx',
+            ),
+            # Carga aberta (CREATED/STARTED) de cada robô
+            models.Index(
+                fields=['robot_id', 'created_at'],
+                condition=models.Q(status__in=[Status.CREATED, Status.STARTED]),
+                name='item_open_robot_idx',
+            ),
+            # Fila de itens abertos aguardando um robô
+            models.Index(
+                fields=['id'],
+                condition=models.Q(
+                    robot_id__isnull=True, status__in=[Status.CREATED, Status.STARTED]
+                ),
+                name='item_unassigned_idx',
+            ),
+            # Lista de itens da tarefa, paginada por cursor do ID mais novo
+            models.Index(fields=['task_id', '-id'], name='item_task_id_desc_idx'),
+            # Deduplicação na importação: OS ainda pendentes
+            models.Index(
+                fields=['os_number'],
+                condition=models.Q(status__in=[Status.CREATED, Status.STARTED]),
+                name='item_pending_os_idx',
+            ),
+        ]
+
     def __str__(self) -> str:
         return f"{self.os_number} - {self.os_name or 'Sem nome'}"
\ No newline at end of file
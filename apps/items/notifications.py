@@ -0,0 +1,135 @@
+import select
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+
+# Canal do PostgreSQL usado para avisar que há itens novos em uma etapa.
+# O payload da notificação é o nome da etapa.
+CHANNEL = 'items_available'
+
+# Chave dos advisory locks do PostgreSQL que limitam as esperas simultâneas
+# (o segundo número do lock é a vaga)
+WAIT_LOCK_KEY = 7301
+
+# Limite por processo, nos bancos sem advisory locks
+_wait_slots = threading.BoundedSemaphore(max(settings.ITEM_WAIT_MAX_CONCURRENT, 1))
+
+
+def notify_items_available(*stages):
+    """
+    Avisa os robôs aguardando em `wait/` que há itens nas etapas informadas.
+
+    Usa NOTIFY do PostgreSQL: dentro de uma transação, a notificação só é
+    entregue no COMMIT, então ninguém acorda antes de os itens estarem
+    visíveis. Em outros bancos não faz nada (o `wait/` recorre à
+    verificação periódica).
+    """
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        for stage in sorted({stage for stage in stages if stage}):
+            cursor.execute('SELECT pg_notify(%s, %s)', [CHANNEL, stage])
+
+
+def wait_for_items(stage, timeout, is_available):
+    """
+    Bloqueia até haver itens disponíveis na etapa ou até o timeout.
+
+    O LISTEN é feito antes da primeira verificação, para não perder
+    notificações entre a consulta e a espera. Além das notificações, a
+    disponibilidade é conferida a cada `ITEM_WAIT_RECHECK_SECONDS`, o que
+    cobre reservas (leases) que expiram sem nenhuma escrita no banco.
+
+    A espera usa `select()` no socket da conexão, portanto funciona em
+    workers síncronos do gunicorn e cede a vez em workers gevent/eventlet
+    (que substituem `select`).
+
+    Parâmetros:
+    - stage (str): Etapa do processamento.
+    - timeout (float): Tempo máximo de espera em segundos.
+    - is_available (Callable[[], bool]): Verifica se há itens na etapa.
+
+    Retorna:
+    bool: True se há itens disponíveis, False se o tempo esgotou.
+    """
+    listening = connection.vendor == 'postgresql'
+    if listening:
+        with connection.cursor() as cursor:
+            cursor.execute(f'LISTEN {CHANNEL}')
+        pg_connection = connection.connection
+
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            if is_available():
+                return True
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            wait = min(remaining, settings.ITEM_WAIT_RECHECK_SECONDS)
+
+            if not listening:
+                time.sleep(wait)
+                continue
+
+            # Aguarda notificações até a próxima verificação periódica
+            while wait > 0:
+                started = time.monotonic()
+                if select.select([pg_connection], [], [], wait) == ([], [], []):
+                    break
+                pg_connection.poll()
+                stages = {notify.payload for notify in pg_connection.notifies}
+                pg_connection.notifies.clear()
+                if stage in stages:
+                    break
+                wait -= time.monotonic() - started
+    finally:
+        if listening:
+            with connection.cursor() as cursor:
+                cursor.execute(f'UNLISTEN {CHANNEL}')
+
+
+@contextmanager
+def wait_slot():
+    """
+    Reserva uma das `ITEM_WAIT_MAX_CONCURRENT` vagas de espera do `wait/`.
+
+    Com workers síncronos do gunicorn cada espera ocupa um worker (e a sua
+    conexão com o banco) até o timeout; o limite garante que sempre sobrem
+    workers para as demais requisições. No PostgreSQL as vagas são advisory
+    locks de sessão, compartilhados por todos os processos e liberados se o
+    processo morrer; nos demais bancos o limite é por processo.
+
+    Retorna (no `with`):
+    bool: True se conseguiu uma vaga; False se todas estão ocupadas.
+    """
+    if settings.ITEM_WAIT_MAX_CONCURRENT <= 0:
+        yield False
+        return
+
+    if connection.vendor != 'postgresql':
+        acquired = _wait_slots.acquire(blocking=False)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                _wait_slots.release()
+        return
+
+    slot = None
+    with connection.cursor() as cursor:
+        for number in range(settings.ITEM_WAIT_MAX_CONCURRENT):
+            cursor.execute('SELECT pg_try_advisory_lock(%s, %s)', [WAIT_LOCK_KEY, number])
+            if cursor.fetchone()[0]:
+                slot = number
+                break
+    try:
+        yield slot is not None
+    finally:
+        if slot is not None:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_unlock(%s, %s)', [WAIT_LOCK_KEY, slot])
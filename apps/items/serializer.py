@@ -1,10 +1,15 @@
+from django.conf import settings
 from rest_framework import serializers
 from .models import Item
+from apps.api.fieldsets import SparseFieldsMixin
+from apps.api.values_serializers import ValuesSerializer
+from apps.robots.models import Robot
 from apps.tasks.models import Task
+from apps.utils.choices import Status
 from apps.values.models import ShiftData
 
 
-from apps.values.serializer import ShiftDataMiniSerializer
+from apps.values.serializer import ShiftDataMiniSerializer, ShiftDataSerializer
 
 class TaskSummarySerializer(serializers.ModelSerializer):
     """
@@ -16,7 +21,7 @@ class TaskSummarySerializer(serializers.ModelSerializer):
         fields = ["id", "created_at", "status", "robot_id"]
 
 
-class ItemSerializer(serializers.ModelSerializer):
+class ItemSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     shift_data = serializers.SerializerMethodField()
 
     class Meta:
@@ -39,15 +44,102 @@ class ItemSerializer(serializers.ModelSerializer):
         ]
 
     def get_shift_data(self, obj):
-        shift_data = obj.shift_data.first()
+        # `.all()` aproveita o prefetch_related('shift_data'); `.first()`
+        # sempre faria uma nova query por item
+        shift_data = next(iter(obj.shift_data.all()), None)
         if shift_data:
             return ShiftDataMiniSerializer(shift_data).data
         return None
-    
+
+
+class ItemValuesSerializer(ValuesSerializer):
+    """
+    Versão somente leitura do ItemSerializer a partir de `.values()`.
+
+    O `recipiente` do ShiftData vem na mesma query por LEFT JOIN (no máximo
+    um ShiftData por item).
+    """
+    model = Item
+    fields = [name for name in ItemSerializer.Meta.fields if name != 'shift_data']
+
+    @classmethod
+    def get_value_names(cls, fields=None):
+        names = super().get_value_names(fields)
+        if fields is None or 'shift_data' in fields:
+            names += ['shift_data__id', 'shift_data__recipiente']
+        return names
+
+    @classmethod
+    def to_representation(cls, row, formatters=None):
+        data = super().to_representation(row, formatters)
+        if 'shift_data__id' in row:
+            data['shift_data'] = (
+                {'recipiente': row['shift_data__recipiente']}
+                if row['shift_data__id'] is not None
+                else None
+            )
+        return data
+
+
+class SismamaItemSerializer(ItemSerializer):
+    """
+    Item autorizado para o SISMAMA com o ShiftData completo aninhado.
+
+    O ShiftData é recebido já carregado em `context['shift_data']`, evitando
+    uma query por item.
+    """
+
+    def get_shift_data(self, obj):
+        return ShiftDataSerializer(self.context['shift_data']).data
 
 
 class ShiftDataUpsertSerializer(serializers.ModelSerializer):
     class Meta:
         model = ShiftData
         fields = '__all__'
-        read_only_fields = ('id',)
\ No newline at end of file
+        read_only_fields = ('id',)
+
+
+class ShiftDataBulkUpsertSerializer(serializers.ModelSerializer):
+    """
+    Valida uma entrada do upsert de ShiftData em lote de uma tarefa.
+
+    O item é informado pelo ID e conferido em lote pela view, por isso não
+    há validação de relacionamento nem de unicidade por linha.
+    """
+    item = serializers.IntegerField()
+
+    class Meta:
+        model = ShiftData
+        exclude = ('id', 'task', 'created_at')
+        validators = []
+
+
+class ItemClaimSerializer(serializers.Serializer):
+    """
+    Valida a requisição de reserva (claim) de itens por um robô.
+    """
+    robot_id = serializers.PrimaryKeyRelatedField(queryset=Robot.objects.all())
+    stage = serializers.ChoiceField(choices=['SHIFT', 'IMAGE_PROCESS', 'SISMAMA'])
+    limit = serializers.IntegerField(
+        min_value=1, max_value=settings.ITEM_CLAIM_MAX_LIMIT, default=10
+    )
+    lease_seconds = serializers.IntegerField(
+        min_value=1,
+        max_value=settings.ITEM_LEASE_MAX_SECONDS,
+        default=settings.ITEM_LEASE_SECONDS,
+    )
+
+
+class ItemStatusUpdateSerializer(serializers.Serializer):
+    """
+    Valida uma entrada da atualização de status de itens em lote.
+    """
+    id = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=Status.choices, required=False)
+    stage = serializers.ChoiceField(choices=Item.STAGE_CHOICES, required=False)
+    started_at = serializers.DateTimeField(required=False, allow_null=True)
+    ended_at = serializers.DateTimeField(required=False, allow_null=True)
+    bot_error_message = serializers.CharField(
+        required=False, allow_null=True, allow_blank=True
+    )
@@ -1,8 +1,21 @@
-from django.test import TestCase
+import json
+import time
+from datetime import date, datetime, timedelta
+from datetime import timezone as dt_timezone
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
 from rest_framework import status
+from apps.items.forms import SHIFT_DATA_MODAL_FIELDS
 from apps.items.models import Item
-from .views import ItemAPIView
+from apps.items.utils import copy_items, copy_value, insert_items
+from apps.tasks.models import TaskProgress
+from apps.tasks.progress import COUNTER_FIELDS, count_task_progress, reconcile_task_progress
 from apps.utils.choices import Status
+from apps.values.models import ShiftData
 from apps.api.tests import setUp_Test_Case
 
 # Create your tests here.
@@ -10,10 +23,10 @@ from apps.api.tests import setUp_Test_Case
 
 class ItemAPIViewTestCase(TestCase):
     """
-    Test case for the ItemAPIView class-based view.
+    Test case for the item status update endpoint.
 
-    This test case checks the behavior of the patch_item_status method
-    which updates the status of an item using the ItemAPIView view.
+    This test case checks the behavior of `items/{id}/update-status/`,
+    which updates the status of an item.
 
     Attributes:
         See individual test methods for attributes.
@@ -27,25 +40,430 @@ class ItemAPIViewTestCase(TestCase):
 
     def test_patch_item_status(self):
         """
-        Test the patch_item_status method.
+        Test the update-status action.
 
-        This test sends a PATCH request to the ItemAPIView view
-        with updated item status.
+        This test sends a PATCH request with the updated item status.
         It checks if the status is updated correctly and if the response
         status code is 200 OK.
         """
-        url = '/items/'
+        url = f'/api/v1/items/{self.item.id}/update-status/'
         data = {
             'robot_id': self.robot.id,
-            'item_id': self.item.id,
+            'stage': 'SHIFT',
             'status': 'COMPLETED'
         }
-        query_params = '?' + \
-            '&'.join(f'{key}={value}' for key, value in data.items())
-        request = self.factory.patch(url + query_params)
-        # Token Auth para el header
-        request.META['HTTP_AUTHORIZATION'] = f'Token {self.token.key}'
-        response = ItemAPIView.as_view()(request)
+        response = self.client.patch(url, data, format='json')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(Item.objects.get(
             id=self.item.id).status, Status.COMPLETED)
+
+
+class ItemSparseFieldsTestCase(TestCase):
+    """
+    Test case for `?fields=` and `?exclude=` on the item endpoints.
+    """
+
+    def setUp(self):
+        setUp_Test_Case(self)
+
+    def test_retrieve_fields(self):
+        response = self.client.get(f'/api/v1/items/{self.item.id}/?fields=status,stage')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data, {'id': self.item.id, 'status': self.item.status, 'stage': self.item.stage}
+        )
+
+    def test_retrieve_exclude(self):
+        response = self.client.get(f'/api/v1/items/{self.item.id}/?exclude=shift_data')
+        self.assertNotIn('shift_data', response.data)
+        self.assertIn('os_number', response.data)
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get(f'/api/v1/items/{self.item.id}/?fields=os_number,nope')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ItemListViewTestCase(TestCase):
+    """
+    Test case for the keyset-paginated item list of a task.
+    """
+
+    def setUp(self):
+        setUp_Test_Case(self)
+        self.client.force_login(self.user)
+        Item.objects.bulk_create(
+            [Item(task_id=self.task, os_number=str(number)) for number in range(2, 25)]
+        )
+        Item.objects.filter(id=self.item.id).update(image_result='ok', shift_result='')
+        self.url = f'/tasks/{self.task.id}/'
+
+    def get_page(self, query):
+        response = self.client.get(f'{self.url}?{query}')
+        self.assertEqual(response.status_code, 200)
+        return response.context['page_obj']
+
+    def test_next_cursor_walks_all_items_once(self):
+        expected = list(
+            Item.objects.filter(task_id=self.task).order_by('-id').values_list('id', flat=True)
+        )
+        seen = []
+        pages = []
+        query = 'paginate_by=5'
+        while True:
+            page = self.get_page(query)
+            pages.append([item.id for item in page.object_list])
+            seen += pages[-1]
+            if not page.has_next:
+                break
+            query = page.next_query
+        self.assertEqual(seen, expected)
+        self.assertEqual([len(ids) for ids in pages], [5, 5, 5, 5, 4])
+
+        # De volta pela página anterior, a partir da última
+        page = self.get_page(query)
+        self.assertEqual([item.id for item in self.get_page(page.previous_query).object_list], pages[-2])
+
+    def test_text_columns_are_flags(self):
+        page = self.get_page('paginate_by=50')
+        item = next(item for item in page.object_list if item.id == self.item.id)
+        self.assertTrue(item.has_image_result)
+        self.assertFalse(item.has_shift_result)
+        self.assertFalse(item.has_bot_error_message)
+
+    def test_other_user_is_redirected(self):
+        other = User.objects.create_user(username='other')
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+
+class ItemDetailsViewTestCase(TestCase):
+    """
+    Test case for the item modal contents (`items/{id}/details/`).
+    """
+
+    def setUp(self):
+        setUp_Test_Case(self)
+        self.client.force_login(self.user)
+        ShiftData.objects.filter(id=self.value.id).update(
+            nome_paciente='Ana',
+            cnes='Não especificado',
+            idade_paciente=40,
+            data_nascimento=date(1984, 5, 6),
+            data_coleta=datetime(2024, 1, 2, 3, 4, tzinfo=dt_timezone.utc),
+        )
+        Item.objects.filter(id=self.item.id).update(image_result='imagem', bot_error_message='erro')
+
+    def get_details(self, item):
+        return self.client.get(f'/items/{item.id}/details/')
+
+    def test_shift_data_modal_fields(self):
+        data = self.get_details(self.item).json()
+        self.assertEqual(data['os_number'], '1')
+        self.assertEqual(data['image_result'], 'imagem')
+        self.assertEqual(data['bot_error_message'], 'erro')
+        self.assertEqual(data['update_url'], f'/items/{self.item.id}/update/')
+
+        fields = {field['name']: field for field in data['shift_data']}
+        self.assertEqual(
+            [field['name'] for field in data['shift_data']],
+            [name for name, _, _ in SHIFT_DATA_MODAL_FIELDS],
+        )
+        self.assertEqual(fields['nome_paciente']['value'], 'Ana')
+        self.assertTrue(fields['nome_paciente']['readonly'])
+        self.assertFalse(fields['cnes']['readonly'])
+        self.assertEqual(fields['idade_paciente']['value'], 40)
+        self.assertEqual(fields['data_nascimento']['value'], '1984-05-06')
+        self.assertEqual(fields['data_coleta']['value'], '2024-01-02T03:04')
+        self.assertEqual(fields['cartao_sus']['value'], '')
+        self.assertFalse(fields['cartao_sus']['readonly'])
+
+    def test_item_without_shift_data(self):
+        item = Item.objects.create(task_id=self.task, os_number='2')
+        self.assertIsNone(self.get_details(item).json()['shift_data'])
+
+    def test_other_user_gets_404(self):
+        self.client.force_login(User.objects.create_user(username='other'))
+        self.assertEqual(self.get_details(self.item).status_code, 404)
+
+
+class ItemSismamaStreamTestCase(TestCase):
+    """
+    Test case for the NDJSON stream of `items/sismama-data/`.
+    """
+
+    def setUp(self):
+        setUp_Test_Case(self)
+        Item.objects.filter(id=self.item.id).update(stage='SISMAMA', is_authorized=True)
+        ShiftData.objects.filter(id=self.value.id).update(
+            nome_paciente='Ana "Çá"\nSilva',
+            data_nascimento=date(1984, 5, 6),
+            data_coleta=datetime(2024, 1, 2, 3, 4, tzinfo=dt_timezone.utc),
+        )
+        for number in range(2, 6):
+            item = Item.objects.create(
+                task_id=self.task, os_number=str(number), stage='SISMAMA',
+                is_authorized=number % 2 == 0,
+            )
+            ShiftData.objects.create(task=self.task, item=item, os_number=str(number))
+        # Sem ShiftData: fica de fora das duas respostas
+        Item.objects.create(task_id=self.task, os_number='6', stage='SISMAMA', is_authorized=True)
+
+    def test_stream_matches_list(self):
+        response = self.client.get('/api/v1/items/sismama-data/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expected = json.loads(response.content)
+
+        response = self.client.get('/api/v1/items/sismama-data/stream/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        streamed = [json.loads(line) for line in lines]
+
+        self.assertEqual(streamed, expected)
+        self.assertEqual([row['os_number'] for row in streamed], ['1', '2', '4'])
+        self.assertEqual(streamed[0]['shift_data']['nome_paciente'], 'Ana "Çá"\nSilva')
+
+
+class ItemClaimTestCase(TestCase):
+    """
+    Test case for `items/claim/` (reserva de itens por etapa).
+    """
+
+    url = '/api/v1/items/claim/'
+
+    def setUp(self):
+        setUp_Test_Case(self)
+        Item.objects.bulk_create([
+            Item(task_id=self.task, os_number=str(number)) for number in range(2, 5)
+        ])
+
+    def claim(self, **data):
+        data = {'robot_id': self.robot.id, 'stage': 'SHIFT', **data}
+        return self.client.post(self.url, data, format='json')
+
+    def claimed_ids(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {item['id'] for item in response.data['items']}
+
+    def test_claim_is_exclusive(self):
+        """
+        Itens reservados não são entregues de novo enquanto a reserva vale.
+        """
+        first = self.claimed_ids(self.claim(limit=3))
+        second = self.claimed_ids(self.claim(limit=3))
+        self.assertEqual(len(first), 3)
+        self.assertEqual(len(second), 1)
+        self.assertFalse(first & second)
+        self.assertEqual(
+            Item.objects.filter(id__in=first, status=Status.STARTED).count(), 3
+        )
+
+    def test_completed_item_is_not_claimed_again(self):
+        """
+        Concluir o item libera a reserva, mas ele não volta para a fila.
+        """
+        (item_id,) = self.claimed_ids(self.claim(limit=1))
+        response = self.client.patch(
+            f'/api/v1/items/{item_id}/update-status/',
+            {'robot_id': self.robot.id, 'stage': 'SHIFT', 'status': 'COMPLETED'},
+            format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(Item.objects.get(id=item_id).lease_expires_at)
+
+        self.assertNotIn(item_id, self.claimed_ids(self.claim(limit=10)))
+
+    def test_expired_lease_is_claimed_again(self):
+        """
+        Um item STARTED com a reserva expirada volta a ser entregue.
+        """
+        (item_id,) = self.claimed_ids(self.claim(limit=1))
+        Item.objects.filter(id=item_id).update(
+            lease_expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertIn(item_id, self.claimed_ids(self.claim(limit=10)))
+
+    def test_sismama_requires_authorization(self):
+        """
+        Na etapa SISMAMA só os itens autorizados são entregues.
+        """
+        Item.objects.update(stage='SISMAMA')
+        Item.objects.filter(id=self.item.id).update(is_authorized=True)
+        self.assertEqual(self.claimed_ids(self.claim(stage='SISMAMA', limit=10)), {self.item.id})
+
+    def test_lease_seconds_is_capped(self):
+        response = self.claim(lease_seconds=10 ** 7)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ItemByStageETagTestCase(TestCase):
+    """
+    Test case for the ETag of `items/by-stage/`.
+    """
+
+    url = '/api/v1/items/by-stage/?stage=SHIFT'
+
+    def setUp(self):
+        setUp_Test_Case(self)
+
+    def test_shift_data_change_invalidates_etag(self):
+        """
+        Alterar o ShiftData embutido nos itens muda o ETag da etapa.
+        """
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+        self.assertEqual(
+            self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code,
+            status.HTTP_304_NOT_MODIFIED,
+        )
+
+        self.value.recipiente = 'Frasco'
+        self.value.save()
+        self.assertEqual(
+            self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code,
+            status.HTTP_200_OK,
+        )
+
+
+class ItemWaitTestCase(TestCase):
+    """
+    Test case for the long-poll `items/wait/`.
+    """
+
+    def setUp(self):
+        setUp_Test_Case(self)
+
+    def test_finished_items_are_not_available(self):
+        Item.objects.update(status=Status.COMPLETED)
+        response = self.client.get('/api/v1/items/wait/?stage=SHIFT&timeout=0')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data['available'])
+
+    @override_settings(ITEM_WAIT_MAX_CONCURRENT=0)
+    def test_no_wait_slot_answers_immediately(self):
+        """
+        Sem vaga de espera, responde na hora com `Retry-After`.
+        """
+        Item.objects.update(status=Status.COMPLETED)
+        started = time.monotonic()
+        response = self.client.get('/api/v1/items/wait/?stage=SHIFT&timeout=20')
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertFalse(response.data['available'])
+        self.assertIn('Retry-After', response)
+
+
+class ItemBulkUpdateStatusTestCase(TestCase):
+    """
+    Test case for the task counters after `items/bulk-update-status/`.
+    """
+
+    def setUp(self):
+        setUp_Test_Case(self)
+        self.second = Item.objects.create(task_id=self.task, os_number='2')
+        self.third = Item.objects.create(task_id=self.task, os_number='3')
+        reconcile_task_progress([self.task.id])
+
+    def get_counters(self):
+        return TaskProgress.objects.filter(task_id=self.task.id).values(*COUNTER_FIELDS).get()
+
+    def test_counters_follow_bulk_update(self):
+        response = self.client.patch('/api/v1/items/bulk-update-status/', [
+            {'id': self.item.id, 'status': Status.STARTED, 'stage': 'IMAGE_PROCESS'},
+            {'id': self.second.id, 'status': Status.COMPLETED, 'stage': 'COMPLETED'},
+            {'id': self.second.id + 1000, 'status': Status.ERROR},
+            {'id': self.third.id, 'status': 'UNKNOWN'},
+        ], format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [result['result'] for result in response.data],
+            ['updated', 'updated', 'not_found', 'invalid'],
+        )
+
+        counters = self.get_counters()
+        self.assertEqual(counters, count_task_progress([self.task.id])[self.task.id])
+        self.assertEqual(counters['total'], 3)
+        self.assertEqual(counters['status_created'], 1)
+        self.assertEqual(counters['status_started'], 1)
+        self.assertEqual(counters['status_completed'], 1)
+        self.assertEqual(counters['stage_shift'], 1)
+        self.assertEqual(counters['stage_image_process'], 1)
+        self.assertEqual(counters['stage_completed'], 1)
+
+    def test_repeated_bulk_update_does_not_count_twice(self):
+        updates = [{'id': self.item.id, 'status': Status.ERROR}]
+        self.client.patch('/api/v1/items/bulk-update-status/', updates, format='json')
+        self.client.patch('/api/v1/items/bulk-update-status/', updates, format='json')
+
+        counters = self.get_counters()
+        self.assertEqual(counters['status_error'], 1)
+        self.assertEqual(counters['status_created'], 2)
+
+
+class CopyValueTestCase(SimpleTestCase):
+    """
+    Test case for the COPY text format of `copy_value`.
+    """
+
+    def test_null_and_booleans(self):
+        self.assertEqual(copy_value(None), '\\N')
+        self.assertEqual(copy_value(True), 't')
+        self.assertEqual(copy_value(False), 'f')
+        self.assertEqual(copy_value(5), '5')
+
+    def test_special_characters_are_escaped(self):
+        self.assertEqual(copy_value('a\tb'), 'a\\tb')
+        self.assertEqual(copy_value('a\nb\rc'), 'a\\nb\\rc')
+        self.assertEqual(copy_value('a\\b'), 'a\\\\b')
+        self.assertEqual(copy_value('\\N'), '\\\\N')
+        self.assertEqual(copy_value('\\t'), '\\\\t')
+
+
+@skipUnless(connection.vendor == 'postgresql', 'COPY requer PostgreSQL')
+class CopyItemsTestCase(TestCase):
+    """
+    Test case for the COPY import of items (`copy_items`).
+    """
+
+    def setUp(self):
+        setUp_Test_Case(self)
+
+    def test_special_characters_round_trip(self):
+        rows = [
+            ('10', 'Nome\tcom tab'),
+            ('11', 'Linha 1\nLinha 2\r'),
+            ('12', 'C:\\pasta\\N'),
+            ('13', '\\N'),
+            ('14', 'Joana D\'Arc "Ç"'),
+        ]
+        started = timezone.now()
+        ids = copy_items(self.task, self.robot, rows)
+
+        items = Item.objects.in_bulk(ids)
+        self.assertEqual(
+            [(items[item_id].os_number, items[item_id].os_name) for item_id in ids], rows
+        )
+        for item in items.values():
+            self.assertEqual(item.task_id, self.task)
+            self.assertEqual(item.robot_id, self.robot)
+            self.assertEqual(item.status, Status.CREATED)
+            self.assertEqual(item.stage, 'SHIFT')
+            self.assertFalse(item.is_authorized)
+            self.assertIsNone(item.started_at)
+            self.assertGreaterEqual(item.created_at, started)
+            self.assertGreaterEqual(item.updated_at, started)
+
+    def test_ids_come_from_sequence(self):
+        ids = copy_items(self.task, None, [('10', 'Nome'), ('11', 'Nome')])
+        self.assertEqual(len(set(ids)), 2)
+        self.assertGreater(min(ids), self.item.id)
+        self.assertIsNone(Item.objects.get(id=ids[0]).robot_id)
+        self.assertGreater(Item.objects.create(task_id=self.task, os_number='12').id, max(ids))
+
+    @override_settings(TASK_IMPORT_BACKEND='copy')
+    def test_insert_items_with_copy_updates_counters(self):
+        reconcile_task_progress([self.task.id])
+        insert_items(self.task, self.robot, [('10', 'Nome'), ('11', 'Nome')])
+        counters = TaskProgress.objects.filter(task_id=self.task.id).values(*COUNTER_FIELDS).get()
+        self.assertEqual(counters, count_task_progress([self.task.id])[self.task.id])
+        self.assertEqual(counters['total'], 3)
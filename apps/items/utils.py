@@ -1,6 +1,14 @@
-from django.db.models import Q, Count
-from datetime import datetime
+import io
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from datetime import timedelta
 from apps.items.models import Item
+from apps.items.notifications import notify_items_available
+from apps.tasks.progress import get_item_state, update_task_progress
 from apps.utils.choices import Status
 
 
@@ -26,33 +34,327 @@ def get_items(robots=None):
     return items
 
 
-def get_items_filtereds(robots):
+def get_claimable_items(stage, now=None, robot=None):
     """
-    Obtains the count of items assigned to each robot.
+    Itens de uma etapa que podem ser reivindicados por um robô: os CREATED
+    sem reserva ativa e os STARTED cuja reserva expirou (o robô que os
+    reivindicou não os concluiu a tempo). Itens COMPLETED e ERROR nunca são
+    entregues e, na etapa SISMAMA, apenas os autorizados (`is_authorized`),
+    como em `sismama-data`.
 
-    This function returns a list with the count of items assigned
-    to each robot for the current day and in the CREATED or STARTED states.
+    Com `robot`, apenas os itens atribuídos a ele ou ainda sem robô: a
+    divisão feita na importação e pelo rebalanceamento é respeitada.
 
     Args:
-        robots (List[Robot]): List of Robot objects for which
-        the count will be obtained.
+        stage (str): Etapa do processamento.
+        now (datetime, optional): Instante de referência para as reservas.
+        robot (Robot, optional): Robô que vai reivindicar os itens.
 
     Returns:
-        List[dict]: List of dictionaries with the item count for
-        each robot. Each dictionary has keys 'robot_id' and 'cantidad'.
+        QuerySet: Itens disponíveis na etapa.
     """
-    now = datetime.now().date()
-    status = [Status.CREATED, Status.STARTED]
+    now = now or timezone.now()
+    created = Q(status=Status.CREATED) & (
+        Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lt=now)
+    )
+    expired = Q(status=Status.STARTED, lease_expires_at__lt=now)
+    items = Item.objects.filter(created | expired, stage=stage)
+    if stage == 'SISMAMA':
+        items = items.filter(is_authorized=True)
+    if robot is not None:
+        items = items.filter(Q(robot_id__isnull=True) | Q(robot_id=robot))
+    return items
+
+
+def claim_items(robot, stage, limit, lease_seconds):
+    """
+    Reserva atomicamente até `limit` itens de uma etapa para um robô.
+
+    As linhas são bloqueadas com SELECT ... FOR UPDATE SKIP LOCKED, de modo
+    que robôs concorrentes nunca recebem o mesmo item. Os itens que podem
+    ser reivindicados são os de `get_claimable_items`: os atribuídos ao robô
+    e os ainda sem robô.
+
+    Args:
+        robot (Robot): Robô que está reivindicando os itens.
+        stage (str): Etapa do processamento (SHIFT, IMAGE_PROCESS, SISMAMA).
+        limit (int): Quantidade máxima de itens a reservar.
+        lease_seconds (int): Duração da reserva em segundos.
+
+    Returns:
+        Tuple[QuerySet, datetime]: Itens reservados e o fim da reserva.
+    """
+    now = timezone.now()
+    lease_expires_at = now + timedelta(seconds=lease_seconds)
+
+    with transaction.atomic():
+        rows = list(
+            get_claimable_items(stage, now, robot)
+            .select_for_update(skip_locked=True)
+            .order_by('created_at', 'id')
+            .values_list('id', 'task_id', 'status', 'stage')[:limit]
+        )
+        ids = [row[0] for row in rows]
+        Item.objects.filter(id__in=ids).update(
+            robot_id=robot,
+            started_at=now,
+            status=Status.STARTED,
+            lease_expires_at=lease_expires_at,
+            updated_at=now,
+        )
+        update_task_progress(
+            removed=Counter((task_id, status, stage) for _, task_id, status, stage in rows),
+            added=Counter((task_id, Status.STARTED, stage) for _, task_id, _, stage in rows),
+        )
+
+    items = Item.objects.filter(id__in=ids).order_by('created_at', 'id')
+    return items, lease_expires_at
+
+
+STATUS_UPDATE_FIELDS = [
+    'status',
+    'stage',
+    'started_at',
+    'ended_at',
+    'bot_error_message',
+]
+
+
+def bulk_update_items_status(updates):
+    """
+    Aplica várias atualizações de status/etapa com um único bulk_update.
+
+    A reserva (lease) do item é liberada quando ele muda de etapa ou é
+    finalizado, da mesma forma que na atualização individual.
+
+    Args:
+        updates (List[dict]): Entradas já validadas, cada uma com `id` e os
+        campos a alterar.
+
+    Returns:
+        Dict[int, str]: Resultado por ID ('updated' ou 'not_found').
+    """
+    ids = [update['id'] for update in updates]
+    now = timezone.now()
+
+    with transaction.atomic():
+        items = Item.objects.select_for_update().only(
+            'id', 'task_id', 'lease_expires_at', 'updated_at', *STATUS_UPDATE_FIELDS
+        ).in_bulk(ids)
+
+        results = {}
+        new_stages = set()
+        removed = Counter(get_item_state(item) for item in items.values())
+        for update in updates:
+            item = items.get(update['id'])
+            if item is None:
+                results[update['id']] = 'not_found'
+                continue
+
+            stage_changed = 'stage' in update and update['stage'] != item.stage
+            if stage_changed:
+                new_stages.add(update['stage'])
+            if stage_changed or update.get('status') in [
+                Status.COMPLETED,
+                Status.ERROR,
+            ]:
+                item.lease_expires_at = None
+
+            for field in STATUS_UPDATE_FIELDS:
+                if field in update:
+                    setattr(item, field, update[field])
+            item.updated_at = now
+            results[item.id] = 'updated'
+
+        Item.objects.bulk_update(
+            items.values(),
+            STATUS_UPDATE_FIELDS + ['lease_expires_at', 'updated_at'],
+        )
+        update_task_progress(
+            removed=removed,
+            added=Counter(get_item_state(item) for item in items.values()),
+        )
+        notify_items_available(*new_stages)
+
+    return results
+
+
+def copy_value(value):
+    """
+    Formata um valor para o formato texto do COPY do PostgreSQL.
+    """
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+    )
 
-    items_count = Item.objects.filter(
-        created_at__date=now,
-        status__in=status,
-        robot_id__in=robots
-    ).values('robot_id').annotate(cantidad=Count('id'))
-    robots_with_counts = {
-        robot['robot_id']: robot['cantidad'] for robot in items_count
-    }
-
-    result = [{'robot_id': robot.id, 'cantidad': robots_with_counts.get(
-        robot.id, 0)} for robot in robots]
-    return result
+
+def copy_items(task, robot, rows):
+    """
+    Insere itens com `COPY ... FROM STDIN`, sem instanciar um Item por linha.
+
+    As colunas que não vêm do arquivo recebem os mesmos valores que o Django
+    usaria em `Item(...)`: o default do campo, o horário atual em campos
+    `auto_now`/`auto_now_add` e NULL nos demais. Os IDs são reservados antes
+    na sequência da tabela, já que o COPY não os retorna.
+
+    Parâmetros:
+    - task (Task): Tarefa dos itens.
+    - robot (Robot | None): Robô atribuído aos itens.
+    - rows (List[Tuple[str, str]]): Número e nome da OS de cada item.
+
+    Retorna:
+    List[int]: IDs dos itens inseridos.
+    """
+    quote = connection.ops.quote_name
+    table = Item._meta.db_table
+    pk_column = Item._meta.pk.column
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)',
+            [quote(table), pk_column, len(rows)],
+        )
+        ids = [row[0] for row in cursor.fetchall()]
+
+    now = timezone.now()
+    values = {'task_id': task.pk, 'robot_id': robot.pk if robot else None}
+    columns, prefix = [], []
+    for field in Item._meta.concrete_fields:
+        if field.primary_key or field.name in ('os_number', 'os_name'):
+            continue
+        if field.name in values:
+            value = values[field.name]
+        elif getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+            value = now
+        elif field.has_default():
+            value = field.get_default()
+        else:
+            value = None
+        columns.append(field.column)
+        prefix.append(copy_value(field.get_db_prep_save(value, connection)))
+    columns = [pk_column] + columns + ['os_number', 'os_name']
+    prefix = '\t'.join(prefix)
+
+    buffer = io.StringIO()
+    for item_id, (os_number, os_name) in zip(ids, rows):
+        buffer.write(f'{item_id}\t{prefix}\t{copy_value(os_number)}\t{copy_value(os_name)}\n')
+    buffer.seek(0)
+
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f'COPY {quote(table)} '
+            f'({", ".join(quote(column) for column in columns)}) FROM STDIN',
+            buffer,
+        )
+    return ids
+
+
+def insert_items(task, robot, rows):
+    """
+    Insere itens de uma tarefa pelo backend de importação configurado.
+
+    Por padrão usa `bulk_create`; com `TASK_IMPORT_BACKEND = 'copy'` e
+    PostgreSQL, usa `copy_items`. Os contadores da tarefa são atualizados na
+    mesma transação.
+
+    Parâmetros:
+    - task (Task): Tarefa dos itens.
+    - robot (Robot | None): Robô atribuído aos itens.
+    - rows (List[Tuple[str, str]]): Número e nome da OS de cada item.
+
+    Retorna:
+    List[int]: IDs dos itens inseridos.
+    """
+    with transaction.atomic():
+        if settings.TASK_IMPORT_BACKEND == 'copy' and connection.vendor == 'postgresql':
+            ids = copy_items(task, robot, rows)
+        else:
+            items = Item.objects.bulk_create(
+                [
+                    Item(task_id=task, robot_id=robot, os_number=os_number, os_name=os_name)
+                    for os_number, os_name in rows
+                ],
+                batch_size=settings.TASK_IMPORT_BATCH_SIZE,
+            )
+            ids = [item.pk for item in items]
+        update_task_progress(added=Counter({(task.pk, Status.CREATED, 'SHIFT'): len(rows)}))
+    return ids
+
+
+def get_pending_os_numbers(process, os_numbers):
+    """
+    Filtra os números de OS que já têm item pendente (CREATED/STARTED) em
+    tarefas do processo, com uma única query (índice `item_pending_os_idx`).
+
+    Parâmetros:
+    - process (Process): O processo das tarefas.
+    - os_numbers (Iterable[str]): Números de OS a verificar.
+
+    Retorna:
+    Set[str]: Os números de OS pendentes.
+    """
+    return set(
+        Item.objects.filter(
+            os_number__in=list(os_numbers),
+            status__in=[Status.CREATED, Status.STARTED],
+            task_id__process_id=process,
+        ).values_list('os_number', flat=True)
+    )
+
+
+def update_items(queryset, **fields):
+    """
+    `queryset.update(**fields)` que mantém os contadores das tarefas.
+
+    As linhas são bloqueadas e lidas antes da alteração apenas quando o
+    status ou a etapa mudam; `updated_at` é preenchido se não for informado.
+
+    Retorna:
+    int: Quantidade de itens alterados.
+    """
+    fields.setdefault('updated_at', timezone.now())
+    if 'status' not in fields and 'stage' not in fields:
+        return queryset.update(**fields)
+
+    with transaction.atomic():
+        rows = list(
+            queryset.select_for_update()
+            .order_by()
+            .values_list('id', 'task_id', 'status', 'stage')
+        )
+        updated = Item.objects.filter(id__in=[row[0] for row in rows]).update(**fields)
+        update_task_progress(
+            removed=Counter((task_id, status, stage) for _, task_id, status, stage in rows),
+            added=Counter(
+                (task_id, fields.get('status', status), fields.get('stage', stage))
+                for _, task_id, status, stage in rows
+            ),
+        )
+    return updated
+
+
+def delete_items(queryset):
+    """
+    `queryset.delete()` que mantém os contadores das tarefas.
+
+    Retorna:
+    int: Quantidade de itens removidos.
+    """
+    with transaction.atomic():
+        rows = list(
+            queryset.select_for_update()
+            .order_by()
+            .values_list('id', 'task_id', 'status', 'stage')
+        )
+        Item.objects.filter(id__in=[row[0] for row in rows]).delete()
+        update_task_progress(
+            removed=Counter((task_id, status, stage) for _, task_id, status, stage in rows),
+        )
+    return len(rows)
@@ -1,11 +1,17 @@
+import json
 from collections import defaultdict
 from datetime import datetime
 from typing import Any, Dict
 
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import transaction
+from django.db.models import BooleanField, ExpressionWrapper, Prefetch, Q
 from django.db.models.query import QuerySet
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse
+from django.views import View
 from django.views.generic import ListView
 from django.views.generic.edit import UpdateView
 from drf_yasg import openapi
@@ -15,16 +21,56 @@ from rest_framework.decorators import action
 from rest_framework.exceptions import NotFound
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
 
+from apps.api.conditional import versioned_get
+from apps.api.fieldsets import (SPARSE_FIELDS_PARAMETERS, get_only_fields,
+                                get_sparse_fields)
+from apps.api.pagination import KeysetPagination
+from apps.core.pagination import KeysetPaginationMixin
 from apps.items.models import Item
+from apps.items.notifications import (notify_items_available, wait_for_items,
+                                      wait_slot)
+from apps.items.utils import (bulk_update_items_status, claim_items,
+                              delete_items, get_claimable_items)
 from apps.robots.models import Robot
 from apps.tasks.models import Task
+from apps.tasks.progress import get_item_state, update_item_progress
+from apps.utils.choices import Status
 from apps.values.models import ShiftData
-from apps.values.serializer import ShiftDataSerializer
 
-from .forms import ShiftDataForm
-from .serializer import (ItemSerializer, ShiftDataUpsertSerializer,
-                         TaskSummarySerializer)
+from .forms import SHIFT_DATA_MODAL_FIELDS, ShiftDataForm
+from .serializer import (ItemClaimSerializer, ItemSerializer,
+                         ItemStatusUpdateSerializer, ShiftDataUpsertSerializer,
+                         SismamaItemSerializer, TaskSummarySerializer)
+from .templatetags.date_filters import iso_to_datetime_local
+from .templatetags.readonly_tags import is_readonly
+
+# Colunas de texto grandes do item, que a lista de itens não carrega
+ITEM_TEXT_FIELDS = ['shift_result', 'image_result', 'sismama_result', 'bot_error_message']
+
+
+def sismama_querysets():
+    """
+    Dados dos quais dependem as respostas de `sismama-data`.
+    """
+    return [
+        Item.objects.filter(is_authorized=True, stage='SISMAMA'),
+        ShiftData.objects.filter(item__is_authorized=True, item__stage='SISMAMA'),
+    ]
+
+
+def by_stage_querysets(stage):
+    """
+    Dados dos quais dependem as respostas de `by-stage`: os itens da etapa,
+    as tarefas e os ShiftData embutidos neles.
+    """
+    items = Item.objects.filter(stage=stage)
+    return [
+        items,
+        Task.objects.filter(id__in=items.values('task_id')),
+        ShiftData.objects.filter(item__stage=stage),
+    ]
 
 
 class ItemViewSet(viewsets.ModelViewSet):
@@ -36,9 +82,44 @@ class ItemViewSet(viewsets.ModelViewSet):
     serializer_class = ItemSerializer
     permission_classes = [IsAuthenticated]
 
+    # Ações de leitura que aceitam ?fields= / ?exclude=
+    sparse_fields_actions = ('list', 'retrieve')
+
+    def get_sparse_fields(self):
+        """
+        Campos do item pedidos na requisição (todos, por padrão).
+        """
+        if not hasattr(self, '_sparse_fields'):
+            self._sparse_fields, _ = get_sparse_fields(self.request, ItemSerializer.Meta.fields)
+        return self._sparse_fields
+
+    def get_queryset(self):
+        """
+        Nas leituras, lê só as colunas pedidas e o ShiftData apenas se pedido.
+        """
+        queryset = super().get_queryset()
+        if self.action not in self.sparse_fields_actions:
+            return queryset
+        fields = self.get_sparse_fields()
+        queryset = queryset.only(*get_only_fields(Item, fields, required=('id', 'created_at')))
+        if 'shift_data' in fields:
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    'shift_data',
+                    queryset=ShiftData.objects.only('id', 'item_id', 'recipiente'),
+                )
+            )
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        if self.action in self.sparse_fields_actions:
+            kwargs.setdefault('fields', self.get_sparse_fields())
+        return super().get_serializer(*args, **kwargs)
+
     @swagger_auto_schema(
         operation_description='Listar todos os itens cadastrados.',
         operation_summary='Listar Itens',
+        manual_parameters=SPARSE_FIELDS_PARAMETERS,
     )
     def list(self, request, *args, **kwargs):
         """
@@ -59,6 +140,7 @@ class ItemViewSet(viewsets.ModelViewSet):
     @swagger_auto_schema(
         operation_description='Obter detalhes de um item específico pelo ID.',
         operation_summary='Detalhar Item',
+        manual_parameters=SPARSE_FIELDS_PARAMETERS,
     )
     def retrieve(self, request, *args, **kwargs):
         """
@@ -96,8 +178,29 @@ class ItemViewSet(viewsets.ModelViewSet):
         """
         return super().destroy(request, *args, **kwargs)
 
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            item = serializer.save()
+            update_item_progress(None, item)
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            item = Item.objects.select_for_update().get(pk=serializer.instance.pk)
+            previous_state = get_item_state(item)
+            item = serializer.save()
+            update_item_progress(previous_state, item)
+
+    def perform_destroy(self, instance):
+        delete_items(Item.objects.filter(pk=instance.pk))
+
     @swagger_auto_schema(
-        operation_description='Listar todos os itens em uma etapa específica (SHIFT, IMAGE_PROCESS, SISMAMA).',
+        operation_description=(
+            'Listar os itens em uma etapa específica (SHIFT, IMAGE_PROCESS, '
+            'SISMAMA), agrupados por tarefa. A resposta é paginada por cursor: '
+            'quando houver mais itens, o cabeçalho `X-Next-Cursor` traz o '
+            'valor a ser enviado em `cursor` na próxima chamada. `fields` e '
+            '`exclude` selecionam os campos dos itens.'
+        ),
         operation_summary='Listar Itens por Etapa',
         manual_parameters=[
             openapi.Parameter(
@@ -105,16 +208,32 @@ class ItemViewSet(viewsets.ModelViewSet):
                 openapi.IN_QUERY,
                 description='Etapa do processamento (SHIFT, IMAGE_PROCESS, SISMAMA).',
                 type=openapi.TYPE_STRING,
-            )
+            ),
+            openapi.Parameter(
+                'cursor',
+                openapi.IN_QUERY,
+                description='Cursor retornado em `X-Next-Cursor` pela página anterior.',
+                type=openapi.TYPE_STRING,
+            ),
+            openapi.Parameter(
+                'page_size',
+                openapi.IN_QUERY,
+                description='Quantidade de itens por página.',
+                type=openapi.TYPE_INTEGER,
+            ),
+            *SPARSE_FIELDS_PARAMETERS,
         ],
     )
     @action(detail=False, methods=['get'], url_path='by-stage')
+    @versioned_get(lambda request: by_stage_querysets(request.query_params.get('stage')))
     def list_by_stage(self, request):
         """
-        Lista todos os itens em uma etapa específica para processamento pelo robô.
+        Lista os itens em uma etapa específica para processamento pelo robô.
 
         Parâmetros:
         - stage (str): Etapa do processamento.
+        - cursor (str): Cursor da próxima página.
+        - page_size (int): Quantidade de itens por página.
         """
         stage = request.query_params.get('stage')
         if stage not in ['SHIFT', 'IMAGE_PROCESS', 'SISMAMA']:
@@ -125,11 +244,27 @@ class ItemViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        items_in_stage = Item.objects.filter(stage=stage).order_by(
-            'created_at'
+        fields, _ = get_sparse_fields(request, ItemSerializer.Meta.fields)
+
+        # Tarefa e recipiente vêm na mesma página: 1 query + 1 prefetch (só
+        # se o shift_data for pedido). Lê apenas as colunas pedidas
+        items_in_stage = (
+            Item.objects.filter(stage=stage)
+            .select_related('task_id')
+            .only(*get_only_fields(Item, fields, required=('id', 'created_at', 'task_id')))
         )
+        if 'shift_data' in fields:
+            items_in_stage = items_in_stage.prefetch_related(
+                Prefetch(
+                    'shift_data',
+                    queryset=ShiftData.objects.only('id', 'item_id', 'recipiente'),
+                )
+            )
 
-        if not items_in_stage.exists():
+        paginator = KeysetPagination()
+        items = paginator.paginate_queryset(items_in_stage, request, view=self)
+
+        if not items:
             return Response(
                 {'detail': f'Nenhum item encontrado na etapa {stage}.'},
                 status=status.HTTP_200_OK,
@@ -137,17 +272,150 @@ class ItemViewSet(viewsets.ModelViewSet):
 
         # Organiza os itens por tarefa usando um dicionário
         tasks_dict = defaultdict(list)
-        for item in items_in_stage:
+        for item in items:
             tasks_dict[item.task_id].append(item)
 
         response_data = []
-        for task, items in tasks_dict.items():
+        for task, task_items in tasks_dict.items():
             # Serializa os dados da tarefa usando o resumo da tarefa
             task_data = TaskSummarySerializer(task).data
-            task_data['items'] = ItemSerializer(items, many=True).data
+            task_data['items'] = ItemSerializer(task_items, many=True, fields=fields).data
             response_data.append(task_data)
 
-        return Response(response_data, status=status.HTTP_200_OK)
+        response = Response(response_data, status=status.HTTP_200_OK)
+        next_cursor = paginator.get_next_cursor()
+        if next_cursor:
+            response['X-Next-Cursor'] = next_cursor
+            response['Link'] = f'<{paginator.get_next_link()}>; rel="next"'
+        return response
+
+    @swagger_auto_schema(
+        operation_description=(
+            'Aguarda (long-poll) até haver itens disponíveis na etapa ou até o '
+            '`timeout` em segundos. Responde assim que um item é criado ou '
+            'muda para a etapa; em seguida o robô deve chamar `claim/`. '
+            'As esperas simultâneas são limitadas (`ITEM_WAIT_MAX_CONCURRENT`): '
+            'sem vaga, a resposta é imediata, com o cabeçalho `Retry-After` '
+            'quando não há itens.'
+        ),
+        operation_summary='Aguardar Itens na Etapa',
+        manual_parameters=[
+            openapi.Parameter(
+                'stage',
+                openapi.IN_QUERY,
+                description='Etapa do processamento (SHIFT, IMAGE_PROCESS, SISMAMA).',
+                type=openapi.TYPE_STRING,
+            ),
+            openapi.Parameter(
+                'timeout',
+                openapi.IN_QUERY,
+                description='Tempo máximo de espera em segundos (limitado pelo servidor).',
+                type=openapi.TYPE_INTEGER,
+            ),
+            openapi.Parameter(
+                'robot_id',
+                openapi.IN_QUERY,
+                description=(
+                    'ID do robô; considera só os itens atribuídos a ele ou sem robô, '
+                    'como no `claim/`.'
+                ),
+                type=openapi.TYPE_INTEGER,
+            ),
+        ],
+    )
+    @action(detail=False, methods=['get'], url_path='wait')
+    def wait(self, request):
+        """
+        Aguarda itens disponíveis em uma etapa.
+
+        Parâmetros:
+        - stage (str): Etapa do processamento.
+        - timeout (int): Tempo máximo de espera em segundos.
+        - robot_id (int, opcional): Considera só os itens que o robô pode
+          reivindicar.
+        """
+        stage = request.query_params.get('stage')
+        if stage not in ['SHIFT', 'IMAGE_PROCESS', 'SISMAMA']:
+            return Response(
+                {
+                    'detail': 'Etapa inválida. Use SHIFT, IMAGE_PROCESS ou SISMAMA.'
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            timeout = int(request.query_params.get('timeout', settings.ITEM_WAIT_MAX_TIMEOUT))
+        except ValueError:
+            return Response(
+                {'detail': 'timeout deve ser um número inteiro de segundos.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        timeout = max(0, min(timeout, settings.ITEM_WAIT_MAX_TIMEOUT))
+        robot_id = request.query_params.get('robot_id')
+        if robot_id is not None and not robot_id.isdigit():
+            return Response(
+                {'detail': 'robot_id deve ser um número inteiro.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        with wait_slot() as acquired:
+            # Sem vaga de espera livre, responde na hora; o robô tenta de novo
+            # após o `Retry-After`
+            available = wait_for_items(
+                stage,
+                timeout if acquired else 0,
+                lambda: get_claimable_items(stage, robot=robot_id).exists(),
+            )
+        response = Response(
+            {'stage': stage, 'available': available},
+            status=status.HTTP_200_OK,
+        )
+        if not acquired and not available:
+            response['Retry-After'] = settings.ITEM_WAIT_RECHECK_SECONDS
+        return response
+
+    @swagger_auto_schema(
+        operation_description=(
+            'Reserva atomicamente até `limit` itens de uma etapa para o robô '
+            'informado, entre os atribuídos a ele (pela divisão na importação '
+            'ou pelo rebalanceamento) e os ainda sem robô. Os itens retornados '
+            'ficam com status STARTED e '
+            'reservados até `lease_expires_at`; nenhum outro robô os recebe '
+            'enquanto a reserva estiver ativa.'
+        ),
+        operation_summary='Reivindicar Itens por Etapa',
+        request_body=ItemClaimSerializer,
+    )
+    @action(detail=False, methods=['post'], url_path='claim')
+    def claim(self, request):
+        """
+        Reserva itens de uma etapa para o robô que fez a chamada.
+
+        Parâmetros:
+        - robot_id (int): ID do robô.
+        - stage (str): Etapa do processamento.
+        - limit (int): Quantidade máxima de itens.
+        - lease_seconds (int): Duração da reserva em segundos.
+        """
+        serializer = ItemClaimSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        items, lease_expires_at = claim_items(
+            robot=data['robot_id'],
+            stage=data['stage'],
+            limit=data['limit'],
+            lease_seconds=data['lease_seconds'],
+        )
+
+        return Response(
+            {
+                'robot_id': data['robot_id'].id,
+                'stage': data['stage'],
+                'lease_expires_at': lease_expires_at,
+                'items': ItemSerializer(items, many=True).data,
+            },
+            status=status.HTTP_200_OK,
+        )
 
     @swagger_auto_schema(
         operation_description='Atualizar o status e a etapa de um item pelo seu ID e pelo `robot_id` associado.',
@@ -217,22 +485,95 @@ class ItemViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        try:
-            robot = Robot.objects.get(id=robot_id)
-            item = Item.objects.get(id=pk)
-        except (Robot.DoesNotExist, Item.DoesNotExist):
-            raise NotFound(detail='Robô ou item não encontrado.')
-
-        # Atualiza o status e a etapa do item
-        serializer = ItemSerializer(
-            instance=item, data=request.data, partial=True
-        )
-        if serializer.is_valid():
-            serializer.save()
-            return Response(serializer.data, status=status.HTTP_200_OK)
+        with transaction.atomic():
+            try:
+                robot = Robot.objects.get(id=robot_id)
+                item = Item.objects.select_for_update().get(id=pk)
+            except (Robot.DoesNotExist, Item.DoesNotExist):
+                raise NotFound(detail='Robô ou item não encontrado.')
+
+            # Libera a reserva quando o item muda de etapa ou é finalizado
+            item_stage = item.stage
+            previous_state = get_item_state(item)
+            release_lease = stage != item_stage or request.data.get('status') in [
+                Status.COMPLETED,
+                Status.ERROR,
+            ]
+
+            # Atualiza o status e a etapa do item
+            serializer = ItemSerializer(
+                instance=item, data=request.data, partial=True
+            )
+            if serializer.is_valid():
+                if release_lease:
+                    serializer.save(lease_expires_at=None)
+                else:
+                    serializer.save()
+                update_item_progress(previous_state, item)
+                if stage != item_stage:
+                    notify_items_available(stage)
+                return Response(serializer.data, status=status.HTTP_200_OK)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @swagger_auto_schema(
+        operation_description=(
+            'Atualiza status, etapa, datas e mensagem de erro de vários itens '
+            'em uma única chamada. Cada entrada é validada separadamente e as '
+            'válidas são aplicadas juntas em uma única transação.'
+        ),
+        operation_summary='Atualizar Status de Itens em Lote',
+        request_body=ItemStatusUpdateSerializer(many=True),
+    )
+    @action(detail=False, methods=['patch'], url_path='bulk-update-status')
+    def bulk_update_status(self, request):
+        """
+        Atualiza o status e a etapa de vários itens de uma vez.
+
+        Corpo: lista de objetos com `id`, `status`, `stage`, `started_at`,
+        `ended_at` e `bot_error_message` (todos opcionais, exceto `id`).
+
+        Retorna uma lista com o resultado de cada entrada: `updated`,
+        `not_found` ou `invalid` (com os erros de validação).
+        """
+        entries = request.data
+        if isinstance(entries, dict):
+            entries = entries.get('items')
+        if not isinstance(entries, list) or not entries:
+            return Response(
+                {'detail': 'Envie uma lista de itens para atualizar.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(entries) > settings.ITEM_BULK_UPDATE_MAX:
+            return Response(
+                {
+                    'detail': f'Máximo de {settings.ITEM_BULK_UPDATE_MAX} '
+                    'itens por chamada.'
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        results = []
+        valid_updates = []
+        for entry in entries:
+            serializer = ItemStatusUpdateSerializer(data=entry)
+            if serializer.is_valid():
+                valid_updates.append(serializer.validated_data)
+                results.append({'id': serializer.validated_data['id']})
+            else:
+                results.append({
+                    'id': entry.get('id') if isinstance(entry, dict) else None,
+                    'result': 'invalid',
+                    'errors': serializer.errors,
+                })
+
+        applied = bulk_update_items_status(valid_updates) if valid_updates else {}
+        for result in results:
+            if 'result' not in result:
+                result['result'] = applied[result['id']]
+
+        return Response(results, status=status.HTTP_200_OK)
+
     @swagger_auto_schema(
         operation_description='Autoriza a continuação do processamento do item.',
         operation_summary='Autorizar Item',
@@ -259,26 +600,40 @@ class ItemViewSet(viewsets.ModelViewSet):
         # Atualiza o campo is_authorized para True
         item.is_authorized = True
         item.save()
+        notify_items_available(item.stage)
 
         serializer = ItemSerializer(item)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
-    @action(detail=False, methods=['get'], url_path='sismama-data')
-    def get_sismama_data(self, request):
+    @staticmethod
+    def iter_sismama_data(chunk_size=None):
+        """
+        Percorre os itens autorizados na etapa SISMAMA junto com o ShiftData.
+
+        Uma única query com JOIN (ShiftData -> Item) é lida do banco em
+        blocos de `chunk_size` linhas; itens sem ShiftData ficam de fora.
+        """
+        chunk_size = chunk_size or settings.SISMAMA_STREAM_CHUNK_SIZE
         authorized = (
-            Item.objects.filter(is_authorized=True, stage='SISMAMA')
-            .prefetch_related('shift_data')
+            ShiftData.objects.filter(
+                item__is_authorized=True, item__stage='SISMAMA'
+            )
+            .select_related('item')
+            .order_by('item_id')
         )
+        for shift_data in authorized.iterator(chunk_size=chunk_size):
+            yield SismamaItemSerializer(
+                shift_data.item, context={'shift_data': shift_data}
+            ).data
 
-        result = []
-        for item in authorized:
-            sd = item.shift_data.first()
-            if not sd:
-                continue
-            item_data = ItemSerializer(item).data
-            sd_data = ShiftDataSerializer(sd).data
-
-            result.append({**item_data, 'shift_data': sd_data})
+    @swagger_auto_schema(
+        operation_description='Listar os itens autorizados na etapa SISMAMA com o ShiftData completo.',
+        operation_summary='Listar Dados do SISMAMA',
+    )
+    @action(detail=False, methods=['get'], url_path='sismama-data')
+    @versioned_get(lambda request: sismama_querysets())
+    def get_sismama_data(self, request):
+        result = list(self.iter_sismama_data())
 
         if not result:
             return Response(
@@ -286,6 +641,26 @@ class ItemViewSet(viewsets.ModelViewSet):
             )
         return Response(result, status=200)
 
+    @swagger_auto_schema(
+        operation_description=(
+            'Mesmo conteúdo de `sismama-data`, enviado em streaming no formato '
+            'NDJSON (um objeto JSON por linha). A memória do servidor não '
+            'cresce com o tamanho do resultado e o robô pode começar a '
+            'processar antes de a resposta terminar.'
+        ),
+        operation_summary='Exportar Dados do SISMAMA (NDJSON)',
+    )
+    @action(detail=False, methods=['get'], url_path='sismama-data/stream')
+    @versioned_get(lambda request: sismama_querysets())
+    def stream_sismama_data(self, request):
+        lines = (
+            json.dumps(row, cls=JSONEncoder, ensure_ascii=False) + '\n'
+            for row in self.iter_sismama_data()
+        )
+        return StreamingHttpResponse(
+            lines, content_type='application/x-ndjson'
+        )
+
     @swagger_auto_schema(
         operation_summary='Upsert de ShiftData por item',
         request_body=ShiftDataUpsertSerializer,
@@ -321,30 +696,45 @@ class ItemViewSet(viewsets.ModelViewSet):
         return Response(out.data, status=code)
 
 
-class ItemListView(LoginRequiredMixin, ListView):
+class ItemListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     """
     View to display the list of items associated with a task.
+
+    The list is keyset-paginated (see `KeysetPaginationMixin`). The large
+    text columns are not loaded: the page only shows whether they are
+    filled, and the modals fetch their contents from `ItemDetailsView`.
     """
 
     login_url = 'login'
     template_name = 'home/items.html'
+    paginate_by = 50
 
     def dispatch(self, request, *args: Any, **kwargs: Any):
         task_id = self.kwargs['task_id']
-        self.task = get_object_or_404(Task, id=task_id)
+        self.task = get_object_or_404(
+            Task.objects.select_related('process_id', 'progress'), id=task_id
+        )
         if request.user != self.task.user_id:
             return redirect(reverse('tasks'))
         return super().dispatch(request, *args, **kwargs)
 
     def get_queryset(self) -> QuerySet[Any]:
         """
-        Obtains the set of items associated with the task.
-        Also fetches the associated ShiftData.
+        Obtains the set of items associated with the task, with flags for
+        the filled text columns instead of their contents.
         """
-        queryset = Item.objects.filter(task_id=self.task).order_by('-id')
-        # Pré-carregar os dados de ShiftData para otimizar consultas
-        queryset = queryset.prefetch_related('shift_data')
-        return queryset
+        return (
+            Item.objects.filter(task_id=self.task)
+            .select_related('robot_id__user_id')
+            .defer(*ITEM_TEXT_FIELDS)
+            .annotate(**{
+                f'has_{field}': ExpressionWrapper(
+                    Q(**{f'{field}__isnull': False}) & ~Q(**{field: ''}),
+                    output_field=BooleanField(),
+                )
+                for field in ITEM_TEXT_FIELDS
+            })
+        )
 
     def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
         """
@@ -353,9 +743,62 @@ class ItemListView(LoginRequiredMixin, ListView):
         context = super().get_context_data(**kwargs)
         context['task'] = self.task
         context['segment'] = 'items'
+        context['paginate_by'] = self.get_paginate_by()
+        progress = getattr(self.task, 'progress', None)
+        context['total_count'] = progress.total if progress else None
         return context
 
 
+class ItemDetailsView(LoginRequiredMixin, View):
+    """
+    Conteúdo dos modais da lista de itens (valores do ShiftData, resultado
+    da imagem e erro do robô), carregado sob demanda ao abrir o modal.
+
+    Requer que o usuário esteja autenticado e seja o dono da tarefa do item.
+    """
+
+    login_url = 'login'
+
+    def get(self, request, pk):
+        item = get_object_or_404(
+            Item.objects.select_related('task_id').only(
+                'id', 'os_number', 'image_result', 'bot_error_message', 'task_id__user_id',
+            ),
+            pk=pk,
+        )
+        if item.task_id.user_id_id != request.user.id:
+            raise Http404
+
+        shift_data = item.shift_data.first()
+        fields = None
+        if shift_data is not None:
+            fields = []
+            for name, label, input_type in SHIFT_DATA_MODAL_FIELDS:
+                value = getattr(shift_data, name)
+                if input_type == 'date':
+                    display = value.strftime('%Y-%m-%d') if value else ''
+                elif input_type == 'datetime-local':
+                    display = iso_to_datetime_local(value)
+                else:
+                    display = '' if value is None else value
+                fields.append({
+                    'name': name,
+                    'label': label,
+                    'type': input_type,
+                    'value': display,
+                    'readonly': is_readonly(value),
+                })
+
+        return JsonResponse({
+            'id': item.id,
+            'os_number': item.os_number,
+            'image_result': item.image_result,
+            'bot_error_message': item.bot_error_message,
+            'shift_data': fields,
+            'update_url': reverse('item_update', args=[item.id]),
+        })
+
+
 class ItemUpdateView(LoginRequiredMixin, UpdateView):
     model = Item
     fields = []
@@ -1,9 +1,15 @@
 from django.contrib import admin
-from .models import Robot
+from .models import Robot, RobotHeartbeat
 
 
 @admin.register(Robot)
 class RobotAdmin(admin.ModelAdmin):
-    list_display = ('id', 'user_id', 'ip_address', 'platform', 'status')
+    list_display = ('id', 'user_id', 'ip_address', 'platform', 'status', 'capacity')
     list_filter = ('status', 'platform')
     search_fields = ('id', 'user_id__username', 'ip_address')
+
+
+@admin.register(RobotHeartbeat)
+class RobotHeartbeatAdmin(admin.ModelAdmin):
+    list_display = ('robot', 'last_seen', 'queue_depth', 'version')
+    search_fields = ('robot__ip_address',)
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.4 on 2026-10-18 07:52
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('robots', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='robot',
+            name='capacity',
+            field=models.PositiveIntegerField(default=1, help_text='Itens que o robô processa em paralelo; peso na distribuição de carga', validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.4 on 2026-10-18 07:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('robots', '0002_robot_capacity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RobotHeartbeat',
+            fields=[
+                ('robot', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='heartbeat', serialize=False, to='robots.robot')),
+                ('last_seen', models.DateTimeField(db_index=True)),
+                ('queue_depth', models.PositiveIntegerField(blank=True, help_text='Itens na fila local do robô', null=True)),
+                ('version', models.CharField(blank=True, default='', max_length=50)),
+            ],
+        ),
+    ]
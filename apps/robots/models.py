@@ -1,3 +1,4 @@
+from django.core.validators import MinValueValidator
 from django.db import models
 from django.contrib.auth.models import User
 from apps.utils.choices import Platform, StatusRobot
@@ -24,6 +25,33 @@ class Robot(models.Model):
         choices=StatusRobot.choices,
         default=StatusRobot.INACTIVE,
     )
+    capacity = models.PositiveIntegerField(
+        null=False,
+        blank=False,
+        default=1,
+        validators=[MinValueValidator(1)],
+        help_text="Itens que o robô processa em paralelo; peso na distribuição de carga",
+    )
 
     def __str__(self) -> str:
         return self.ip_address
+
+
+class RobotHeartbeat(models.Model):
+    """
+    Último sinal de vida de um robô (`robots/{id}/heartbeat/`).
+
+    Fica numa tabela própria e estreita para que os heartbeats, frequentes,
+    não reescrevam as linhas de `Robot` nem de `auth_user`.
+    """
+    robot = models.OneToOneField(
+        Robot, primary_key=True, on_delete=models.CASCADE, related_name='heartbeat'
+    )
+    last_seen = models.DateTimeField(db_index=True)
+    queue_depth = models.PositiveIntegerField(
+        null=True, blank=True, help_text="Itens na fila local do robô"
+    )
+    version = models.CharField(max_length=50, blank=True, default='')
+
+    def __str__(self) -> str:
+        return f'{self.robot_id} @ {self.last_seen}'
@@ -1,8 +1,14 @@
 from rest_framework.serializers import ModelSerializer
-from .models import Robot
+from .models import Robot, RobotHeartbeat
 
 
 class RobotSerializer(ModelSerializer):
     class Meta:
         model = Robot
         fields = '__all__'
+
+
+class RobotHeartbeatSerializer(ModelSerializer):
+    class Meta:
+        model = RobotHeartbeat
+        fields = ['queue_depth', 'version']
@@ -1,29 +1,36 @@
+import logging
+
 from django.db.models.signals import post_migrate
 from django.dispatch import receiver
 from django_celery_beat.models import PeriodicTask, IntervalSchedule
 from apps.core.celery import app
 from apps.robots.utils import (
+    alert_disconnected_robots,
+    assign_unassigned_items,
     check_disconnected_robots,
     change_status_inactive,
     get_active_robots,
-    get_min_robot,
-    assing_robots,
+    get_unassigned_items,
+    rebalance_robots,
     remove_robots,
 )
 from apps.items.utils import get_items
-from apps.tasks.utils import get_tasks_from_items
-from apps.core.memory_manager import get_memory
+from apps.robots.models import Robot
+from apps.tasks.models import Task
+from apps.tasks.utils import disable_robot_check, enable_robot_check
+
+logger = logging.getLogger(__name__)
 
 
 # Função para configurar intervalos e tarefas após as migrações
 @receiver(post_migrate)
 def setup_periodic_tasks(sender, **kwargs):
-    # Remover intervalos duplicados de 3 minutos
-    IntervalSchedule.objects.filter(every=3, period=IntervalSchedule.MINUTES).exclude(
-        pk=IntervalSchedule.objects.filter(every=3, period=IntervalSchedule.MINUTES)
-        .first()
-        .pk
-    ).delete()
+    # Remover intervalos duplicados de 3 minutos (em um banco novo ainda não há nenhum)
+    first = IntervalSchedule.objects.filter(every=3, period=IntervalSchedule.MINUTES).first()
+    if first is not None:
+        IntervalSchedule.objects.filter(every=3, period=IntervalSchedule.MINUTES).exclude(
+            pk=first.pk
+        ).delete()
 
     # Obter ou criar um cronograma de intervalo de 3 minutos
     schedule_handle, _ = IntervalSchedule.objects.get_or_create(
@@ -36,17 +43,37 @@ def setup_periodic_tasks(sender, **kwargs):
         name="handle_disconnected_robots",
         defaults={
             "interval": schedule_handle,
-            "task": "robots.tasks.handle_disconnected_robots",
+            "task": "apps.robots.tasks.handle_disconnected_robots",
+            "enabled": True,
+        },
+    )
+
+    # Criar ou atualizar a tarefa periódica "fail_stale_import_jobs"
+    PeriodicTask.objects.update_or_create(
+        name="fail_stale_import_jobs",
+        defaults={
+            "interval": schedule_handle,
+            "task": "tasks.fail_stale_import_jobs",
+            "enabled": True,
+        },
+    )
+
+    # Criar ou atualizar a tarefa periódica "rebalance_robots"
+    PeriodicTask.objects.update_or_create(
+        name="rebalance_robots",
+        defaults={
+            "interval": schedule_handle,
+            "task": "apps.robots.tasks.rebalance_robots_task",
             "enabled": True,
         },
     )
 
-    # Remover intervalos duplicados de 1 minuto
-    IntervalSchedule.objects.filter(every=1, period=IntervalSchedule.MINUTES).exclude(
-        pk=IntervalSchedule.objects.filter(every=1, period=IntervalSchedule.MINUTES)
-        .first()
-        .pk
-    ).delete()
+    # Remover intervalos duplicados de 1 minuto (em um banco novo ainda não há nenhum)
+    first = IntervalSchedule.objects.filter(every=1, period=IntervalSchedule.MINUTES).first()
+    if first is not None:
+        IntervalSchedule.objects.filter(every=1, period=IntervalSchedule.MINUTES).exclude(
+            pk=first.pk
+        ).delete()
 
     # Obter ou criar um cronograma de intervalo de 1 minuto
     schedule_check, _ = IntervalSchedule.objects.get_or_create(
@@ -59,50 +86,55 @@ def setup_periodic_tasks(sender, **kwargs):
         name="check_robots_every_minute",
         defaults={
             "interval": schedule_check,
-            "task": "robots.tasks.check_robots_every_minute",
-            "enabled": False,  # Tarefa começa desativada
+            "task": "apps.robots.tasks.check_robots_every_minute",
+            # Começa habilitada só se houver itens aguardando um robô
+            "enabled": get_unassigned_items().exists(),
         },
     )
 
 
 @app.task
 def handle_disconnected_robots():
-    robots_disconnecteds = check_disconnected_robots()
-
-    if robots_disconnecteds:
-        change_status_inactive(robots_disconnecteds)
-        items = get_items(robots_disconnecteds).all()
-        if items:
-            tasks = get_tasks_from_items(items)
-            remove_robots([items, tasks])
-            items = items.none()
-            tasks = tasks.none()
+    # IDs lidos antes de inativar os robôs: a consulta filtra pelos ativos
+    robot_ids = list(check_disconnected_robots().values_list('id', flat=True))
 
-    robots_active = get_active_robots()
-    if not robots_active:
-        periodic_task_check.enabled = True
-        periodic_task_check.save()
+    if robot_ids:
+        change_status_inactive(Robot.objects.filter(id__in=robot_ids))
+        alert_disconnected_robots(robot_ids)
+        items = get_items(robot_ids)
+        if items.exists():
+            # Só as tarefas de que os robôs são o principal: com a divisão
+            # na importação, as demais tarefas dos itens seguem com outros robôs
+            tasks = Task.objects.filter(robot_id__in=robot_ids)
+            remove_robots([tasks, items])
+            # Os itens liberados entram na fila sem robô
+            enable_robot_check()
 
 
 @app.task
 def check_robots_every_minute():
-    if periodic_task_handle.enabled:
-        periodic_task_handle.enabled = False
-        periodic_task_handle.save()
-
-    memory = get_memory()
-    robots = get_active_robots()
-    if robots:
-        if not memory.items.exists():
-            memory.items = get_items(robots=None).all()
-            if memory.items.exists():
-                robot = get_min_robot()
-                memory.task = get_tasks_from_items(memory.items).all()
-                assing_robots(memory.items, robot)
-                assing_robots(memory.task, robot)
-                memory.clear()
-            periodic_task_check.enabled = False
-            periodic_task_handle.enabled = True
-            periodic_task_handle.save()
-            periodic_task_check.enabled = False
-            periodic_task_check.save()
+    # Atribui a fila de itens sem robô; a tarefa fica habilitada até a fila
+    # esvaziar (ou enquanto não houver robô ativo)
+    if not get_active_robots().exists():
+        return
+    assign_unassigned_items()
+    if not get_unassigned_items().exists():
+        disable_robot_check()
+
+
+@app.task
+def rebalance_robots_task():
+    # Repassa itens não iniciados dos robôs sobrecarregados aos ociosos
+    rebalance_robots()
+
+
+def schedule_rebalance():
+    """
+    Enfileira o rebalanceamento no Celery. Uma falha ao publicar (broker
+    fora do ar) só é registrada no log: o rebalanceamento periódico cobre a
+    execução perdida.
+    """
+    try:
+        rebalance_robots_task.delay()
+    except Exception:
+        logger.exception("Falha ao enfileirar o rebalanceamento dos robôs")
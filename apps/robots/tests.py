@@ -1,7 +1,25 @@
-from django.test import TestCase
-from .models import Robot
-from .views import RobotAPIView
-from apps.utils.choices import StatusRobot
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from .models import Robot, RobotHeartbeat
+from .tasks import handle_disconnected_robots
+from .utils import (
+    assign_unassigned_items,
+    check_disconnected_robots,
+    distribute_items,
+    get_unassigned_items,
+    rebalance_robots,
+    record_heartbeat,
+)
+from apps.alerts.models import RobotAlert
+from apps.api.pagination import KeysetPagination
+from apps.items.models import Item
+from apps.tasks.models import Task
+from apps.utils.choices import Status, StatusRobot
 from apps.api.tests import setUp_Test_Case
 
 # Create your tests here.
@@ -9,9 +27,10 @@ from apps.api.tests import setUp_Test_Case
 
 class RobotAPIViewTestCase(TestCase):
     """
-    Test case for the RobotAPIView.
+    Test case for the RobotViewSet.
 
-    This test case includes tests for getting and patching robot information.
+    This test case includes tests for listing, getting and patching robot
+    information.
 
     Inherits from:
         TestCase
@@ -32,13 +51,7 @@ class RobotAPIViewTestCase(TestCase):
         It sends a GET request with a valid robot_id and asserts
         the response status code and data.
         """
-        url = '/robots/'
-        data = {'robot_id': self.robot.id}
-        request = self.factory.get(url, data)
-        request.user = self.user
-        # Token Auth para el header
-        request.META['HTTP_AUTHORIZATION'] = f'Token {self.token.key}'
-        response = RobotAPIView.as_view()(request)
+        response = self.client.get(f'/api/v1/robots/{self.robot.id}/')
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.data['ip_address'], '0.0.0.0')
 
@@ -49,29 +62,20 @@ class RobotAPIViewTestCase(TestCase):
         It sends a GET request with an invalid robot_id and asserts
         the response status code.
         """
-        url = '/robots/'
-        data = {'robot_id': 999}  # ID no existente
-        request = self.factory.get(url, data)
-        request.user = self.user
-        # Token Auth para el header
-        request.META['HTTP_AUTHORIZATION'] = f'Token {self.token.key}'
-        response = RobotAPIView.as_view()(request)
+        response = self.client.get('/api/v1/robots/999/')  # ID no existente
         self.assertEqual(response.status_code, 404)
 
-    def test_get_robot_bad_request(self):
+    def test_patch_robot_bad_request(self):
         """
-        Test getting robot information with bad request data.
+        Test patching a robot with invalid data.
 
-        It sends a GET request with missing or invalid data
+        It sends a PATCH request with an invalid status
         and asserts the response status code.
         """
-        url = '/robots/'
-        data = {'robot_id': ''}  # ID inválido
-        request = self.factory.get(url, data)
-        request.user = self.user
-        # Token Auth para el header
-        request.META['HTTP_AUTHORIZATION'] = f'Token {self.token.key}'
-        response = RobotAPIView.as_view()(request)
+        response = self.client.patch(
+            f'/api/v1/robots/{self.robot.id}/update-status/',
+            {'status': 'UNKNOWN'}, format='json',
+        )
         self.assertEqual(response.status_code, 400)
 
     def test_patch_robot(self):
@@ -81,18 +85,249 @@ class RobotAPIViewTestCase(TestCase):
         It sends a PATCH request to update the robot's status
         and asserts the response status code and updated status.
         """
-        url = '/robots/'
-        data = {
-            'robot_id': self.robot.id,
-            'status': StatusRobot.INACTIVE
-        }
-        query_params = '?' + \
-            '&'.join(f'{key}={value}' for key, value in data.items())
-        request = self.factory.patch(url + query_params)
-        request.user = self.user
-        # Token Auth para el header
-        request.META['HTTP_AUTHORIZATION'] = f'Token {self.token.key}'
-        response = RobotAPIView.as_view()(request)
+        response = self.client.patch(
+            f'/api/v1/robots/{self.robot.id}/update-status/',
+            {'status': StatusRobot.INACTIVE}, format='json',
+        )
         self.assertEqual(response.status_code, 200)
         self.assertEqual(Robot.objects.get(
             id=self.robot.id).status, StatusRobot.INACTIVE)
+
+    def test_list_robots(self):
+        """
+        Test listing robots page by page with the keyset cursor.
+
+        Robot has no `created_at`, so the list is ordered by `id`.
+        """
+        for number in range(1, 4):
+            create_robot(number, status=StatusRobot.INACTIVE)
+
+        ids = []
+        url = '/api/v1/robots/?page_size=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids += [robot['id'] for robot in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(ids, list(Robot.objects.order_by('id').values_list('id', flat=True)))
+
+    def test_pagination_falls_back_to_id(self):
+        """
+        Test the default keyset ordering of a model without `created_at`.
+        """
+        paginator = KeysetPagination()
+        self.assertEqual(paginator.get_ordering(None, Robot.objects.all()), ('id',))
+
+
+def create_robot(number, capacity=1, status=StatusRobot.ACTIVE):
+    user = User.objects.create_user(username=f'robot{number}')
+    return Robot.objects.create(
+        user_id=user, ip_address=f'10.0.0.{number}', capacity=capacity, status=status
+    )
+
+
+class RobotDistributionTestCase(TestCase):
+    """
+    Test case for the item distribution between robots.
+    """
+
+    def setUp(self):
+        setUp_Test_Case(self)
+
+    def test_distribute_items_by_load_and_capacity(self):
+        """
+        Os mais ociosos são completados primeiro; o resto segue as capacidades.
+        """
+        # self.robot tem 1 item aberto
+        idle = create_robot(1)
+        large = create_robot(2, capacity=2)
+        shares = {robot.id: count for robot, count in distribute_items(11)}
+        self.assertEqual(shares, {self.robot.id: 2, idle.id: 3, large.id: 6})
+
+    def test_distribute_items_without_active_robots(self):
+        Robot.objects.update(status=StatusRobot.INACTIVE)
+        self.assertEqual(distribute_items(10), [])
+
+    def test_claim_respects_assignment(self):
+        """
+        Um robô reivindica os seus itens e os sem robô, nunca os de outro.
+        """
+        other = create_robot(1)
+        own = Item.objects.create(task_id=self.task, robot_id=other, os_number='2')
+        free = Item.objects.create(task_id=self.task, os_number='3')
+
+        response = self.client.post(
+            '/api/v1/items/claim/',
+            {'robot_id': other.id, 'stage': 'SHIFT', 'limit': 10},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            {item['id'] for item in response.data['items']}, {own.id, free.id}
+        )
+
+
+class RobotAssignmentTestCase(TestCase):
+    """
+    Test case for the assignment of the items queued without a robot.
+    """
+
+    def setUp(self):
+        setUp_Test_Case(self)
+        Robot.objects.filter(id=self.robot.id).update(status=StatusRobot.INACTIVE)
+        self.small = create_robot(1)
+        self.large = create_robot(2, capacity=3)
+        self.queued_task = Task.objects.create(user_id=self.user, process_id=self.process)
+        Item.objects.bulk_create(
+            [Item(task_id=self.queued_task, os_number=str(number)) for number in range(40)]
+        )
+        self.finished = Item.objects.create(
+            task_id=self.queued_task, os_number='done', status=Status.COMPLETED
+        )
+
+    def test_queue_is_split_by_capacity(self):
+        self.assertEqual(assign_unassigned_items(batch_size=15), 40)
+        self.assertEqual(Item.objects.filter(robot_id=self.small).count(), 10)
+        self.assertEqual(Item.objects.filter(robot_id=self.large).count(), 30)
+        self.assertFalse(get_unassigned_items().exists())
+        self.assertIsNotNone(Task.objects.get(id=self.queued_task.id).robot_id)
+
+    def test_assigned_and_finished_items_are_not_moved(self):
+        assign_unassigned_items()
+        self.assertEqual(Item.objects.get(id=self.item.id).robot_id, self.robot)
+        self.assertIsNone(Item.objects.get(id=self.finished.id).robot_id)
+
+    def test_queue_waits_without_active_robots(self):
+        Robot.objects.update(status=StatusRobot.INACTIVE)
+        self.assertEqual(assign_unassigned_items(), 0)
+        self.assertEqual(get_unassigned_items().count(), 40)
+
+
+class RobotRebalanceTestCase(TestCase):
+    """
+    Test case for the rebalancing of items between robots.
+    """
+
+    def setUp(self):
+        setUp_Test_Case(self)
+        Item.objects.bulk_create(
+            [Item(task_id=self.task, robot_id=self.robot, os_number=str(number))
+             for number in range(30)]
+            + [Item(task_id=self.task, robot_id=self.robot, status=Status.STARTED,
+                    os_number=str(number)) for number in range(30)]
+        )
+        self.idle = create_robot(1)
+
+    @override_settings(ROBOT_REBALANCE_THRESHOLD=5)
+    def test_rebalance_moves_only_created_items(self):
+        """
+        O robô sobrecarregado cede itens CREATED ao ocioso, nunca STARTED.
+        """
+        moves = rebalance_robots()
+        self.assertEqual(
+            [(donor.id, receiver.id, count) for donor, receiver, count in moves],
+            [(self.robot.id, self.idle.id, 30)],
+        )
+        self.assertEqual(
+            set(Item.objects.filter(robot_id=self.idle).values_list('status', flat=True)),
+            {Status.CREATED},
+        )
+        self.assertEqual(
+            Item.objects.filter(robot_id=self.robot, status=Status.STARTED).count(), 30
+        )
+        self.assertEqual(rebalance_robots(), [])
+
+    @override_settings(ROBOT_REBALANCE_THRESHOLD=5)
+    def test_rebalance_never_moves_finished_items(self):
+        Item.objects.filter(robot_id=self.robot, status=Status.CREATED).update(
+            status=Status.COMPLETED
+        )
+        Item.objects.create(
+            task_id=self.task, robot_id=self.robot, os_number='error', status=Status.ERROR
+        )
+        rebalance_robots()
+        self.assertFalse(Item.objects.filter(robot_id=self.idle).exists())
+
+    @override_settings(ROBOT_REBALANCE_THRESHOLD=5)
+    def test_rebalance_max_items(self):
+        self.assertEqual(rebalance_robots(max_items=0), [])
+        self.assertEqual(sum(count for _, _, count in rebalance_robots(max_items=7)), 7)
+
+    def test_activation_survives_broker_errors(self):
+        """
+        Ativar um robô responde 200 mesmo sem broker para o rebalanceamento.
+        """
+        self.idle.status = StatusRobot.INACTIVE
+        self.idle.save()
+        with mock.patch(
+            'apps.robots.tasks.rebalance_robots_task.delay', side_effect=OSError
+        ) as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.patch(
+                    f'/api/v1/robots/{self.idle.id}/update-status/',
+                    {'status': StatusRobot.ACTIVE}, format='json',
+                )
+        self.assertEqual(response.status_code, 200)
+        delay.assert_called_once()
+
+
+@override_settings(ROBOT_HEARTBEAT_INTERVAL=30, ROBOT_HEARTBEAT_TIMEOUT=180)
+class RobotHeartbeatTestCase(TestCase):
+    """
+    Test case for the robot heartbeats and the disconnection check.
+    """
+
+    def setUp(self):
+        setUp_Test_Case(self)
+        cache.clear()
+
+    def test_heartbeats_inside_interval_are_coalesced(self):
+        now = timezone.now()
+        self.assertTrue(record_heartbeat(self.robot, queue_depth=3, now=now))
+
+        # Mesmo processo: descartado pelo cache, sem acessar o banco
+        with self.assertNumQueries(0):
+            self.assertFalse(record_heartbeat(self.robot, queue_depth=5))
+
+        # Outro processo (cache vazio): o UPDATE condicional não grava
+        cache.clear()
+        later = now + timedelta(seconds=10)
+        self.assertFalse(record_heartbeat(self.robot, queue_depth=5, now=later))
+        heartbeat = RobotHeartbeat.objects.get(robot=self.robot)
+        self.assertEqual(heartbeat.last_seen, now)
+        self.assertEqual(heartbeat.queue_depth, 3)
+
+        cache.clear()
+        later = now + timedelta(seconds=31)
+        self.assertTrue(record_heartbeat(self.robot, queue_depth=5, now=later))
+        self.assertEqual(RobotHeartbeat.objects.get(robot=self.robot).last_seen, later)
+
+    def test_heartbeat_endpoint(self):
+        response = self.client.post(
+            f'/api/v1/robots/{self.robot.id}/heartbeat/',
+            {'queue_depth': 2, 'version': '1.0'}, format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+        heartbeat = RobotHeartbeat.objects.get(robot=self.robot)
+        self.assertEqual((heartbeat.queue_depth, heartbeat.version), (2, '1.0'))
+
+    def test_robot_without_recent_heartbeat_is_disconnected_once(self):
+        alive = create_robot(2)
+        record_heartbeat(alive)
+        RobotHeartbeat.objects.create(
+            robot=self.robot, last_seen=timezone.now() - timedelta(seconds=181)
+        )
+        self.assertEqual(list(check_disconnected_robots()), [self.robot])
+
+        handle_disconnected_robots()
+        handle_disconnected_robots()
+
+        self.robot.refresh_from_db()
+        alive.refresh_from_db()
+        self.assertEqual(self.robot.status, StatusRobot.INACTIVE)
+        self.assertEqual(alive.status, StatusRobot.ACTIVE)
+        self.assertIsNone(Item.objects.get(id=self.item.id).robot_id)
+        self.assertEqual(
+            list(RobotAlert.objects.values_list('robot_id', 'alert_type')),
+            [(self.robot.id, 'Timeout')],
+        )
@@ -1,9 +1,20 @@
+import heapq
+import logging
+from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Count, F, FloatField, OuterRef, Q, Subquery
+from django.db.models.functions import Cast, Coalesce, Greatest
 from datetime import timedelta
-from .models import Robot
-from apps.items.utils import get_items_filtereds
-from apps.utils.choices import StatusRobot
+from .models import Robot, RobotHeartbeat
+from apps.alerts.models import RobotAlert
+from apps.items.models import Item
+from apps.tasks.models import Task
+from apps.tasks.dashboard import invalidate_dashboard
+from apps.utils.choices import Status, StatusRobot
+
+logger = logging.getLogger(__name__)
 
 
 def get_active_robots():
@@ -17,38 +28,139 @@ def get_active_robots():
     return robots
 
 
-def get_min_robot():
+def get_robots_by_load():
+    """
+    Robôs ativos ordenados pela carga relativa, do menos para o mais carregado.
+
+    A carga é a quantidade de itens abertos (CREATED ou STARTED, de qualquer
+    data) atribuídos ao robô dividida pela sua capacidade. Os itens são
+    contados em uma subquery por robô (índice `item_open_robot_idx`), então
+    tudo é resolvido em uma única query; empates ficam com o menor ID.
+
+    Returns:
+        QuerySet: Robôs ativos com as anotações `open_items` e `load`.
+    """
+    open_items = (
+        Item.objects.filter(
+            robot_id=OuterRef('pk'),
+            status__in=[Status.CREATED, Status.STARTED],
+        )
+        .order_by()
+        .values('robot_id')
+        .annotate(count=Count('id'))
+        .values('count')
+    )
+    return (
+        get_active_robots()
+        .annotate(open_items=Coalesce(Subquery(open_items), 0))
+        .annotate(
+            load=Cast('open_items', FloatField()) / Greatest(F('capacity'), 1)
+        )
+        .order_by('load', 'id')
+    )
+
+
+def get_least_loaded_robot():
+    """
+    Obtém o robô ativo com a menor carga relativa (ver `get_robots_by_load`).
+
+    Returns:
+        Robot: O robô menos carregado, ou None se não houver robô ativo.
     """
-    Obtém o robô com o menor número de itens atribuídos a ele.
+    return get_robots_by_load().first()
+
 
-    Retorna:
-        Robô: Objeto robô com o número mínimo de itens atribuídos.
+def distribute_items(count, robots=None):
     """
-    robots = get_active_robots()
-    if not robots:
-        return None
-    items_count = get_items_filtereds(robots)
+    Divide `count` itens novos entre os robôs ativos conforme a carga atual e
+    a capacidade de cada um.
 
-    min_items_robot_id = min(items_count, key=lambda x: x['cantidad'])[
-        'robot_id']
+    Cada item vai para o robô que fica com a menor carga relativa
+    ((itens abertos + recebidos) / capacidade) após recebê-lo, então os itens
+    completam primeiro os robôs mais ociosos e, a partir daí, são repartidos
+    na proporção das capacidades.
 
-    robot = Robot.objects.get(id=min_items_robot_id)
-    return robot
+    Args:
+        count (int): Quantidade de itens a distribuir.
+        robots (List[Robot], optional): Robôs de `get_robots_by_load`; por
+            padrão, todos os ativos (uma query).
+
+    Returns:
+        List[Tuple[Robot, int]]: Robôs que recebem itens e quantos, na ordem
+        de carga. Vazia se não houver robô ativo.
+    """
+    robots = list(get_robots_by_load()) if robots is None else robots
+    if not robots or count <= 0:
+        return []
+
+    shares = [0] * len(robots)
+    heap = [
+        ((robot.open_items + 1) / max(robot.capacity, 1), index)
+        for index, robot in enumerate(robots)
+    ]
+    heapq.heapify(heap)
+    for _ in range(count):
+        _, index = heapq.heappop(heap)
+        shares[index] += 1
+        robot = robots[index]
+        heapq.heappush(
+            heap,
+            ((robot.open_items + shares[index] + 1) / max(robot.capacity, 1), index),
+        )
+    return [(robot, share) for robot, share in zip(robots, shares) if share]
 
 
 # UTILS PARA VERIFICAR ESTADO DE ROBOTS DESCONECTADOS Y ASIGNAR TAREAS A OTROS
 
+def record_heartbeat(robot, queue_depth=None, version='', now=None):
+    """
+    Registra um heartbeat do robô, gravando no máximo uma vez a cada
+    `ROBOT_HEARTBEAT_INTERVAL` segundos por robô.
+
+    Os heartbeats dentro do intervalo são descartados primeiro pelo cache
+    local do processo, sem acessar o banco, e, entre processos, pelo UPDATE
+    condicional, que não altera a linha se o último registro for recente.
+
+    Args:
+        robot (Robot): Robô que enviou o heartbeat.
+        queue_depth (int, optional): Itens na fila local do robô.
+        version (str, optional): Versão do robô.
+        now (datetime, optional): Instante do heartbeat.
+
+    Returns:
+        bool: Se o heartbeat foi gravado.
+    """
+    now = now or timezone.now()
+    interval = settings.ROBOT_HEARTBEAT_INTERVAL
+    if not cache.add(f'robots:heartbeat:{robot.pk}', True, timeout=interval):
+        return False
+
+    values = {'last_seen': now, 'queue_depth': queue_depth, 'version': version}
+    updated = RobotHeartbeat.objects.filter(
+        robot=robot, last_seen__lte=now - timedelta(seconds=interval)
+    ).update(**values)
+    if updated:
+        return True
+    _, created = RobotHeartbeat.objects.get_or_create(robot=robot, defaults=values)
+    return created
+
+
 def check_disconnected_robots():
     """
-    Verifies robots that have been disconnected for more than 3 minutes.
+    Robôs ativos sem heartbeat há mais de `ROBOT_HEARTBEAT_TIMEOUT` segundos.
+
+    Usa o índice de `RobotHeartbeat.last_seen`, em uma única query. Robôs que
+    nunca enviaram heartbeat continuam sendo avaliados pelo último login do
+    usuário.
 
     Returns:
         QuerySet: Set of disconnected robots.
     """
-    status = StatusRobot.ACTIVE
-    three = timezone.now() - timedelta(minutes=3)
-    filter = Q(user_id__last_login__lt=three) & Q(status=status)
-    robots = Robot.objects.filter(filter).prefetch_related('user_id')
+    limit = timezone.now() - timedelta(seconds=settings.ROBOT_HEARTBEAT_TIMEOUT)
+    filter = Q(heartbeat__last_seen__lt=limit) | Q(
+        heartbeat__isnull=True, user_id__last_login__lt=limit
+    )
+    robots = Robot.objects.filter(filter, status=StatusRobot.ACTIVE)
     return robots
 
 
@@ -60,7 +172,8 @@ def assing_robots(queryset, robot):
         queryset (QuerySet): Set of objects to update.
         robot (Robot): Robot object to which the items/tasks will be assigned.
     """
-    queryset.update(robot_id=robot)
+    queryset.update(robot_id=robot, updated_at=timezone.now())
+    invalidate_dashboard()
 
 
 def remove_robots(querysets: list):
@@ -73,7 +186,8 @@ def remove_robots(querysets: list):
     """
 
     for qs in querysets:
-        qs.update(robot_id=None)
+        qs.update(robot_id=None, updated_at=timezone.now())
+    invalidate_dashboard()
 
 
 def change_status_inactive(robots):
@@ -85,3 +199,178 @@ def change_status_inactive(robots):
         will be changed to INACTIVE.
     """
     robots.update(status=StatusRobot.INACTIVE)
+    invalidate_dashboard()
+
+
+def alert_disconnected_robots(robot_ids):
+    """
+    Gera um alerta de Timeout para cada robô desconectado.
+
+    Deve ser chamado só para os robôs que acabaram de sair de ACTIVE, para
+    que cada desconexão gere um único alerta.
+
+    Args:
+        robot_ids (List[int]): IDs dos robôs desconectados.
+    """
+    message = (
+        f'Robô sem heartbeat há mais de {settings.ROBOT_HEARTBEAT_TIMEOUT} '
+        'segundos; marcado como inativo e seus itens liberados.'
+    )
+    RobotAlert.objects.bulk_create(
+        [RobotAlert(robot_id=robot_id, alert_type='Timeout', message=message)
+         for robot_id in robot_ids]
+    )
+
+
+# FILA DE ITENS SEM ROBÔ
+
+def get_unassigned_items():
+    """
+    Fila de itens abertos (CREATED ou STARTED) sem robô: os importados sem
+    robô ativo e os liberados por robôs desconectados. Fica no próprio banco
+    (índice `item_unassigned_idx`), então é a mesma para todos os processos.
+
+    Returns:
+        QuerySet: Itens aguardando um robô.
+    """
+    return Item.objects.filter(
+        robot_id__isnull=True, status__in=[Status.CREATED, Status.STARTED]
+    )
+
+
+def assign_unassigned_items(batch_size=None, max_batches=None):
+    """
+    Distribui os itens da fila sem robô entre os robôs ativos, em lotes.
+
+    Cada lote é reivindicado com SELECT ... FOR UPDATE SKIP LOCKED, então
+    execuções concorrentes (em workers diferentes) nunca atribuem o mesmo
+    item, e repartido com `distribute_items` pela carga atual dos robôs. As
+    tarefas dos itens que estiverem sem robô recebem o menos carregado como
+    robô principal. O trabalho de cada chamada é limitado a `max_batches`
+    lotes de `batch_size` itens; o restante fica para a próxima.
+
+    Args:
+        batch_size (int, optional): Itens por lote
+            (padrão `ROBOT_ASSIGN_BATCH_SIZE`).
+        max_batches (int, optional): Lotes por chamada
+            (padrão `ROBOT_ASSIGN_MAX_BATCHES`).
+
+    Returns:
+        int: Quantidade de itens atribuídos.
+    """
+    batch_size = batch_size or settings.ROBOT_ASSIGN_BATCH_SIZE
+    max_batches = max_batches or settings.ROBOT_ASSIGN_MAX_BATCHES
+
+    assigned = 0
+    for _ in range(max_batches):
+        with transaction.atomic():
+            rows = list(
+                get_unassigned_items()
+                .select_for_update(skip_locked=True)
+                .order_by('id')
+                .values_list('id', 'task_id')[:batch_size]
+            )
+            shards = distribute_items(len(rows))
+            if not shards:
+                break
+
+            now = timezone.now()
+            start = 0
+            for robot, count in shards:
+                ids = [item_id for item_id, _ in rows[start:start + count]]
+                Item.objects.filter(id__in=ids).update(robot_id=robot, updated_at=now)
+                start += count
+            Task.objects.filter(
+                id__in={task_id for _, task_id in rows}, robot_id__isnull=True
+            ).update(robot_id=shards[0][0], updated_at=now)
+            invalidate_dashboard()
+
+        assigned += len(rows)
+        if len(rows) < batch_size:
+            break
+    return assigned
+
+
+# REBALANCEAMENTO ENTRE ROBÔS
+
+def rebalance_robots(threshold=None, max_items=None):
+    """
+    Move itens ainda não iniciados (CREATED) dos robôs sobrecarregados para os
+    ociosos.
+
+    A parte justa de cada robô é o total de itens abertos repartido pelas
+    capacidades. Robôs com mais de `threshold` itens acima da sua parte
+    cedem os itens CREATED mais novos (os últimos da sua fila) aos robôs
+    abaixo da parte, começando pelos menos carregados, até completá-los.
+    Itens STARTED nunca são movidos. As linhas são bloqueadas com
+    SELECT ... FOR UPDATE SKIP LOCKED, então itens sendo alterados no momento
+    ficam para a próxima execução. Cada movimentação é registrada no log.
+
+    Args:
+        threshold (int, optional): Excesso mínimo, em itens, para um robô
+            ceder itens (padrão `ROBOT_REBALANCE_THRESHOLD`).
+        max_items (int, optional): Máximo de itens movidos por chamada
+            (padrão `ROBOT_REBALANCE_MAX_ITEMS`).
+
+    Returns:
+        List[Tuple[Robot, Robot, int]]: Movimentações feitas (robô de
+        origem, robô de destino, quantidade).
+    """
+    threshold = settings.ROBOT_REBALANCE_THRESHOLD if threshold is None else threshold
+    max_items = settings.ROBOT_REBALANCE_MAX_ITEMS if max_items is None else max_items
+
+    robots = list(get_robots_by_load())
+    if len(robots) < 2:
+        return []
+    total_open = sum(robot.open_items for robot in robots)
+    total_capacity = sum(max(robot.capacity, 1) for robot in robots)
+
+    def get_surplus(robot):
+        return robot.open_items - total_open * max(robot.capacity, 1) / total_capacity
+
+    donors = [
+        (robot, int(get_surplus(robot)))
+        for robot in reversed(robots) if get_surplus(robot) > threshold
+    ]
+    receivers = [
+        [robot, int(-get_surplus(robot))]
+        for robot in robots if get_surplus(robot) <= -1
+    ]
+
+    moves = []
+    now = timezone.now()
+    with transaction.atomic():
+        for donor, surplus in donors:
+            wanted = min(surplus, max_items, sum(deficit for _, deficit in receivers))
+            if wanted <= 0:
+                break
+            ids = list(
+                Item.objects.filter(robot_id=donor, status=Status.CREATED)
+                .select_for_update(skip_locked=True)
+                .order_by('-id')
+                .values_list('id', flat=True)[:wanted]
+            )
+            start = 0
+            for receiver in receivers:
+                count = min(receiver[1], len(ids) - start)
+                if count <= 0:
+                    continue
+                Item.objects.filter(id__in=ids[start:start + count]).update(
+                    robot_id=receiver[0], updated_at=now
+                )
+                receiver[1] -= count
+                start += count
+                moves.append((donor, receiver[0], count))
+                logger.info(
+                    "Rebalanceamento: %d itens do robô %s (%d abertos) para o robô %s (%d abertos)",
+                    count, donor.id, donor.open_items, receiver[0].id, receiver[0].open_items,
+                )
+            max_items -= len(ids)
+        if moves:
+            invalidate_dashboard()
+
+    logger.info(
+        "Rebalanceamento: %d robôs ativos, %d itens abertos, %d itens movidos",
+        len(robots), total_open, sum(count for _, _, count in moves),
+    )
+    return moves
@@ -3,10 +3,16 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
-from .serializer import RobotSerializer
+from django.conf import settings
+from django.db import transaction
+from .serializer import RobotHeartbeatSerializer, RobotSerializer
 from .models import Robot
+from .tasks import schedule_rebalance
+from .utils import record_heartbeat
+from apps.tasks.utils import enable_robot_check
+from apps.utils.choices import StatusRobot
 from rest_framework.decorators import action
-from rest_framework.exceptions import NotFound
+from rest_framework.exceptions import NotFound, PermissionDenied
 
 class RobotViewSet(viewsets.ModelViewSet):
     """
@@ -15,6 +21,7 @@ class RobotViewSet(viewsets.ModelViewSet):
     queryset = Robot.objects.all()
     serializer_class = RobotSerializer
     permission_classes = [IsAuthenticated]
+    keyset_ordering = ('id',)
 
     @swagger_auto_schema(
         responses={200: RobotSerializer()}
@@ -48,9 +55,60 @@ class RobotViewSet(viewsets.ModelViewSet):
         except Robot.DoesNotExist:
             raise NotFound(detail="Robô não encontrado.")
 
+        previous_status = robot.status
         serializer = RobotSerializer(robot, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
+            if previous_status != StatusRobot.ACTIVE and robot.status == StatusRobot.ACTIVE:
+                # Robô ativado: recebe a fila sem robô e parte dos itens dos
+                # robôs sobrecarregados
+                transaction.on_commit(enable_robot_check)
+                transaction.on_commit(schedule_rebalance)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    @swagger_auto_schema(
+        request_body=RobotHeartbeatSerializer,
+        responses={
+            200: openapi.Response(
+                'Heartbeat recebido',
+                examples={'application/json': {
+                    'recorded': True, 'interval': 30, 'status': 'ACTIVE',
+                }},
+            ),
+            403: 'Proibido',
+            404: 'Não Encontrado',
+        },
+        operation_description=(
+            "Registra um sinal de vida do robô, opcionalmente com a quantidade de "
+            "itens na sua fila local (`queue_depth`) e a sua versão. Apenas o "
+            "usuário do robô pode enviá-lo. O registro é gravado no máximo uma vez "
+            "a cada `interval` segundos; heartbeats mais frequentes são aceitos "
+            "com `recorded: false`. Robôs ativos sem heartbeat por mais de "
+            "`ROBOT_HEARTBEAT_TIMEOUT` segundos são marcados como inativos."
+        ),
+    )
+    @action(detail=True, methods=['post'])
+    def heartbeat(self, request, pk=None):
+        """
+        Registra um heartbeat do robô.
+        """
+        try:
+            robot = Robot.objects.only('id', 'user_id', 'status').get(pk=pk)
+        except (Robot.DoesNotExist, ValueError):
+            raise NotFound(detail="Robô não encontrado.")
+        if robot.user_id_id != request.user.id and not request.user.is_staff:
+            raise PermissionDenied(detail="Apenas o próprio robô pode enviar heartbeats.")
+
+        serializer = RobotHeartbeatSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        recorded = record_heartbeat(robot, **serializer.validated_data)
+        return Response(
+            {
+                'recorded': recorded,
+                'interval': settings.ROBOT_HEARTBEAT_INTERVAL,
+                'status': robot.status,
+            },
+            status=status.HTTP_200_OK,
+        )
@@ -114,7 +114,8 @@
 
       const resposta = await fetch(url);
       if (!resposta.ok) throw new Error(`Status ${resposta.status}`);
-      const alertas = await resposta.json();
+      const pagina = await resposta.json();
+      const alertas = pagina.results;
 
       if (alertas.length > 0) {
         if (!ultimoCreatedAt) {
@@ -0,0 +1,55 @@
+(() => {
+  const INTERVALO_MS = 2000;
+  const EM_ANDAMENTO = ["QUEUED", "PARSING", "INSERTING"];
+
+  const linhasEmAndamento = () =>
+    Array.from(document.querySelectorAll("#import-jobs tr[data-job-url]")).filter(
+      (linha) => EM_ANDAMENTO.includes(linha.dataset.status)
+    );
+
+  const atualizarLinha = (linha, job) => {
+    linha.dataset.status = job.status;
+    linha.querySelector('[data-field="task_id"]').textContent = job.task_id ?? "-";
+    linha.querySelector('[data-field="rows_processed"]').textContent = job.rows_processed;
+    linha.querySelector('[data-field="rows_rejected"]').textContent = job.rows_rejected;
+    linha.querySelector('[data-field="rows_deduplicated"]').textContent = job.rows_deduplicated;
+    const status = linha.querySelector('[data-field="status"]');
+    status.textContent = job.status;
+    status.title = job.error_message || "";
+  };
+
+  const consultarProgresso = async () => {
+    const linhas = linhasEmAndamento();
+    if (!linhas.length) {
+      return;
+    }
+
+    let concluiu = false;
+    await Promise.all(
+      linhas.map(async (linha) => {
+        try {
+          const response = await fetch(linha.dataset.jobUrl);
+          if (!response.ok) {
+            throw new Error(`Erro na requisição: ${response.statusText}`);
+          }
+          const job = await response.json();
+          atualizarLinha(linha, job);
+          if (job.status === "DONE") {
+            concluiu = true;
+          }
+        } catch (error) {
+          console.error("Erro ao consultar a importação:", error);
+        }
+      })
+    );
+
+    // Recarrega quando a última importação termina, para exibir a nova tarefa
+    if (concluiu && !linhasEmAndamento().length) {
+      window.location.reload();
+      return;
+    }
+    setTimeout(consultarProgresso, INTERVALO_MS);
+  };
+
+  document.addEventListener("DOMContentLoaded", consultarProgresso);
+})();
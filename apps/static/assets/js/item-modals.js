@@ -0,0 +1,89 @@
+(() => {
+  // Os modais da lista de itens são únicos na página; ao abrir, o conteúdo
+  // do item é buscado em /items/<id>/details/
+  const MODAIS = ["#item-values-modal", "#item-image-modal", "#item-error-modal"];
+
+  const criarCampo = (campo) => {
+    const grupo = document.createElement("div");
+    grupo.className = "mb-3";
+
+    const label = document.createElement("label");
+    label.htmlFor = `item-field-${campo.name}`;
+    label.textContent = campo.label;
+
+    const input = document.createElement("input");
+    input.type = campo.type;
+    input.name = campo.name;
+    input.id = `item-field-${campo.name}`;
+    input.className = "form-control";
+    input.value = campo.value ?? "";
+    if (campo.readonly) {
+      input.readOnly = true;
+      input.style.backgroundColor = "#e9ecef";
+    }
+
+    grupo.append(label, input);
+    return grupo;
+  };
+
+  const preencherModal = (modal, item) => {
+    modal.querySelectorAll("[data-item-form]").forEach((form) => {
+      form.action = item.update_url;
+    });
+    modal.querySelectorAll("[data-item-field]").forEach((elemento) => {
+      const campo = elemento.dataset.itemField;
+      if (campo === "shift_data") {
+        elemento.replaceChildren();
+        if (item.shift_data) {
+          item.shift_data.forEach((dado) => elemento.append(criarCampo(dado)));
+        } else {
+          const aviso = document.createElement("p");
+          aviso.textContent = "Não há valores criados.";
+          elemento.append(aviso);
+        }
+      } else if (campo === "image_result") {
+        elemento.value = item.image_result ?? "Sem resultados disponíveis";
+      } else {
+        elemento.textContent = item[campo] ?? "";
+      }
+    });
+  };
+
+  const carregarItem = async (event) => {
+    const modal = event.target;
+    const botao = event.relatedTarget;
+    if (!botao || !botao.dataset.itemId) {
+      return;
+    }
+
+    modal.querySelectorAll("[data-item-field]").forEach((elemento) => {
+      if (elemento.tagName === "TEXTAREA") {
+        elemento.value = "Carregando...";
+      } else {
+        elemento.textContent = "Carregando...";
+      }
+    });
+
+    try {
+      const response = await fetch(`/items/${botao.dataset.itemId}/details/`);
+      if (!response.ok) {
+        throw new Error(`Erro na requisição: ${response.statusText}`);
+      }
+      preencherModal(modal, await response.json());
+    } catch (error) {
+      console.error("Erro ao carregar o item:", error);
+      modal.querySelectorAll("[data-item-field]").forEach((elemento) => {
+        elemento.textContent = "Erro ao carregar o item.";
+      });
+    }
+  };
+
+  document.addEventListener("DOMContentLoaded", () => {
+    MODAIS.forEach((seletor) => {
+      const modal = document.querySelector(seletor);
+      if (modal) {
+        modal.addEventListener("show.bs.modal", carregarItem);
+      }
+    });
+  });
+})();
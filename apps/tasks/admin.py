@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Task
+from .models import ImportJob, Task
 
 @admin.register(Task)
 class TaskAdmin(admin.ModelAdmin):
@@ -19,3 +19,19 @@ class TaskAdmin(admin.ModelAdmin):
     # Ordenação padrão por data de criação
     ordering = ('-created_at',)
 
+
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    """
+    Customiza a visualização das importações de arquivos no Django Admin.
+    """
+    list_display = ('id', 'file_name', 'mode', 'status', 'rows_processed', 'rows_rejected',
+                    'rows_deduplicated', 'task_id', 'user_id', 'created_at', 'ended_at')
+    list_display_links = ('id',)
+    list_filter = ('status', 'created_at')
+    search_fields = ('id', 'file_name', 'file_hash', 'user_id__username')
+    readonly_fields = ('task_id', 'file_hash', 'status', 'rows_processed', 'rows_rejected',
+                       'rows_deduplicated', 'error_message', 'started_at', 'ended_at')
+    list_per_page = 20
+    ordering = ('-created_at',)
@@ -0,0 +1,154 @@
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+# Alias do cache do dashboard em settings.CACHES
+CACHE_ALIAS = 'dashboard'
+
+# Versões: as chaves das entradas incluem a versão global (robôs e
+# processos, vistos por todos os usuários) e a do usuário (tarefas e itens).
+# Invalidar é incrementar a versão; as entradas antigas expiram sozinhas
+GLOBAL_VERSION_KEY = 'dashboard:version'
+
+# Contadores de acertos e falhas do cache, somados entre os processos
+STATS_KEYS = {'hits': 'dashboard:stats:hits', 'misses': 'dashboard:stats:misses'}
+
+# Acessos acumulados no processo antes de somá-los aos contadores do cache,
+# para não escrever no cache a cada requisição
+STATS_FLUSH_EVERY = 50
+
+_stats = Counter()
+
+
+def get_dashboard_cache():
+    return caches[CACHE_ALIAS]
+
+
+def get_user_version_key(user_id):
+    return f'dashboard:version:user:{user_id}'
+
+
+def bump_versions(keys):
+    """
+    Incrementa as versões, criando as que não existirem.
+
+    Uma versão nova começa no instante atual (em ns), e não em 1: se a chave
+    for descartada pelo cache, as entradas gravadas com a versão anterior
+    não voltam a ser usadas.
+    """
+    cache = get_dashboard_cache()
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=None)
+
+
+def invalidate_dashboard(user_ids=None):
+    """
+    Invalida o dashboard dos usuários informados, ou de todos se `user_ids`
+    for None. A invalidação só é aplicada após o commit da transação atual,
+    para que nenhuma requisição guarde no cache os dados anteriores à escrita
+    com a versão nova.
+    """
+    if user_ids is None:
+        keys = [GLOBAL_VERSION_KEY]
+    else:
+        keys = [get_user_version_key(user_id) for user_id in set(user_ids)]
+    if keys:
+        transaction.on_commit(lambda: bump_versions(keys))
+
+
+def get_versions(user_id):
+    cache = get_dashboard_cache()
+    keys = [GLOBAL_VERSION_KEY, get_user_version_key(user_id)]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def get_dashboard_fragments(user_id, builders, shared=()):
+    """
+    Lê do cache as partes do dashboard de um usuário, calculando e gravando
+    as que faltarem. Todas as partes são lidas com um único `get_many`.
+
+    Parâmetros:
+    - user_id (int): Usuário do dashboard.
+    - builders (Dict[str, Callable[[], Any]]): Função que calcula cada parte.
+      O nome faz parte da chave, então deve incluir o que a parte varia
+      (página, tamanho da página, ...).
+    - shared (Iterable[str]): Partes iguais para todos os usuários (dependem
+      só da versão global).
+
+    Retorna:
+    Dict[str, Any]: Valor de cada parte.
+    """
+    cache = get_dashboard_cache()
+    global_version, user_version = get_versions(user_id)
+    keys = {
+        name: (
+            f'dashboard:{global_version}:{name}' if name in shared
+            else f'dashboard:{global_version}:{user_version}:{user_id}:{name}'
+        )
+        for name in builders
+    }
+
+    cached = cache.get_many(keys.values())
+    values = {}
+    missing = {}
+    for name, key in keys.items():
+        if key in cached:
+            values[name] = cached[key]
+        else:
+            values[name] = missing[key] = builders[name]()
+    if missing:
+        cache.set_many(missing, settings.DASHBOARD_CACHE_TIMEOUT)
+
+    record_stats(hits=len(keys) - len(missing), misses=len(missing))
+    return values
+
+
+def record_stats(hits=0, misses=0):
+    _stats['hits'] += hits
+    _stats['misses'] += misses
+    if sum(_stats.values()) >= STATS_FLUSH_EVERY:
+        flush_stats()
+
+
+def flush_stats():
+    """
+    Soma aos contadores do cache os acessos acumulados neste processo.
+    """
+    cache = get_dashboard_cache()
+    pending = dict(_stats)
+    _stats.clear()
+    for name, count in pending.items():
+        if not count:
+            continue
+        try:
+            cache.incr(STATS_KEYS[name], count)
+        except ValueError:
+            if not cache.add(STATS_KEYS[name], count, timeout=None):
+                cache.incr(STATS_KEYS[name], count)
+
+
+def get_cache_stats():
+    """
+    Acertos e falhas do cache do dashboard (partes lidas do cache e partes
+    recalculadas), de todos os processos.
+
+    Retorna:
+    dict: `hits`, `misses` e `hit_rate` (None se não houve acessos).
+    """
+    flush_stats()
+    values = get_dashboard_cache().get_many(STATS_KEYS.values())
+    stats = {name: values.get(key, 0) for name, key in STATS_KEYS.items()}
+    total = stats['hits'] + stats['misses']
+    stats['hit_rate'] = round(stats['hits'] / total, 4) if total else None
+    return stats
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.4 on 2026-10-18 06:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user_id', '-id'], name='task_user_id_desc_idx'),
+        ),
+    ]
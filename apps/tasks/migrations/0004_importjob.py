@@ -0,0 +1,36 @@
+# Generated by Django 4.2.4 on 2026-10-18 07:26
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('processes', '0001_initial'),
+        ('tasks', '0003_task_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file', models.FileField(blank=True, null=True, upload_to='imports/%Y/%m/%d/')),
+                ('file_name', models.CharField(blank=True, default='', max_length=255)),
+                ('status', models.CharField(choices=[('QUEUED', 'Queued'), ('PARSING', 'Parsing'), ('INSERTING', 'Inserting'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='QUEUED', max_length=50)),
+                ('rows_processed', models.PositiveIntegerField(default=0, help_text='Linhas do CSV lidas')),
+                ('rows_rejected', models.PositiveIntegerField(default=0, help_text='Linhas do CSV descartadas por erro')),
+                ('error_message', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('ended_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('process_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='processes.process')),
+                ('task_id', models.ForeignKey(blank=True, default=None, null=True, on_delete=django.db.models.deletion.SET_NULL, to='tasks.task')),
+                ('user_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
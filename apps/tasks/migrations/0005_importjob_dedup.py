@@ -0,0 +1,28 @@
+# Generated by Django 4.2.4 on 2026-10-18 07:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_importjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importjob',
+            name='file_hash',
+            field=models.CharField(blank=True, db_index=True, default='', help_text='SHA-256 do conteúdo do arquivo', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='importjob',
+            name='mode',
+            field=models.CharField(choices=[('SKIP', 'Skip'), ('MERGE', 'Merge'), ('FORCE', 'Force')], default='SKIP', help_text='Tratamento de arquivos e OS duplicados', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='importjob',
+            name='rows_deduplicated',
+            field=models.PositiveIntegerField(default=0, help_text='Linhas do CSV descartadas por duplicidade'),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 4.2.4 on 2026-10-18 07:33
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+import django.db.models.deletion
+
+
+STATUS_FIELDS = {
+    'CREATED': 'status_created',
+    'STARTED': 'status_started',
+    'COMPLETED': 'status_completed',
+    'ERROR': 'status_error',
+}
+STAGE_FIELDS = {
+    'SHIFT': 'stage_shift',
+    'IMAGE_PROCESS': 'stage_image_process',
+    'SISMAMA': 'stage_sismama',
+    'COMPLETED': 'stage_completed',
+}
+
+
+def fill_task_progress(apps, schema_editor):
+    """
+    Preenche os contadores das tarefas existentes a partir dos itens.
+    """
+    Item = apps.get_model('items', 'Item')
+    TaskProgress = apps.get_model('tasks', 'TaskProgress')
+
+    aggregates = {'total': Count('id')}
+    for status, field in STATUS_FIELDS.items():
+        aggregates[field] = Count('id', filter=Q(status=status))
+    for stage, field in STAGE_FIELDS.items():
+        aggregates[field] = Count('id', filter=Q(stage=stage))
+
+    rows = Item.objects.order_by().values('task_id').annotate(**aggregates)
+    TaskProgress.objects.bulk_create(
+        (TaskProgress(task_id=row.pop('task_id'), **row) for row in rows.iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_importjob_dedup'),
+        ('items', '0013_item_pending_os_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskProgress',
+            fields=[
+                ('task', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='progress', serialize=False, to='tasks.task')),
+                ('total', models.IntegerField(default=0)),
+                ('status_created', models.IntegerField(default=0)),
+                ('status_started', models.IntegerField(default=0)),
+                ('status_completed', models.IntegerField(default=0)),
+                ('status_error', models.IntegerField(default=0)),
+                ('stage_shift', models.IntegerField(default=0)),
+                ('stage_image_process', models.IntegerField(default=0)),
+                ('stage_sismama', models.IntegerField(default=0)),
+                ('stage_completed', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(fill_task_progress, migrations.RunPython.noop),
+    ]
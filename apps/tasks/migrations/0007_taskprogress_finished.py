@@ -0,0 +1,40 @@
+# Generated by Django 4.2.4 on 2026-10-18 08:25
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_finished(apps, schema_editor):
+    """
+    Preenche o contador de itens finalizados das tarefas existentes.
+    """
+    Item = apps.get_model('items', 'Item')
+    TaskProgress = apps.get_model('tasks', 'TaskProgress')
+
+    finished = (
+        Item.objects.filter(task_id=OuterRef('task_id'))
+        .filter(Q(stage='COMPLETED') | Q(status='ERROR'))
+        .order_by()
+        .values('task_id')
+        .annotate(count=Count('id'))
+        .values('count')
+    )
+    TaskProgress.objects.update(finished=Coalesce(Subquery(finished), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_taskprogress'),
+        ('items', '0013_item_pending_os_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskprogress',
+            name='finished',
+            field=models.IntegerField(default=0, help_text='Itens na etapa COMPLETED ou com status ERROR'),
+        ),
+        migrations.RunPython(fill_finished, migrations.RunPython.noop),
+    ]
@@ -2,7 +2,7 @@ from django.db import models
 from django.contrib.auth.models import User
 from apps.processes.models import Process
 from apps.robots.models import Robot
-from apps.utils.choices import Status
+from apps.utils.choices import ImportMode, ImportStatus, Status
 
 # Create your models here.
 
@@ -18,9 +18,91 @@ class Task(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     started_at = models.DateTimeField(null=True, blank=True)
     ended_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
     status = models.CharField(null=False, blank=False, max_length=50,
                               choices=Status.choices,
                               default=Status.CREATED)
 
+    class Meta:
+        indexes = [
+            # Dashboard: tarefas do usuário ordenadas pela mais recente
+            models.Index(fields=['user_id', '-id'], name='task_user_id_desc_idx'),
+        ]
+
     def __str__(self) -> str:
         return str(self.id)
+
+
+class ImportJob(models.Model):
+    """
+    Importação em segundo plano do arquivo CSV de uma tarefa.
+
+    O arquivo enviado no dashboard é salvo no storage e processado por uma
+    task do Celery, que atualiza o estado e os contadores de linhas para o
+    dashboard acompanhar o progresso.
+    """
+    user_id = models.ForeignKey(to=User, null=False, blank=False,
+                                on_delete=models.CASCADE, db_index=True)
+    process_id = models.ForeignKey(to=Process, null=False, blank=False,
+                                   on_delete=models.CASCADE)
+    task_id = models.ForeignKey(to=Task, null=True, blank=True, default=None,
+                                on_delete=models.SET_NULL)
+
+    file = models.FileField(upload_to='imports/%Y/%m/%d/', null=True, blank=True)
+    file_name = models.CharField(max_length=255, null=False, blank=True, default='')
+    file_hash = models.CharField(max_length=64, null=False, blank=True, default='',
+                                 db_index=True, help_text='SHA-256 do conteúdo do arquivo')
+    mode = models.CharField(null=False, blank=False, max_length=50,
+                            choices=ImportMode.choices, default=ImportMode.SKIP,
+                            help_text='Tratamento de arquivos e OS duplicados')
+    status = models.CharField(null=False, blank=False, max_length=50,
+                              choices=ImportStatus.choices,
+                              default=ImportStatus.QUEUED)
+    rows_processed = models.PositiveIntegerField(default=0, help_text='Linhas do CSV lidas')
+    rows_rejected = models.PositiveIntegerField(default=0, help_text='Linhas do CSV descartadas por erro')
+    rows_deduplicated = models.PositiveIntegerField(default=0, help_text='Linhas do CSV descartadas por duplicidade')
+    error_message = models.TextField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    ended_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f'{self.id} - {self.file_name}'
+
+
+class TaskProgress(models.Model):
+    """
+    Contadores de itens de uma tarefa, por status e por etapa.
+
+    Mantidos por `apps.tasks.progress` nos caminhos que criam, alteram ou
+    removem itens, para que o dashboard e os robôs leiam o progresso sem
+    contar os itens. O comando `reconcile_task_progress` corrige desvios.
+    """
+    task = models.OneToOneField(to=Task, primary_key=True, on_delete=models.CASCADE,
+                                related_name='progress')
+
+    total = models.IntegerField(default=0)
+    finished = models.IntegerField(default=0,
+                                   help_text='Itens na etapa COMPLETED ou com status ERROR')
+    status_created = models.IntegerField(default=0)
+    status_started = models.IntegerField(default=0)
+    status_completed = models.IntegerField(default=0)
+    status_error = models.IntegerField(default=0)
+    stage_shift = models.IntegerField(default=0)
+    stage_image_process = models.IntegerField(default=0)
+    stage_sismama = models.IntegerField(default=0)
+    stage_completed = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def done(self) -> int:
+        """
+        Itens finalizados (na etapa COMPLETED ou com status ERROR).
+        """
+        return self.finished
+
+    def __str__(self) -> str:
+        return f'{self.task_id}: {self.done}/{self.total}'
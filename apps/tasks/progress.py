@@ -0,0 +1,301 @@
+from collections import Counter, defaultdict
+
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Min, Q
+from django.db.models.functions import Coalesce
+from django.dispatch import Signal
+from django.utils import timezone
+
+from apps.items.models import Item
+from apps.utils.choices import Status
+from .models import Task, TaskProgress
+
+# Contador de TaskProgress correspondente a cada status e etapa do item
+STATUS_FIELDS = {
+    Status.CREATED: 'status_created',
+    Status.STARTED: 'status_started',
+    Status.COMPLETED: 'status_completed',
+    Status.ERROR: 'status_error',
+}
+STAGE_FIELDS = {
+    'SHIFT': 'stage_shift',
+    'IMAGE_PROCESS': 'stage_image_process',
+    'SISMAMA': 'stage_sismama',
+    'COMPLETED': 'stage_completed',
+}
+# `finished`: itens finalizados, isto é, na etapa COMPLETED ou com status
+# ERROR (um item nos dois casos conta uma vez só)
+COUNTER_FIELDS = ['total', 'finished', *STATUS_FIELDS.values(), *STAGE_FIELDS.values()]
+
+# Enviado quando os contadores de tarefas mudam, isto é, em toda escrita que
+# cria, remove ou muda o status/etapa de itens (inclusive em lote, que não
+# dispara post_save). Argumento: `task_ids`
+items_changed = Signal()
+
+
+def get_item_state(item):
+    """
+    Chave de contagem de um item: (tarefa, status, etapa).
+    """
+    return (item.task_id_id, item.status, item.stage)
+
+
+def is_finished(status, stage):
+    """
+    Indica se um item no estado (status, etapa) está finalizado.
+    """
+    return stage == 'COMPLETED' or status == Status.ERROR
+
+
+def get_item_states(queryset):
+    """
+    Conta os itens de um queryset por (tarefa, status, etapa), com uma query.
+
+    Retorna:
+    Counter: Quantidade de itens por chave.
+    """
+    rows = (
+        queryset.order_by()
+        .values_list('task_id', 'status', 'stage')
+        .annotate(count=Count('id'))
+    )
+    return Counter({(task_id, status, stage): count for task_id, status, stage, count in rows})
+
+
+def update_task_progress(removed=None, added=None):
+    """
+    Aplica aos contadores das tarefas as mudanças de estado dos itens.
+
+    Cada argumento é um Counter de (tarefa, status, etapa) -> quantidade de
+    itens que saíram (`removed`) ou entraram (`added`) naquele estado. Um
+    item alterado aparece nos dois; um item criado só em `added`. Os
+    incrementos usam F(), então escritas concorrentes não se perdem; deve
+    ser chamado na mesma transação da escrita dos itens.
+
+    Parâmetros:
+    - removed (Counter, opcional): Estados anteriores.
+    - added (Counter, opcional): Estados novos.
+    """
+    deltas = defaultdict(Counter)
+    for states, sign in ((removed or {}, -1), (added or {}, 1)):
+        for (task_id, status, stage), count in states.items():
+            delta = deltas[task_id]
+            delta['total'] += sign * count
+            if status in STATUS_FIELDS:
+                delta[STATUS_FIELDS[status]] += sign * count
+            if stage in STAGE_FIELDS:
+                delta[STAGE_FIELDS[stage]] += sign * count
+            if is_finished(status, stage):
+                delta['finished'] += sign * count
+
+    deltas = {
+        task_id: {field: value for field, value in delta.items() if value}
+        for task_id, delta in deltas.items()
+    }
+    deltas = {task_id: delta for task_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    TaskProgress.objects.bulk_create(
+        [TaskProgress(task_id=task_id) for task_id in deltas],
+        ignore_conflicts=True,
+    )
+    now = timezone.now()
+    for task_id, delta in deltas.items():
+        TaskProgress.objects.filter(task_id=task_id).update(
+            updated_at=now,
+            **{field: F(field) + value for field, value in delta.items()},
+        )
+    rollup_task_status(list(deltas), now=now)
+    items_changed.send(sender=TaskProgress, task_ids=list(deltas))
+
+
+def get_task_status(counters):
+    """
+    Status da tarefa derivado dos contadores dos itens.
+
+    Um item está finalizado quando chega à etapa COMPLETED ou termina em
+    ERROR; o status COMPLETED sozinho só encerra a etapa atual do item.
+
+    - Sem itens: None (o status atual é mantido).
+    - Todos os itens finalizados: ERROR se todos terminaram em erro, senão
+      COMPLETED (os itens com erro continuam nos contadores).
+    - Algum item iniciado, com uma etapa concluída ou fora da etapa SHIFT:
+      STARTED.
+    - Caso contrário: CREATED.
+
+    Parâmetros:
+    - counters (dict): Contadores de TaskProgress (`COUNTER_FIELDS`).
+    """
+    total = counters['total']
+    error = counters['status_error']
+    if not total:
+        return None
+    if counters['finished'] >= total:
+        return Status.ERROR if error >= total else Status.COMPLETED
+    if (
+        counters['status_started']
+        or counters['status_completed']
+        or error
+        or counters['stage_shift'] < total
+    ):
+        return Status.STARTED
+    return Status.CREATED
+
+
+def rollup_task_status(task_ids, now=None):
+    """
+    Atualiza status, `started_at` e `ended_at` das tarefas a partir dos
+    contadores de TaskProgress, sem contar os itens: uma query de leitura e
+    um UPDATE por status novo, apenas nas tarefas que mudaram.
+
+    Deve ser chamado após a atualização dos contadores, na mesma transação:
+    o UPDATE dos contadores bloqueia a linha de TaskProgress até o commit, então
+    escritas concorrentes na mesma tarefa leem os contadores já somados.
+
+    `started_at` é preenchido na primeira vez que a tarefa sai de CREATED;
+    `ended_at` é preenchido ao finalizar e limpo se a tarefa voltar a ter
+    itens pendentes (ex.: itens novos incluídos por uma importação MERGE).
+    """
+    now = now or timezone.now()
+    rows = TaskProgress.objects.filter(task_id__in=task_ids).values(
+        'task_id', 'task__status', *COUNTER_FIELDS,
+    )
+    changes = defaultdict(list)
+    for row in rows:
+        status = get_task_status(row)
+        if status is not None and status != row['task__status']:
+            changes[status].append(row['task_id'])
+
+    for status, ids in changes.items():
+        fields = {'status': status, 'updated_at': now}
+        if status != Status.CREATED:
+            fields['started_at'] = Coalesce('started_at', now)
+        if status in (Status.COMPLETED, Status.ERROR):
+            fields['ended_at'] = now
+        else:
+            fields['ended_at'] = None
+        Task.objects.filter(id__in=ids).update(**fields)
+
+
+def update_item_progress(previous_state, item):
+    """
+    Aplica aos contadores a mudança de um único item.
+
+    Parâmetros:
+    - previous_state (tuple | None): `get_item_state` antes da escrita, ou
+      None se o item foi criado.
+    - item (Item | None): O item após a escrita, ou None se foi removido.
+    """
+    update_task_progress(
+        removed=Counter([previous_state]) if previous_state else None,
+        added=Counter([get_item_state(item)]) if item is not None else None,
+    )
+
+
+def count_task_progress(task_ids):
+    """
+    Conta os itens das tarefas diretamente na tabela de itens.
+
+    Retorna:
+    Dict[int, dict]: Contadores por ID de tarefa (apenas tarefas com itens).
+    """
+    aggregates = {
+        'total': Count('id'),
+        'finished': Count('id', filter=Q(stage='COMPLETED') | Q(status=Status.ERROR)),
+    }
+    for status, field in STATUS_FIELDS.items():
+        aggregates[field] = Count('id', filter=Q(status=status))
+    for stage, field in STAGE_FIELDS.items():
+        aggregates[field] = Count('id', filter=Q(stage=stage))
+
+    rows = (
+        Item.objects.filter(task_id__in=task_ids)
+        .order_by()
+        .values('task_id')
+        .annotate(**aggregates)
+    )
+    return {row.pop('task_id'): row for row in rows}
+
+
+def summarize_tasks(tasks):
+    """
+    Resumo dos itens de cada tarefa em uma única query (LEFT JOIN com os
+    itens e agregação condicional): contadores por status e etapa, criação
+    do item pendente mais antigo e duração média dos itens finalizados.
+
+    Parâmetros:
+    - tasks (QuerySet[Task]): Tarefas a resumir, já filtradas e limitadas.
+
+    Retorna:
+    List[dict]: Uma linha por tarefa, inclusive as sem itens.
+    """
+    aggregates = {'total': Count('item')}
+    for status, field in STATUS_FIELDS.items():
+        aggregates[field] = Count('item', filter=Q(item__status=status))
+    for stage, field in STAGE_FIELDS.items():
+        aggregates[field] = Count('item', filter=Q(item__stage=stage))
+    aggregates['oldest_pending_at'] = Min(
+        'item__created_at',
+        filter=Q(item__status__in=[Status.CREATED, Status.STARTED]),
+    )
+    aggregates['mean_duration'] = Avg(
+        ExpressionWrapper(
+            F('item__ended_at') - F('item__started_at'),
+            output_field=DurationField(),
+        ),
+        filter=Q(item__started_at__isnull=False, item__ended_at__isnull=False),
+    )
+
+    now = timezone.now()
+    rows = list(tasks.values('id', 'status').annotate(**aggregates))
+    for row in rows:
+        oldest = row['oldest_pending_at']
+        row['oldest_pending_age'] = (now - oldest).total_seconds() if oldest else None
+        duration = row['mean_duration']
+        row['mean_duration'] = duration.total_seconds() if duration is not None else None
+    return rows
+
+
+def reconcile_task_progress(task_ids, dry_run=False):
+    """
+    Recalcula os contadores das tarefas e corrige os que divergirem. Em
+    seguida, atualiza o status das tarefas a partir dos contadores.
+
+    Parâmetros:
+    - task_ids (List[int]): Tarefas a conferir.
+    - dry_run (bool): Se True, só informa as divergências.
+
+    Retorna:
+    List[int]: IDs das tarefas cujos contadores estavam errados.
+    """
+    actual = count_task_progress(task_ids)
+    stored = TaskProgress.objects.in_bulk(task_ids)
+    empty = dict.fromkeys(COUNTER_FIELDS, 0)
+
+    drifted = []
+    for task_id in task_ids:
+        counters = actual.get(task_id, empty)
+        progress = stored.get(task_id)
+        if progress is None:
+            if counters == empty:
+                continue
+            progress = TaskProgress(task_id=task_id)
+        elif all(getattr(progress, field) == counters[field] for field in COUNTER_FIELDS):
+            continue
+        for field in COUNTER_FIELDS:
+            setattr(progress, field, counters[field])
+        drifted.append(progress)
+
+    if not dry_run and drifted:
+        now = timezone.now()
+        for progress in drifted:
+            progress.updated_at = now
+        TaskProgress.objects.bulk_create(
+            drifted,
+            update_conflicts=True,
+            unique_fields=['task'],
+            update_fields=[*COUNTER_FIELDS, 'updated_at'],
+        )
+    if not dry_run:
+        rollup_task_status(task_ids)
+    return [progress.task_id for progress in drifted]
@@ -1,7 +1,8 @@
 from rest_framework import serializers
-from .models import Task
+from .models import Task, TaskProgress
 from apps.items.models import Item
-from apps.items.serializer import ItemSerializer
+from apps.api.values_serializers import ValuesSerializer
+from apps.items.serializer import ItemSerializer, ItemValuesSerializer
 
 
 class TaskSummarySerializer(serializers.ModelSerializer):
@@ -22,3 +23,88 @@ class TaskSerializer(serializers.ModelSerializer):
     class Meta:
         model = Task
         fields = ['id', 'created_at', 'started_at', 'ended_at', 'status', 'robot_id', 'items']
+
+
+class TaskValuesSerializer(ValuesSerializer):
+    """
+    Versão somente leitura do TaskSerializer a partir de `.values()`.
+
+    Tarefas e itens são lidos em duas queries, independente da quantidade;
+    sem itens (`items=False`), em uma.
+    """
+    model = Task
+    fields = ['id', 'created_at', 'started_at', 'ended_at', 'status', 'robot_id']
+
+    @classmethod
+    def serialize_rows(cls, rows, fields=None, items=True, item_fields=None, robot_id=None):
+        """
+        Parâmetros:
+        - rows: Linhas de `get_values` (devem incluir o `id`).
+        - fields (List[str], opcional): Campos da tarefa; None para todos.
+        - items (bool): Se os itens de cada tarefa são incluídos.
+        - item_fields (List[str], opcional): Campos dos itens; None para todos.
+        - robot_id (int, opcional): Inclui apenas os itens atribuídos ao robô.
+        """
+        formatters = cls.get_formatters(fields)
+        tasks = [cls.to_representation(row, formatters) for row in rows]
+        if not items:
+            return tasks
+
+        items_by_task = {row['id']: [] for row in rows}
+        for task, row in zip(tasks, rows):
+            task['items'] = items_by_task[row['id']]
+
+        item_rows = Item.objects.filter(task_id__in=list(items_by_task))
+        if robot_id is not None:
+            item_rows = item_rows.filter(robot_id=robot_id)
+        item_rows = (
+            item_rows.order_by('id')
+            .values(*ItemValuesSerializer.get_value_names(item_fields), 'task_id')
+        )
+        item_formatters = ItemValuesSerializer.get_formatters(item_fields)
+        for row in item_rows:
+            items_by_task[row['task_id']].append(
+                ItemValuesSerializer.to_representation(row, item_formatters)
+            )
+        return tasks
+
+
+class TaskProgressSerializer(serializers.ModelSerializer):
+    """
+    Serializador dos contadores de itens de uma tarefa.
+    """
+    done = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = TaskProgress
+        fields = [
+            'task', 'total', 'done',
+            'status_created', 'status_started', 'status_completed', 'status_error',
+            'stage_shift', 'stage_image_process', 'stage_sismama', 'stage_completed',
+            'updated_at',
+        ]
+
+
+class TaskItemsSummarySerializer(serializers.Serializer):
+    """
+    Resumo dos itens de uma tarefa, calculado na consulta (documentação do
+    endpoint `tasks/summary/`).
+    """
+    id = serializers.IntegerField()
+    status = serializers.CharField()
+    total = serializers.IntegerField()
+    status_created = serializers.IntegerField()
+    status_started = serializers.IntegerField()
+    status_completed = serializers.IntegerField()
+    status_error = serializers.IntegerField()
+    stage_shift = serializers.IntegerField()
+    stage_image_process = serializers.IntegerField()
+    stage_sismama = serializers.IntegerField()
+    stage_completed = serializers.IntegerField()
+    oldest_pending_at = serializers.DateTimeField(allow_null=True)
+    oldest_pending_age = serializers.FloatField(
+        allow_null=True, help_text="Idade (s) do item pendente mais antigo."
+    )
+    mean_duration = serializers.FloatField(
+        allow_null=True, help_text="Média (s) de ended_at - started_at dos itens."
+    )
@@ -0,0 +1,36 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.processes.models import Process
+from apps.robots.models import Robot
+from .dashboard import invalidate_dashboard
+from .models import Task
+from .progress import items_changed
+
+
+@receiver([post_save, post_delete], sender=Task)
+def invalidate_task_dashboard(sender, instance, **kwargs):
+    """
+    Tarefa criada, alterada ou removida: invalida o dashboard do dono.
+    """
+    invalidate_dashboard([instance.user_id_id])
+
+
+@receiver(items_changed)
+def invalidate_items_dashboard(sender, task_ids, **kwargs):
+    """
+    Itens criados, removidos ou com status/etapa alterados: invalida o
+    dashboard dos donos das tarefas (progresso e total de itens).
+    """
+    invalidate_dashboard(
+        Task.objects.filter(id__in=task_ids).values_list('user_id', flat=True).distinct()
+    )
+
+
+@receiver([post_save, post_delete], sender=Robot)
+@receiver([post_save, post_delete], sender=Process)
+def invalidate_shared_dashboard(sender, **kwargs):
+    """
+    Robôs e processos aparecem no dashboard de todos os usuários.
+    """
+    invalidate_dashboard()
@@ -0,0 +1,71 @@
+import logging
+from celery import shared_task
+from django.utils import timezone
+
+from apps.utils.choices import ImportStatus
+from .models import ImportJob
+from .utils import enable_robot_check, fail_stale_import_jobs, read_file, update_import_job
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(
+    bind=True,
+    name="tasks.import_file",
+)
+def import_file_task(self, job_id: int):
+    """
+    Importa em segundo plano o arquivo CSV de uma tarefa enviado no dashboard.
+
+    O estado e os contadores de linhas ficam em `ImportJob`. Ao concluir, o
+    arquivo é removido do storage; em caso de falha ele é mantido para análise.
+    """
+    job = ImportJob.objects.select_related('user_id', 'process_id').get(pk=job_id)
+    if job.status != ImportStatus.QUEUED:
+        # Mensagem entregue mais de uma vez pelo broker. Se a importação
+        # parou no meio (worker morto), é marcada como FAILED para que o
+        # arquivo possa ser enviado de novo
+        fail_stale_import_jobs(job.user_id)
+        job.refresh_from_db(fields=['status'])
+        return job.status
+
+    update_import_job(job, status=ImportStatus.PARSING, started_at=timezone.now())
+
+    try:
+        with job.file.open('rb') as file:
+            assigned_robot = read_file(
+                file, job.user_id, job.process_id,
+                job=job, mode=job.mode, file_hash=job.file_hash,
+            )
+    except Exception as e:
+        logger.exception("Erro na importação do arquivo %s", job.file_name)
+        update_import_job(
+            job,
+            status=ImportStatus.FAILED,
+            error_message=str(e),
+            ended_at=timezone.now(),
+        )
+        return job.status
+
+    job.file.delete(save=False)
+    update_import_job(
+        job,
+        status=ImportStatus.DONE,
+        file=None,
+        ended_at=timezone.now(),
+    )
+
+    # Se não houver robô disponível, habilita a tarefa periódica
+    if not assigned_robot:
+        enable_robot_check()
+    return job.status
+
+
+@shared_task(name="tasks.fail_stale_import_jobs")
+def fail_stale_import_jobs_task():
+    """
+    Marca como FAILED as importações paradas por um worker morto
+    (`fail_stale_import_jobs`). Executada periodicamente pelo Celery beat,
+    para não gravar nada nas consultas do dashboard.
+    """
+    return fail_stale_import_jobs()
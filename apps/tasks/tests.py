@@ -1,15 +1,42 @@
-from django.test import TestCase
-from .models import Task
-from .views import TaskAPIView
-from apps.utils.choices import Status
+import io
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from .dashboard import get_dashboard_cache, get_versions
+from .models import ImportJob, Task, TaskProgress
+from .progress import COUNTER_FIELDS, count_task_progress, reconcile_task_progress
+from .tasks import fail_stale_import_jobs_task, import_file_task
+from .utils import get_file_hash, read_file, update_import_job
+from apps.items.models import Item
+from apps.items.serializer import ItemSerializer
+from apps.items.utils import delete_items, insert_items, update_items
+from apps.robots.tests import create_robot
+from apps.utils.choices import ImportMode, ImportStatus, Status, StatusRobot
+from apps.values.models import ShiftData
 from apps.api.tests import setUp_Test_Case
 
 # Create your tests here.
 
 
+def csv_file(lines):
+    """
+    Arquivo CSV de importação com a coluna "O.S.", lido em pedaços de 64 KB.
+    """
+    content = 'O.S.\n'.encode() + b''.join(lines)
+    return File(io.BytesIO(content), name='items.csv')
+
+
 class TaskAPIViewTestCase(TestCase):
     """
-    Test case for the TaskAPIView view.
+    Test case for the TaskViewSet.
     """
 
     def setUp(self):
@@ -22,30 +49,657 @@ class TaskAPIViewTestCase(TestCase):
         """
         Test retrieving all tasks filtered by robot_id.
         """
-        url = '/tasks/'
-        data = {'robot_id': self.robot.id}
-        request = self.factory.get(url, data)
-        # Token Auth para el header
-        request.META['HTTP_AUTHORIZATION'] = f'Token {self.token.key}'
-        response = TaskAPIView.as_view()(request)
+        response = self.client.get(f'/api/v1/tasks/{self.robot.id}/tasks/')
         self.assertEqual(response.status_code, 200)
+        self.assertEqual([task['id'] for task in response.data['results']], [self.task.id])
 
     def test_edit_task(self):
         """
         Test editing a task's status.
         """
-        url = '/tasks/'
-        data = {
-            'robot_id': self.robot.id,
-            'task_id': self.task.id,
-            'status': Status.COMPLETED
-        }
-        query_params = '?' + \
-            '&'.join(f'{key}={value}' for key, value in data.items())
-        request = self.factory.patch(url + query_params)
-        # Token Auth para el header
-        request.META['HTTP_AUTHORIZATION'] = f'Token {self.token.key}'
-        response = TaskAPIView.as_view()(request)
+        response = self.client.patch(
+            f'/api/v1/tasks/{self.task.id}/update-task/',
+            {'status': Status.COMPLETED}, format='json',
+        )
         self.assertEqual(response.status_code, 200)
         self.assertEqual(Task.objects.get(
             id=self.task.id).status, Status.COMPLETED)
+
+
+class TaskSparseFieldsTestCase(TestCase):
+    """
+    Test case for `?fields=`, `?exclude=` and `?expand=` on the robot tasks.
+    """
+
+    def setUp(self):
+        setUp_Test_Case(self)
+        self.url = f'/api/v1/tasks/{self.robot.id}/tasks/?task_id={self.task.id}&'
+
+    def get(self, query):
+        response = self.client.get(self.url + query)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_fields(self):
+        self.assertEqual(self.get('fields=status'), {'id': self.task.id, 'status': self.task.status})
+
+    def test_nested_fields(self):
+        task = self.get('fields=items.status')
+        self.assertEqual(list(task), ['id', 'items'])
+        self.assertEqual(task['items'], [{'id': self.item.id, 'status': self.item.status}])
+
+    def test_exclude(self):
+        task = self.get('exclude=items,robot_id')
+        self.assertNotIn('items', task)
+        self.assertNotIn('robot_id', task)
+        self.assertIn('status', task)
+
+        task = self.get('exclude=items.shift_data')
+        self.assertNotIn('shift_data', task['items'][0])
+        self.assertIn('os_number', task['items'][0])
+
+    def test_expand(self):
+        task = self.get('fields=id&expand=items')
+        self.assertEqual(list(task), ['id', 'items'])
+        self.assertEqual(list(task['items'][0]), ItemSerializer.Meta.fields)
+
+    def test_unknown_field_is_rejected(self):
+        for query in ('fields=nope', 'fields=items.nope', 'exclude=nope', 'expand=status'):
+            response = self.client.get(self.url + query)
+            self.assertEqual(response.status_code, 400, query)
+            self.assertIn('fields', response.data)
+
+
+class TaskSummaryTestCase(TestCase):
+    """
+    Test case for `tasks/summary/` (resumo dos itens por tarefa).
+    """
+
+    def setUp(self):
+        setUp_Test_Case(self)
+        now = timezone.now()
+        Item.objects.bulk_create([
+            Item(task_id=self.task, os_number='2', status=Status.STARTED, stage='IMAGE_PROCESS'),
+            Item(task_id=self.task, os_number='3', status=Status.COMPLETED, stage='COMPLETED',
+                 started_at=now - timedelta(seconds=30), ended_at=now),
+            Item(task_id=self.task, os_number='4', status=Status.ERROR, stage='SISMAMA',
+                 started_at=now - timedelta(seconds=10), ended_at=now),
+        ])
+        self.other = Task.objects.create(
+            user_id=self.user, process_id=self.process, robot_id=create_robot(1)
+        )
+        Item.objects.create(task_id=self.other, os_number='5')
+        self.empty = Task.objects.create(user_id=self.user, process_id=self.process)
+
+    def summary(self, query):
+        response = self.client.get(f'/api/v1/tasks/summary/?{query}')
+        self.assertEqual(response.status_code, 200)
+        return {row['id']: row for row in response.data}
+
+    def assert_matches_items(self, row):
+        counters = count_task_progress([row['id']]).get(
+            row['id'], dict.fromkeys(COUNTER_FIELDS, 0)
+        )
+        for field in COUNTER_FIELDS:
+            if field != 'finished':
+                self.assertEqual(row[field], counters[field], field)
+
+    def test_totals_match_items(self):
+        rows = self.summary(f'ids={self.task.id},{self.other.id},{self.empty.id}')
+        self.assertEqual(set(rows), {self.task.id, self.other.id, self.empty.id})
+        for row in rows.values():
+            self.assert_matches_items(row)
+
+        row = rows[self.task.id]
+        self.assertEqual(row['total'], 4)
+        self.assertEqual(
+            [row['status_created'], row['status_started'], row['status_completed'], row['status_error']],
+            [1, 1, 1, 1],
+        )
+        self.assertEqual(
+            [row['stage_shift'], row['stage_image_process'], row['stage_sismama'], row['stage_completed']],
+            [1, 1, 1, 1],
+        )
+        self.assertAlmostEqual(row['mean_duration'], 20, places=3)
+        self.assertIsNotNone(row['oldest_pending_age'])
+        self.assertEqual(rows[self.empty.id]['total'], 0)
+        self.assertIsNone(rows[self.empty.id]['oldest_pending_at'])
+
+    def test_filter_by_robot(self):
+        rows = self.summary(f'robot_id={self.robot.id}')
+        self.assertEqual(list(rows), [self.task.id])
+        self.assert_matches_items(rows[self.task.id])
+
+        rows = self.summary(f'robot_id={self.robot.id}&ids={self.other.id}')
+        self.assertEqual(rows, {})
+
+    def test_filter_is_required(self):
+        self.assertEqual(self.client.get('/api/v1/tasks/summary/').status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/tasks/summary/?ids=a').status_code, 400)
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'dashboard': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'dashboard-tests',
+    },
+})
+class DashboardCacheTestCase(TestCase):
+    """
+    Test case for the invalidation of the dashboard cache.
+    """
+
+    def setUp(self):
+        setUp_Test_Case(self)
+        self.client.force_login(self.user)
+        get_dashboard_cache().clear()
+        reconcile_task_progress([self.task.id])
+
+    def render(self):
+        response = self.client.get('/')
+        self.assertEqual(response.status_code, 200)
+        return response.context
+
+    def assert_bumped(self, write, user=True, shared=False):
+        before = get_versions(self.user.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            write()
+        after = get_versions(self.user.id)
+        self.assertEqual(before[0] != after[0], shared)
+        self.assertEqual(before[1] != after[1], user)
+
+    def test_item_writes_bump_user_version(self):
+        self.assert_bumped(lambda: insert_items(self.task, self.robot, [('2', 'Nome')]))
+        self.assert_bumped(
+            lambda: update_items(Item.objects.filter(id=self.item.id), status=Status.STARTED)
+        )
+        self.assert_bumped(lambda: delete_items(Item.objects.filter(id=self.item.id)))
+
+    def test_task_write_bumps_user_version(self):
+        self.assert_bumped(
+            lambda: Task.objects.create(user_id=self.user, process_id=self.process)
+        )
+
+    def test_robot_write_bumps_shared_version(self):
+        def write():
+            self.robot.status = StatusRobot.INACTIVE
+            self.robot.save()
+        self.assert_bumped(write, user=False, shared=True)
+
+    def test_render_sees_new_counts(self):
+        context = self.render()
+        self.assertEqual(context['total_items'], 1)
+        self.assertEqual(context['available_robots'], 1)
+
+        # Escrita sem invalidação: a página continua vindo do cache
+        TaskProgress.objects.filter(task_id=self.task.id).update(total=50)
+        self.assertEqual(self.render()['total_items'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            insert_items(self.task, self.robot, [('2', 'Nome')])
+        self.assertEqual(self.render()['total_items'], 51)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.robot.status = StatusRobot.INACTIVE
+            self.robot.save()
+        self.assertEqual(self.render()['available_robots'], 0)
+
+
+class TaskShiftDataBulkUpsertTestCase(TestCase):
+    """
+    Test case for `tasks/{id}/shift-data/` (upsert de ShiftData em lote).
+    """
+
+    def setUp(self):
+        setUp_Test_Case(self)
+        self.second = Item.objects.create(task_id=self.task, os_number='2')
+        other_task = Task.objects.create(user_id=self.user, process_id=self.process)
+        self.other = Item.objects.create(task_id=other_task, os_number='3')
+        self.url = f'/api/v1/tasks/{self.task.id}/shift-data/'
+
+    def upsert(self, entries):
+        response = self.client.post(self.url, entries, format='json')
+        self.assertEqual(response.status_code, 200)
+        return [result['result'] for result in response.data]
+
+    def test_result_per_entry(self):
+        results = self.upsert([
+            {'item': self.item.id, 'os_number': '1', 'nome_paciente': 'Ana'},
+            {'item': self.second.id, 'os_number': '2', 'nome_paciente': 'Bia'},
+            {'item': 'x', 'os_number': '4'},
+            {'item': self.other.id, 'os_number': '3'},
+            {'item': self.other.id + 1000, 'os_number': '5'},
+        ])
+        self.assertEqual(results, ['updated', 'created', 'invalid', 'not_found', 'not_found'])
+        self.assertEqual(
+            dict(ShiftData.objects.values_list('item_id', 'nome_paciente')),
+            {self.item.id: 'Ana', self.second.id: 'Bia'},
+        )
+
+    def test_last_duplicate_wins(self):
+        results = self.upsert([
+            {'item': self.second.id, 'os_number': '2', 'cnes': 'A'},
+            {'item': self.second.id, 'os_number': '2', 'cnes': 'B'},
+        ])
+        self.assertEqual(results, ['invalid', 'created'])
+        self.assertEqual(ShiftData.objects.get(item=self.second).cnes, 'B')
+
+    def test_update_keeps_fields_not_sent(self):
+        ShiftData.objects.filter(id=self.value.id).update(cartao_sus='123')
+        self.assertEqual(
+            self.upsert([{'item': self.item.id, 'os_number': '1', 'nome_paciente': 'Ana'}]),
+            ['updated'],
+        )
+        shift_data = ShiftData.objects.get(item=self.item)
+        self.assertEqual(shift_data.id, self.value.id)
+        self.assertEqual(shift_data.cartao_sus, '123')
+        self.assertEqual(shift_data.nome_paciente, 'Ana')
+
+    def test_rows_with_same_fields_use_one_upsert(self):
+        """
+        Linhas novas e existentes com os mesmos campos vão em um único
+        INSERT ... ON CONFLICT DO UPDATE.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            results = self.upsert([
+                {'item': self.item.id, 'os_number': '1', 'cnes': 'A'},
+                {'item': self.second.id, 'os_number': '2', 'cnes': 'B'},
+            ])
+        self.assertEqual(results, ['updated', 'created'])
+        inserts = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('INSERT INTO "values_shiftdata"')
+        ]
+        self.assertEqual(len(inserts), 1)
+        self.assertIn('ON CONFLICT', inserts[0])
+        self.assertEqual(ShiftData.objects.count(), 2)
+        self.assertEqual(ShiftData.objects.get(item=self.item).cnes, 'A')
+
+
+class ReadFileTestCase(TestCase):
+    """
+    Test case for the CSV import (`read_file`).
+    """
+
+    def setUp(self):
+        setUp_Test_Case(self)
+
+    @override_settings(TASK_IMPORT_BATCH_SIZE=1000)
+    def test_failed_merge_keeps_items_of_other_imports(self):
+        """
+        Uma importação MERGE que falha remove só os itens que ela inseriu.
+        """
+        # Item de outra importação gravado na mesma tarefa durante esta
+        other = Item.objects.create(task_id=self.task, os_number='other')
+        Item.objects.filter(id=other.id).update(
+            created_at=timezone.now() + timedelta(hours=1)
+        )
+
+        # Os lotes do primeiro pedaço do arquivo (64 KB) são gravados; os
+        # bytes inválidos, no pedaço seguinte, fazem a importação falhar
+        lines = [f'{number} - Nome\n'.encode() for number in range(10, 10010)]
+        file = csv_file(lines + [b'99999 - \xff\n'])
+        inserted = []
+
+        def track_insert_items(task, robot, rows):
+            inserted.extend(rows)
+            return insert_items(task, robot, rows)
+
+        with mock.patch('apps.tasks.utils.insert_items', track_insert_items):
+            with self.assertRaises(UnicodeDecodeError):
+                read_file(file, self.user, self.process, mode=ImportMode.MERGE)
+
+        self.assertTrue(inserted)
+
+        self.assertEqual(
+            set(Item.objects.filter(task_id=self.task).values_list('os_number', flat=True)),
+            {'1', 'other'},
+        )
+
+    @override_settings(TASK_IMPORT_BACKEND='copy')
+    def test_failed_merge_keeps_items_of_other_imports_with_copy(self):
+        self.test_failed_merge_keeps_items_of_other_imports()
+
+
+class ImportDeduplicationTestCase(TestCase):
+    """
+    Test case for the duplicate handling of `read_file` (SKIP, MERGE, FORCE).
+    """
+
+    def setUp(self):
+        setUp_Test_Case(self)
+
+    def import_file(self, numbers, mode):
+        """
+        Importa um CSV com as OS `numbers` e retorna a importação gravada.
+        """
+        file = csv_file([f'{number} - Nome\n'.encode() for number in numbers])
+        job = ImportJob.objects.create(
+            user_id=self.user, process_id=self.process, mode=mode,
+            file_hash=get_file_hash(file),
+        )
+        read_file(file, self.user, self.process, job=job, mode=mode, file_hash=job.file_hash)
+        job.refresh_from_db()
+        return job
+
+    def os_numbers(self, task):
+        return sorted(Item.objects.filter(task_id=task).values_list('os_number', flat=True))
+
+    def test_skip_ignores_same_file(self):
+        first = self.import_file([10, 11], ImportMode.SKIP)
+        tasks = Task.objects.count()
+
+        second = self.import_file([10, 11], ImportMode.SKIP)
+        self.assertEqual(second.task_id, first.task_id)
+        self.assertEqual(second.rows_processed, 2)
+        self.assertEqual(second.rows_deduplicated, 2)
+        self.assertEqual(Task.objects.count(), tasks)
+        self.assertEqual(self.os_numbers(first.task_id), ['10', '11'])
+
+    def test_merge_uses_task_of_same_file(self):
+        first = self.import_file([10, 11], ImportMode.FORCE)
+        update_items(Item.objects.filter(task_id=first.task_id), status=Status.COMPLETED)
+
+        # A tarefa mais recente com itens pendentes seria escolhida sem o
+        # arquivo anterior
+        newer = Task.objects.create(user_id=self.user, process_id=self.process)
+        insert_items(newer, self.robot, [('20', 'Nome')])
+
+        second = self.import_file([10, 11], ImportMode.MERGE)
+        self.assertEqual(second.task_id, first.task_id)
+        self.assertEqual(second.rows_deduplicated, 0)
+        self.assertEqual(self.os_numbers(first.task_id), ['10', '10', '11', '11'])
+        self.assertEqual(self.os_numbers(newer), ['20'])
+
+    def test_merge_without_previous_file_uses_pending_task(self):
+        job = self.import_file([10], ImportMode.MERGE)
+        self.assertEqual(job.task_id, self.task)
+        self.assertEqual(self.os_numbers(self.task), ['1', '10'])
+
+    def test_pending_os_of_process_is_skipped(self):
+        job = self.import_file([1, 5], ImportMode.SKIP)
+        self.assertEqual(self.os_numbers(job.task_id), ['5'])
+        self.assertEqual(job.rows_deduplicated, 1)
+
+    def test_finished_os_is_imported_again(self):
+        update_items(Item.objects.filter(id=self.item.id), status=Status.COMPLETED)
+        job = self.import_file([1], ImportMode.SKIP)
+        self.assertEqual(self.os_numbers(job.task_id), ['1'])
+        self.assertEqual(job.rows_deduplicated, 0)
+
+    @override_settings(TASK_IMPORT_BATCH_SIZE=2)
+    def test_duplicates_within_file_are_skipped(self):
+        """
+        OS repetidas no mesmo lote e em lotes diferentes do arquivo.
+        """
+        job = self.import_file([7, 7, 8, 7, 9], ImportMode.SKIP)
+        self.assertEqual(self.os_numbers(job.task_id), ['7', '8', '9'])
+        self.assertEqual(job.rows_processed, 5)
+        self.assertEqual(job.rows_deduplicated, 2)
+
+    def test_force_keeps_duplicates(self):
+        job = self.import_file([1, 7, 7], ImportMode.FORCE)
+        self.assertEqual(self.os_numbers(job.task_id), ['1', '7', '7'])
+        self.assertEqual(job.rows_deduplicated, 0)
+
+
+class TaskStatusRollupTestCase(TestCase):
+    """
+    Test case for the task status derived from its items.
+    """
+
+    def setUp(self):
+        setUp_Test_Case(self)
+        self.second = Item.objects.create(task_id=self.task, os_number='2')
+        reconcile_task_progress([self.task.id])
+
+    def update_item(self, item, **data):
+        response = self.client.patch(
+            f'/api/v1/items/{item.id}/update-status/',
+            {'robot_id': self.robot.id, **data}, format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+        return Task.objects.get(id=self.task.id)
+
+    def test_completed_stage_step_does_not_finish_task(self):
+        """
+        Concluir a etapa SHIFT de todos os itens não finaliza a tarefa.
+        """
+        self.update_item(self.item, stage='SHIFT', status=Status.COMPLETED)
+        task = self.update_item(self.second, stage='SHIFT', status=Status.COMPLETED)
+        self.assertEqual(task.status, Status.STARTED)
+        self.assertIsNotNone(task.started_at)
+        self.assertIsNone(task.ended_at)
+        self.assertEqual(task.progress.done, 0)
+
+    def test_task_finishes_when_items_reach_completed_stage(self):
+        task = self.update_item(self.item, stage='COMPLETED', status=Status.COMPLETED)
+        self.assertEqual(task.status, Status.STARTED)
+
+        task = self.update_item(self.second, stage='COMPLETED', status=Status.COMPLETED)
+        self.assertEqual(task.status, Status.COMPLETED)
+        self.assertIsNotNone(task.ended_at)
+        self.assertEqual(task.progress.done, 2)
+
+    def test_task_errors_when_all_items_error(self):
+        self.update_item(self.item, stage='SHIFT', status=Status.ERROR)
+        task = self.update_item(self.second, stage='IMAGE_PROCESS', status=Status.ERROR)
+        self.assertEqual(task.status, Status.ERROR)
+
+    def test_new_item_reopens_finished_task(self):
+        """
+        Um item novo (ex.: importação MERGE) reabre a tarefa finalizada.
+        """
+        self.update_item(self.item, stage='COMPLETED', status=Status.COMPLETED)
+        self.update_item(self.second, stage='COMPLETED', status=Status.COMPLETED)
+
+        insert_items(self.task, self.robot, [('3', 'Nome')])
+        task = Task.objects.get(id=self.task.id)
+        self.assertEqual(task.status, Status.STARTED)
+        self.assertIsNone(task.ended_at)
+
+    def test_errored_item_in_completed_stage_counts_once(self):
+        """
+        Um item com erro na etapa COMPLETED conta uma vez só como finalizado.
+        """
+        task = self.update_item(self.item, stage='COMPLETED', status=Status.ERROR)
+        self.assertEqual(task.status, Status.STARTED)
+        self.assertIsNone(task.ended_at)
+        self.assertEqual(task.progress.done, 1)
+        self.assertEqual(
+            task.progress.finished, count_task_progress([task.id])[task.id]['finished']
+        )
+
+    def test_transitions_through_bulk_update_status(self):
+        response = self.client.patch('/api/v1/items/bulk-update-status/', [
+            {'id': self.item.id, 'status': Status.STARTED},
+        ], format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Task.objects.get(id=self.task.id).status, Status.STARTED)
+
+        self.client.patch('/api/v1/items/bulk-update-status/', [
+            {'id': self.item.id, 'status': Status.COMPLETED, 'stage': 'COMPLETED'},
+            {'id': self.second.id, 'status': Status.ERROR},
+        ], format='json')
+        task = Task.objects.get(id=self.task.id)
+        self.assertEqual(task.status, Status.COMPLETED)
+        self.assertIsNotNone(task.ended_at)
+        self.assertEqual(task.progress.done, 2)
+
+        self.client.patch('/api/v1/items/bulk-update-status/', [
+            {'id': self.item.id, 'status': Status.ERROR},
+        ], format='json')
+        self.assertEqual(Task.objects.get(id=self.task.id).status, Status.ERROR)
+
+    def test_claim_starts_task(self):
+        response = self.client.post('/api/v1/items/claim/', {
+            'robot_id': self.robot.id, 'stage': 'SHIFT', 'limit': 1,
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        task = Task.objects.get(id=self.task.id)
+        self.assertEqual(task.status, Status.STARTED)
+        self.assertIsNotNone(task.started_at)
+        self.assertEqual(task.progress.status_started, 1)
+
+
+class StaleImportJobTestCase(TestCase):
+    """
+    Test case for imports left in progress by a dead worker.
+    """
+
+    def setUp(self):
+        setUp_Test_Case(self)
+        self.client.force_login(self.user)
+        self.job = ImportJob.objects.create(
+            user_id=self.user, process_id=self.process, status=ImportStatus.PARSING,
+        )
+
+    def age_job(self, seconds):
+        ImportJob.objects.filter(id=self.job.id).update(
+            updated_at=timezone.now() - timedelta(seconds=seconds),
+        )
+
+    @override_settings(TASK_IMPORT_STALE_SECONDS=600)
+    def test_stale_job_is_marked_failed(self):
+        self.age_job(601)
+        self.assertEqual(fail_stale_import_jobs_task(), 1)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, ImportStatus.FAILED)
+        self.assertIsNotNone(self.job.ended_at)
+
+    @override_settings(TASK_IMPORT_STALE_SECONDS=600)
+    def test_running_job_is_kept(self):
+        self.age_job(60)
+        self.assertEqual(fail_stale_import_jobs_task(), 0)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, ImportStatus.PARSING)
+
+    @override_settings(TASK_IMPORT_STALE_SECONDS=600)
+    def test_progress_endpoint_does_not_write(self):
+        """
+        A consulta de progresso só lê; a importação parada é tratada pela
+        tarefa periódica.
+        """
+        self.age_job(601)
+        response = self.client.get(f'/tasks/imports/{self.job.id}/')
+        self.assertEqual(response.json()['status'], ImportStatus.PARSING)
+
+
+class ImportJobTaskTestCase(TestCase):
+    """
+    Test case for the background import (`import_file_task`).
+    """
+
+    def setUp(self):
+        setUp_Test_Case(self)
+        self.client.force_login(self.user)
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_settings = override_settings(MEDIA_ROOT=media.name)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+
+    def create_job(self, content):
+        return ImportJob.objects.create(
+            user_id=self.user, process_id=self.process, mode=ImportMode.FORCE,
+            file=ContentFile(content, name='items.csv'), file_name='items.csv',
+        )
+
+    def run_job(self, job):
+        """
+        Executa a importação e retorna os status gravados, em ordem.
+        """
+        statuses = []
+
+        def track_update_import_job(job, **fields):
+            if 'status' in fields and fields['status'] not in statuses[-1:]:
+                statuses.append(fields['status'])
+            update_import_job(job, **fields)
+
+        with mock.patch('apps.tasks.tasks.update_import_job', track_update_import_job), \
+                mock.patch('apps.tasks.utils.update_import_job', track_update_import_job):
+            import_file_task(job.id)
+        job.refresh_from_db()
+        return statuses
+
+    def test_job_goes_through_statuses_until_done(self):
+        job = self.create_job(b'O.S.\n10 - Nome\n11 - Nome\ninvalida\n')
+        statuses = self.run_job(job)
+        self.assertEqual(
+            statuses, [ImportStatus.PARSING, ImportStatus.INSERTING, ImportStatus.DONE]
+        )
+        self.assertFalse(job.file)
+        self.assertIsNotNone(job.ended_at)
+
+        response = self.client.get(f'/tasks/imports/{job.id}/')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['status'], ImportStatus.DONE)
+        self.assertEqual(data['task_id'], job.task_id_id)
+        self.assertEqual(data['rows_processed'], 3)
+        self.assertEqual(data['rows_rejected'], 1)
+        self.assertEqual(data['rows_deduplicated'], 0)
+        self.assertEqual(Item.objects.filter(task_id=job.task_id).count(), 2)
+
+    def test_failed_job_keeps_file(self):
+        job = self.create_job(b'O.S.\n10 - Nome\n\xff\n')
+        statuses = self.run_job(job)
+        self.assertEqual(statuses[0], ImportStatus.PARSING)
+        self.assertEqual(statuses[-1], ImportStatus.FAILED)
+        self.assertTrue(job.error_message)
+        self.assertIsNotNone(job.ended_at)
+        self.assertTrue(job.file)
+
+    def test_redelivered_job_is_not_imported_again(self):
+        job = self.create_job(b'O.S.\n10 - Nome\n')
+        self.run_job(job)
+        self.assertEqual(self.run_job(job), [])
+        self.assertEqual(Item.objects.filter(os_number='10').count(), 1)
+
+
+class TaskProgressTestCase(TestCase):
+    """
+    Test case for the per-task item counters (TaskProgress).
+    """
+
+    def setUp(self):
+        setUp_Test_Case(self)
+        reconcile_task_progress([self.task.id])
+
+    def get_counters(self, task):
+        return TaskProgress.objects.filter(task_id=task).values(*COUNTER_FIELDS).get()
+
+    def test_import_counts_inserted_items(self):
+        file = csv_file([f'{number} - Nome\n'.encode() for number in range(10, 13)])
+        read_file(file, self.user, self.process, mode=ImportMode.FORCE)
+
+        task = Task.objects.exclude(id=self.task.id).get()
+        counters = self.get_counters(task)
+        self.assertEqual(counters, count_task_progress([task.id])[task.id])
+        self.assertEqual(counters['total'], 3)
+        self.assertEqual(counters['status_created'], 3)
+
+    def test_delete_items_decrements_counters(self):
+        Item.objects.create(task_id=self.task, os_number='2')
+        reconcile_task_progress([self.task.id])
+
+        delete_items(Item.objects.filter(id=self.item.id))
+        counters = self.get_counters(self.task)
+        self.assertEqual(counters['total'], 1)
+        self.assertEqual(counters, count_task_progress([self.task.id])[self.task.id])
+
+    def test_reconcile_command_fixes_drift(self):
+        TaskProgress.objects.filter(task_id=self.task.id).update(total=99, status_created=0)
+
+        call_command('reconcile_task_progress', stdout=io.StringIO())
+        self.assertEqual(
+            self.get_counters(self.task),
+            count_task_progress([self.task.id])[self.task.id],
+        )
+
+    def test_progress_endpoint(self):
+        response = self.client.get(f'/api/v1/tasks/{self.task.id}/progress/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total'], 1)
+        self.assertEqual(response.data['status_created'], 1)
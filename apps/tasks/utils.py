@@ -1,8 +1,25 @@
+import codecs
 import csv
-from .models import Task
+import hashlib
+import logging
+from array import array
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django_celery_beat.models import PeriodicTask
+
+from .models import ImportJob, Task
+from apps.items.notifications import notify_items_available
 from apps.items.models import Item
+from apps.items.utils import delete_items, get_pending_os_numbers, insert_items
 from apps.values.models import ShiftData
-from apps.robots.utils import get_min_robot
+from apps.robots.utils import distribute_items, get_least_loaded_robot
+from apps.utils.choices import ImportMode, ImportStatus, Status
+
+logger = logging.getLogger(__name__)
 
 
 def get_tasks_from_items(items):
@@ -20,61 +37,364 @@ def get_tasks_from_items(items):
     return unique_tasks
 
 
-def read_file(file, user, process):
+def iter_csv_lines(file, encoding='utf-8'):
+    """
+    Lê as linhas de um arquivo enviado sem carregá-lo inteiro na memória.
+
+    Os bytes vêm de `UploadedFile.chunks()` e são decodificados de forma
+    incremental, então caracteres multibyte e quebras de linha divididos
+    entre dois pedaços são tratados corretamente.
+
+    Parâmetros:
+    - file (UploadedFile): O arquivo enviado.
+    - encoding (str): A codificação do arquivo.
+
+    Retorna:
+    Iterator[str]: As linhas do arquivo, com a quebra de linha original.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = ''
+    for chunk in file.chunks():
+        pending += decoder.decode(chunk)
+        lines = pending.splitlines(keepends=True)
+        # A última linha pode estar incompleta; fica para o próximo pedaço
+        pending = lines.pop() if lines and not lines[-1].endswith(('\n', '\r')) else ''
+        yield from lines
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        yield pending
+
+
+def parse_os_field(row):
+    """
+    Extrai o número e o nome da OS da coluna "O.S." de uma linha do CSV.
+
+    Parâmetros:
+    - row (dict): Linha do CSV.
+
+    Retorna:
+    Tuple[str, str] | None: Número e nome da OS, ou None se a coluna estiver vazia.
+    """
+    os_field = row.get('O.S.')
+    if not os_field:
+        return None
+
+    # Dividir a string em número da OS e nome, removendo ponto e vírgula
+    os_field = os_field.rstrip(';')
+    os_number, os_name = os_field.split(' - ', 1)
+    return os_number.strip(), os_name.strip()
+
+
+def update_import_job(job, **fields):
+    """
+    Grava o progresso de uma importação sem sobrescrever os demais campos.
+
+    Parâmetros:
+    - job (ImportJob | None): A importação; se None, não faz nada.
+    - **fields: Campos a atualizar.
+    """
+    if job is None:
+        return
+    fields['updated_at'] = timezone.now()
+    ImportJob.objects.filter(pk=job.pk).update(**fields)
+    for name, value in fields.items():
+        setattr(job, name, value)
+
+
+def fail_stale_import_jobs(user=None, now=None):
+    """
+    Marca como FAILED as importações paradas em PARSING ou INSERTING, isto é,
+    sem progresso gravado há mais de `TASK_IMPORT_STALE_SECONDS` (o worker
+    do Celery morreu no meio da importação). Sem isso elas apareceriam em
+    andamento para sempre no dashboard e não poderiam ser reenviadas.
+    Executada periodicamente (`tasks.fail_stale_import_jobs`).
+
+    Parâmetros:
+    - user (User, opcional): Considera só as importações do usuário.
+    - now (datetime, opcional): Instante de referência.
+
+    Retorna:
+    int: Quantidade de importações marcadas.
+    """
+    now = now or timezone.now()
+    jobs = ImportJob.objects.filter(
+        status__in=[ImportStatus.PARSING, ImportStatus.INSERTING],
+        updated_at__lt=now - timedelta(seconds=settings.TASK_IMPORT_STALE_SECONDS),
+    )
+    if user is not None:
+        jobs = jobs.filter(user_id=user)
+    return jobs.update(
+        status=ImportStatus.FAILED,
+        error_message='Importação interrompida: sem progresso do worker.',
+        ended_at=now,
+        updated_at=now,
+    )
+
+
+def get_file_hash(file):
+    """
+    Calcula o SHA-256 do conteúdo de um arquivo enviado, lendo-o em pedaços.
+
+    Parâmetros:
+    - file (UploadedFile): O arquivo enviado.
+
+    Retorna:
+    str: O hash em hexadecimal.
+    """
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_previous_import(file_hash, process, exclude=None):
+    """
+    Obtém a importação anterior do mesmo arquivo no mesmo processo.
+
+    Parâmetros:
+    - file_hash (str): Hash do conteúdo do arquivo.
+    - process (Process): O processo da importação.
+    - exclude (ImportJob, opcional): Importação atual, a ser ignorada.
+
+    Retorna:
+    ImportJob | None: A importação mais recente que gerou uma tarefa.
+    """
+    if not file_hash:
+        return None
+    jobs = ImportJob.objects.filter(
+        file_hash=file_hash, process_id=process, task_id__isnull=False
+    ).exclude(status=ImportStatus.FAILED)
+    if exclude is not None:
+        jobs = jobs.exclude(pk=exclude.pk)
+    return jobs.select_related('task_id').order_by('-id').first()
+
+
+def get_merge_task(user, process, previous=None):
+    """
+    Obtém a tarefa em que uma importação no modo `MERGE` é incorporada: a
+    tarefa do mesmo arquivo enviado antes ou, senão, a tarefa mais recente do
+    usuário no processo que ainda tem itens pendentes.
+
+    Retorna:
+    Task | None: A tarefa encontrada.
+    """
+    if previous is not None:
+        return previous.task_id
+    return (
+        Task.objects.filter(
+            user_id=user,
+            process_id=process,
+            item__status__in=[Status.CREATED, Status.STARTED],
+        )
+        .select_related('robot_id')
+        .order_by('-id')
+        .first()
+    )
+
+
+def get_robot_tasks(robot_id):
+    """
+    Tarefas em que um robô trabalha: aquelas de que ele é o robô principal e
+    aquelas em que tem itens atribuídos (divisão dos itens na importação).
+
+    Parâmetros:
+    - robot_id (int): ID do robô.
+
+    Retorna:
+    QuerySet: Tarefas do robô.
+    """
+    return Task.objects.filter(
+        Q(robot_id=robot_id)
+        | Q(id__in=Item.objects.filter(robot_id=robot_id).values('task_id'))
+    )
+
+
+def read_file(file, user, process, job=None, mode=ImportMode.FORCE, file_hash=None):
     """
     Lê um arquivo CSV e cria objetos Item no banco de dados.
 
+    O arquivo é lido em streaming e os itens são inseridos em lotes de
+    `TASK_IMPORT_BATCH_SIZE` (por `insert_items`, via COPY ou bulk_create
+    conforme `TASK_IMPORT_BACKEND`), então a memória usada não depende do tamanho
+    do arquivo. Cada lote é gravado assim que fica completo, o que permite
+    acompanhar o progresso pela importação (`job`) e aos robôs começarem
+    pelos primeiros itens; se a leitura falhar, os itens já gravados (e a
+    tarefa, se foi criada aqui) são removidos.
+
+    Com `TASK_IMPORT_SHARDING`, os itens de cada lote são divididos entre os
+    robôs ativos conforme a carga e a capacidade (`distribute_items`), para
+    que a tarefa seja processada por todos em paralelo; `Task.robot_id` fica
+    como o robô principal (o de menor carga na criação).
+
+    Duplicidades, exceto no modo `FORCE`:
+    - O mesmo arquivo (`file_hash`) já importado no processo: no modo `SKIP`
+      nenhuma linha é inserida; no modo `MERGE` os itens novos vão para a
+      tarefa daquela importação.
+    - OS já pendente (CREATED/STARTED) no processo ou repetida no arquivo: a
+      linha é descartada. A verificação é feita com uma query por lote.
+
     Parâmetros:
     - file (Arquivo): O arquivo CSV a ser lido.
     - user (User): O usuário associado à tarefa.
     - process (Process): O processo associado à tarefa.
+    - job (ImportJob, opcional): Importação em que o progresso é registrado.
+    - mode (ImportMode): Tratamento de duplicidades (SKIP, MERGE ou FORCE).
+    - file_hash (str, opcional): Hash do conteúdo do arquivo (`get_file_hash`).
 
     Retorna:
     bool: Verdadeiro se a operação foi bem-sucedida,
           Falso se um robô não puder ser atribuído.
     """
-    # Obtém o robô com menor carga
-    robot = get_min_robot()
-    task = Task.objects.create(user_id=user, process_id=process, robot_id=robot)
+    batch_size = settings.TASK_IMPORT_BATCH_SIZE
 
-    # Ler o arquivo CSV utilizando DictReader
-    csv_reader = csv.DictReader(file.read().decode('utf-8').splitlines())
+    previous = None
+    if mode != ImportMode.FORCE:
+        previous = get_previous_import(file_hash, process, exclude=job)
+    # Arquivo repetido no modo SKIP: as linhas são só contadas
+    skip_file = mode == ImportMode.SKIP and previous is not None
 
-    # Lista para armazenar os objetos Item a serem criados
-    items_to_create = []
+    task = None
+    if skip_file:
+        task = previous.task_id
+    elif mode == ImportMode.MERGE:
+        task = get_merge_task(user, process, previous)
+    created_task = task is None
+    if created_task:
+        # Robô principal da tarefa: o de menor carga
+        task = Task.objects.create(
+            user_id=user, process_id=process, robot_id=get_least_loaded_robot()
+        )
+    robot = task.robot_id
+    update_import_job(job, task_id=task, status=ImportStatus.PARSING)
 
-    # Iterar sobre as linhas do arquivo CSV e adicionar à lista
-    for row in csv_reader:
-        try:
-            # Extrair o valor da coluna "O.S."
-            os_field = row.get('O.S.')
-            if not os_field:
-                continue
+    rows_processed = 0
+    rows_rejected = 0
+    rows_deduplicated = 0
+    rows_inserted = 0
+    # IDs inseridos por esta importação, removidos se ela falhar (outras
+    # importações podem inserir na mesma tarefa no modo MERGE)
+    inserted_ids = array('q')
 
-            # Dividir a string em número da OS e nome, removendo ponto e vírgula
-            os_field = os_field.rstrip(';')
-            os_number, os_name = os_field.split(' - ', 1)
-            os_number = os_number.strip()
-            os_name = os_name.strip()
-
-            # Criar um objeto Item e associar à tarefa
-            item = Item(
-                task_id=task,
-                robot_id=robot,
-                os_number=os_number,
-                os_name=os_name
+    def get_shards(count):
+        # Itens do lote divididos entre os robôs ativos pela carga e
+        # capacidade; sem robô ativo (ou com a divisão desligada), todos
+        # ficam com o robô principal da tarefa
+        if settings.TASK_IMPORT_SHARDING:
+            shards = distribute_items(count)
+            if shards:
+                return shards
+        return [(robot, count)]
+
+    def flush(items_to_create):
+        nonlocal rows_deduplicated, rows_inserted
+        if skip_file:
+            rows_deduplicated += len(items_to_create)
+            items_to_create = []
+        elif mode != ImportMode.FORCE:
+            pending = get_pending_os_numbers(
+                process, {os_number for os_number, _ in items_to_create}
             )
-            items_to_create.append(item)
+            unique = []
+            for os_number, os_name in items_to_create:
+                if os_number in pending:
+                    rows_deduplicated += 1
+                    continue
+                pending.add(os_number)
+                unique.append((os_number, os_name))
+            items_to_create = unique
+
+        if items_to_create:
+            with transaction.atomic():
+                start = 0
+                for shard_robot, count in get_shards(len(items_to_create)):
+                    inserted_ids.extend(
+                        insert_items(task, shard_robot, items_to_create[start:start + count])
+                    )
+                    start += count
+            notify_items_available('SHIFT')
+            rows_inserted += len(items_to_create)
+        update_import_job(
+            job,
+            status=ImportStatus.INSERTING,
+            rows_processed=rows_processed,
+            rows_rejected=rows_rejected,
+            rows_deduplicated=rows_deduplicated,
+        )
+
+    try:
+        # Ler o arquivo CSV utilizando DictReader
+        csv_reader = csv.DictReader(iter_csv_lines(file))
 
-        except Exception as e:
-            print(f"Erro ao processar linha: {row}. Erro: {e}")
-            continue
+        # Lote de itens (número e nome da OS) a serem criados
+        items_to_create = []
 
-    # Inserir os objetos Item no banco de dados usando bulk_create
-    Item.objects.bulk_create(items_to_create)
+        # Iterar sobre as linhas do arquivo CSV e inserir a cada lote completo
+        for row in csv_reader:
+            rows_processed += 1
+            try:
+                os_field = parse_os_field(row)
+                if not os_field:
+                    rows_rejected += 1
+                    continue
+                items_to_create.append(os_field)
+
+            except Exception as e:
+                logger.warning("Erro ao processar linha: %s. Erro: %s", row, e)
+                rows_rejected += 1
+                continue
 
-    if not robot:
+            if len(items_to_create) >= batch_size:
+                flush(items_to_create)
+                items_to_create = []
+
+        # Inserir o último lote
+        if items_to_create:
+            flush(items_to_create)
+
+    except Exception:
+        if created_task:
+            task.delete()
+        else:
+            for start in range(0, len(inserted_ids), batch_size):
+                delete_items(Item.objects.filter(id__in=inserted_ids[start:start + batch_size].tolist()))
+        raise
+
+    # Nada novo no arquivo: não mantém uma tarefa vazia
+    if created_task and not rows_inserted:
+        task.delete()
+        task = None
+    update_import_job(
+        job,
+        task_id=task,
+        rows_processed=rows_processed,
+        rows_rejected=rows_rejected,
+        rows_deduplicated=rows_deduplicated,
+    )
+
+    if task is not None and not robot:
         return False
     return True
 
 
+def enable_robot_check():
+    """
+    Habilita a tarefa periódica que atribui robôs às tarefas sem robô.
+    """
+    task_check = PeriodicTask.objects.filter(
+        name="check_robots_every_minute"
+    ).first()
+    if task_check:
+        task_check.enabled = True
+        task_check.save()
+
+
+def disable_robot_check():
+    """
+    Desabilita a tarefa periódica que atribui robôs às tarefas sem robô.
+    """
+    task_check = PeriodicTask.objects.filter(
+        name="check_robots_every_minute"
+    ).first()
+    if task_check and task_check.enabled:
+        task_check.enabled = False
+        task_check.save()
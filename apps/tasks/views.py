@@ -1,7 +1,15 @@
 from typing import Any, Dict
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.http import Http404, JsonResponse
 from django.shortcuts import redirect, get_object_or_404
 from django.db.models.query import QuerySet
+from django.views import View
+from django.template.loader import render_to_string
 from django.views.generic import ListView
+from django.views.generic.list import MultipleObjectMixin
+from apps.core.pagination import KeysetPaginationMixin
 from rest_framework.response import Response
 from rest_framework import viewsets, status
 from rest_framework.permissions import IsAuthenticated
@@ -10,14 +18,36 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from drf_yasg.openapi import Parameter, IN_QUERY, TYPE_STRING, TYPE_INTEGER
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
-from .utils import read_file
-from .serializer import TaskSerializer
-from .models import Task
+from apps.api.conditional import versioned_get
+from apps.api.fieldsets import SPARSE_FIELDS_PARAMETERS, get_sparse_fields
+from apps.api.pagination import KeysetPagination
+from .tasks import import_file_task
+from .dashboard import get_cache_stats, get_dashboard_fragments
+from .progress import summarize_tasks
+from .utils import get_file_hash, get_robot_tasks
+from .serializer import (
+    TaskItemsSummarySerializer,
+    TaskProgressSerializer,
+    TaskSerializer,
+    TaskValuesSerializer,
+)
+from .models import ImportJob, Task, TaskProgress
 from apps.robots.models import Robot
 from apps.items.models import Item
+from apps.items.serializer import ItemSerializer, ShiftDataBulkUpsertSerializer
+from apps.values.models import ShiftData
+from apps.values.utils import bulk_upsert_shift_data
 from apps.processes.models import Process
-from rest_framework.exceptions import NotFound
-from django_celery_beat.models import PeriodicTask
+from rest_framework.exceptions import NotFound, ValidationError
+from apps.utils.choices import ImportMode
+
+
+# Campos expostos no endpoint de progresso das importações
+IMPORT_JOB_PROGRESS_FIELDS = (
+    "id", "task_id", "file_name", "mode", "status", "rows_processed",
+    "rows_rejected", "rows_deduplicated", "error_message", "created_at",
+    "started_at", "ended_at",
+)
 
 
 class TaskViewSet(viewsets.ViewSet):
@@ -36,12 +66,42 @@ class TaskViewSet(viewsets.ViewSet):
                 required=False,
                 description="ID da tarefa.",
             ),
+            openapi.Parameter(
+                "cursor",
+                openapi.IN_QUERY,
+                type=openapi.TYPE_STRING,
+                required=False,
+                description="Cursor da próxima página (campo `next` da resposta anterior).",
+            ),
+            openapi.Parameter(
+                "page_size",
+                openapi.IN_QUERY,
+                type=openapi.TYPE_INTEGER,
+                required=False,
+                description="Quantidade de tarefas por página.",
+            ),
+            *SPARSE_FIELDS_PARAMETERS,
         ],
         responses={200: TaskSerializer(many=True)},
-        operation_description="Obter tarefas de um robô específico ou uma tarefa específica pelo ID.",
+        operation_description=(
+            "Obter tarefas de um robô específico ou uma tarefa específica pelo ID. "
+            "São listadas as tarefas de que o robô é o principal ou em que tem itens "
+            "atribuídos, cada uma apenas com os itens do robô. "
+            "Sem `task_id`, a lista é paginada por cursor: `{next, results}`. "
+            "Por padrão cada tarefa traz todos os itens; com `fields` (ex.: "
+            "`fields=id,status,items.id,items.status`) a resposta e as queries "
+            "se limitam aos campos pedidos, e os itens só vêm se forem pedidos."
+        ),
         operation_summary="Listar Tarefas por Robô ou Tarefa Específica",
     )
     @action(detail=True, methods=["get"], url_path="tasks")
+    @versioned_get(
+        lambda request, pk=None: [
+            get_robot_tasks(pk),
+            Item.objects.filter(robot_id=pk),
+            ShiftData.objects.filter(item__robot_id=pk),
+        ]
+    )
     def list_tasks(self, request, pk=None):
         """
         Lista as tarefas associadas a um robô específico ou retorna uma tarefa específica.
@@ -52,24 +112,48 @@ class TaskViewSet(viewsets.ViewSet):
         except Robot.DoesNotExist:
             raise NotFound(detail="Robô não encontrado.")
 
+        # Campos pedidos em ?fields= / ?expand= / ?exclude=
+        fields, nested = get_sparse_fields(
+            request,
+            TaskValuesSerializer.fields,
+            expandable={"items": (ItemSerializer.Meta.fields, True)},
+        )
+        serialize_options = {
+            "fields": fields,
+            "items": "items" in nested,
+            "item_fields": nested.get("items"),
+            "robot_id": robot.id,
+        }
+
         # Obtém o task_id dos parâmetros de query, se fornecido
         task_id = request.query_params.get("task_id")
 
         if task_id:
             # Se task_id for fornecido, retorna apenas a tarefa específica
-            try:
-                task = Task.objects.get(pk=task_id, robot_id=robot.id)
-                serializer = TaskSerializer(task)
-                return Response(serializer.data, status=status.HTTP_200_OK)
-            except Task.DoesNotExist:
+            rows = TaskValuesSerializer.get_values(
+                get_robot_tasks(robot.id).filter(pk=task_id), fields
+            )
+            tasks = TaskValuesSerializer.serialize_rows(rows, **serialize_options)
+            if not tasks:
                 raise NotFound(detail="Tarefa não encontrada para o robô fornecido.")
+            return Response(tasks[0], status=status.HTTP_200_OK)
 
-        # Se task_id não for fornecido, retorna todas as tarefas do robô
-        tasks_with_items = Task.objects.filter(robot_id=robot.id).prefetch_related(
-            "item_set"
+        # Se task_id não for fornecido, retorna as tarefas do robô paginadas.
+        # Leitura via .values(): mesma saída do TaskSerializer, sem montar
+        # instâncias e campos do DRF para cada item. As chaves da paginação
+        # são lidas mesmo quando não fazem parte da resposta
+        paginator = KeysetPagination()
+        rows = paginator.paginate_queryset(
+            TaskValuesSerializer.get_values(
+                get_robot_tasks(robot.id),
+                fields + list(paginator.get_ordering_fields(self)),
+            ),
+            request,
+            view=self,
+        )
+        return paginator.get_paginated_response(
+            TaskValuesSerializer.serialize_rows(rows, **serialize_options)
         )
-        serializer = TaskSerializer(tasks_with_items, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
 
     @swagger_auto_schema(
         request_body=openapi.Schema(
@@ -103,7 +187,13 @@ class TaskViewSet(viewsets.ViewSet):
             ],  # Defina quais campos são obrigatórios, neste caso apenas 'status'
         ),
         responses={200: TaskSerializer()},
-        operation_description="Atualizar uma tarefa específica, incluindo status, horários, resultados e estágio.",
+        operation_description=(
+            "Atualizar uma tarefa específica, incluindo status, horários, resultados e estágio. "
+            "Não é necessário chamar este endpoint para acompanhar os itens: o servidor deriva "
+            "status, `started_at` e `ended_at` da tarefa a cada escrita nos itens (STARTED no "
+            "primeiro item iniciado; COMPLETED/ERROR quando todos os itens chegam à etapa COMPLETED "
+            "ou terminam em erro)."
+        ),
         operation_summary="Atualizar Tarefa",
     )
     @action(detail=True, methods=["patch"], url_path="update-task")
@@ -122,8 +212,154 @@ class TaskViewSet(viewsets.ViewSet):
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @swagger_auto_schema(
+        responses={200: TaskProgressSerializer()},
+        operation_description=(
+            "Contadores de itens da tarefa (total, por status e por etapa), "
+            "mantidos a cada escrita nos itens, sem contar os itens."
+        ),
+        operation_summary="Progresso da Tarefa",
+    )
+    @action(detail=True, methods=["get"], url_path="progress")
+    def progress(self, request, pk=None):
+        """
+        Retorna os contadores de itens de uma tarefa.
+        """
+        if not Task.objects.filter(pk=pk).exists():
+            raise NotFound(detail="Tarefa não encontrada.")
+        progress = TaskProgress.objects.filter(task_id=pk).first() or TaskProgress(task_id=pk)
+        return Response(TaskProgressSerializer(progress).data, status=status.HTTP_200_OK)
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                "ids",
+                openapi.IN_QUERY,
+                type=openapi.TYPE_STRING,
+                required=False,
+                description="IDs das tarefas, separados por vírgula.",
+            ),
+            openapi.Parameter(
+                "robot_id",
+                openapi.IN_QUERY,
+                type=openapi.TYPE_INTEGER,
+                required=False,
+                description="Resumir as tarefas deste robô.",
+            ),
+            openapi.Parameter(
+                "user_id",
+                openapi.IN_QUERY,
+                type=openapi.TYPE_INTEGER,
+                required=False,
+                description="Resumir as tarefas deste usuário.",
+            ),
+        ],
+        responses={200: TaskItemsSummarySerializer(many=True)},
+        operation_description=(
+            "Resumo dos itens por tarefa: quantidade por status e por etapa, "
+            "idade do item pendente mais antigo e duração média dos itens, "
+            "calculados em uma única query. Informe ao menos um filtro; os "
+            "filtros se combinam. São retornadas as tarefas mais recentes, até "
+            "`TASK_SUMMARY_MAX_TASKS`."
+        ),
+        operation_summary="Resumo das Tarefas",
+    )
+    @action(detail=False, methods=["get"], url_path="summary")
+    def summary(self, request):
+        """
+        Retorna o resumo dos itens das tarefas filtradas.
+        """
+        filters = {}
+        try:
+            ids = request.query_params.get("ids")
+            if ids is not None:
+                filters["id__in"] = [int(pk) for pk in ids.split(",") if pk.strip()]
+            for name in ("robot_id", "user_id"):
+                if request.query_params.get(name):
+                    filters[name] = int(request.query_params[name])
+        except ValueError:
+            raise ValidationError({"detail": "Os filtros devem ser IDs numéricos."})
+
+        if not filters:
+            raise ValidationError(
+                {"detail": "Informe ao menos um filtro: ids, robot_id ou user_id."}
+            )
+        if len(filters.get("id__in", ())) > settings.TASK_SUMMARY_MAX_TASKS:
+            raise ValidationError(
+                {"detail": f"Máximo de {settings.TASK_SUMMARY_MAX_TASKS} tarefas por chamada."}
+            )
 
-class DashboardListView(LoginRequiredMixin, ListView):
+        tasks = Task.objects.filter(**filters).order_by("-id")[: settings.TASK_SUMMARY_MAX_TASKS]
+        return Response(summarize_tasks(tasks), status=status.HTTP_200_OK)
+
+    @swagger_auto_schema(
+        request_body=ShiftDataBulkUpsertSerializer(many=True),
+        operation_description=(
+            "Cria ou atualiza o ShiftData de vários itens da tarefa em uma "
+            "única chamada. Cada entrada traz o `item` (ID) e os campos do "
+            "ShiftData; o resultado informa, por item, se foi criado, "
+            "atualizado ou rejeitado."
+        ),
+        operation_summary="Upsert de ShiftData em Lote por Tarefa",
+    )
+    @action(detail=True, methods=["post"], url_path="shift-data")
+    def bulk_upsert_shift_data(self, request, pk=None):
+        """
+        Upsert em lote do ShiftData dos itens de uma tarefa.
+        """
+        try:
+            task = Task.objects.get(pk=pk)
+        except Task.DoesNotExist:
+            raise NotFound(detail="Tarefa não encontrada.")
+
+        entries = request.data
+        if isinstance(entries, dict):
+            entries = entries.get("items")
+        if not isinstance(entries, list) or not entries:
+            return Response(
+                {"detail": "Envie uma lista de ShiftData para atualizar."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(entries) > settings.SHIFT_DATA_BULK_MAX:
+            return Response(
+                {"detail": f"Máximo de {settings.SHIFT_DATA_BULK_MAX} itens por chamada."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        results = []
+        valid_rows = {}
+        for entry in entries:
+            serializer = ShiftDataBulkUpsertSerializer(data=entry)
+            if not serializer.is_valid():
+                results.append({
+                    "item": entry.get("item") if isinstance(entry, dict) else None,
+                    "result": "invalid",
+                    "errors": serializer.errors,
+                })
+                continue
+            item_id = serializer.validated_data["item"]
+            if item_id in valid_rows:
+                # A última ocorrência do item no lote prevalece
+                for result in results:
+                    if result["item"] == item_id and "result" not in result:
+                        result.update(result="invalid", errors={"item": ["Item duplicado no lote."]})
+            valid_rows[item_id] = serializer.validated_data
+            results.append({"item": item_id})
+
+        task_item_ids = set(
+            Item.objects.filter(task_id=task, id__in=valid_rows).values_list("id", flat=True)
+        )
+        rows = [row for item_id, row in valid_rows.items() if item_id in task_item_ids]
+        applied = bulk_upsert_shift_data(task, rows) if rows else {}
+
+        for result in results:
+            if "result" not in result:
+                result["result"] = applied.get(result["item"], "not_found")
+
+        return Response(results, status=status.HTTP_200_OK)
+
+
+class DashboardListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     """
     View da lista de tarefas do usuário.
 
@@ -139,39 +375,79 @@ class DashboardListView(LoginRequiredMixin, ListView):
 
     def get_queryset(self) -> QuerySet[Any]:
         """
-        Obtém o conjunto de tarefas associadas ao usuário e as ordena pelo ID de forma decrescente.
+        Obtém o conjunto de tarefas associadas ao usuário. A ordenação (ID decrescente) e a
+        página são aplicadas pela paginação por cursor.
 
         Retorna:
         - QuerySet: Conjunto de tarefas associadas ao usuário.
         """
         user = self.request.user
-        paginate_by = int(self.request.GET.get("paginate_by", self.paginate_by))
-        self.paginate_by = paginate_by
-        return Task.objects.filter(user_id=user).order_by("-id")
+        return (
+            Task.objects.filter(user_id=user)
+            .select_related("progress", "process_id", "robot_id__user_id")
+            .order_by("-id")
+        )
 
     def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
         """
         Obtém os dados de contexto para o template.
 
+        A tabela de tarefas (já renderizada), os contadores e os processos vêm
+        do cache do dashboard, por usuário e página; as escritas em tarefas,
+        itens, robôs e processos invalidam o cache (`apps.tasks.signals`).
+
         Retorna:
         - Dict[str, Any]: Dados de contexto para o template.
         """
-        total_items = Item.objects.filter(task_id__user_id=self.request.user).count()
-        available_robots = Robot.objects.filter(status="ACTIVE").count()
-        context = super().get_context_data(**kwargs)
-        context["paginate_by"] = self.paginate_by
-        context["available_robots"] = available_robots
+        user_id = self.request.user.id
+        paginate_by = self.get_paginate_by()
+
+        def build_tasks():
+            context = super(DashboardListView, self).get_context_data(**kwargs)
+            context["paginate_by"] = paginate_by
+            return {
+                "tasks_loaded": len(context["object_list"]),
+                "tasks_table": render_to_string(
+                    "includes/tasks_table.html", context, request=self.request
+                ),
+                "total_items": TaskProgress.objects.filter(
+                    task__user_id=user_id
+                ).aggregate(total=Sum("total"))["total"] or 0,
+            }
+
+        def build_shared():
+            return {
+                "available_robots": Robot.objects.filter(status="ACTIVE").count(),
+                "processes": list(Process.objects.values("id", "title", "enabled")),
+            }
+
+        # Uma entrada por página do usuário e uma comum a todos os usuários
+        page_key = f"tasks:{self.get_cursor_key()}"
+        fragments = get_dashboard_fragments(
+            user_id,
+            {page_key: build_tasks, "shared": build_shared},
+            shared=("shared",),
+        )
+
+        # Sem paginar o queryset: a página já vem renderizada do cache
+        context = super(MultipleObjectMixin, self).get_context_data(**kwargs)
+        context.update(fragments[page_key])
+        context.update(fragments["shared"])
+        context["paginate_by"] = paginate_by
         context["segment"] = "tasks"
-        context["processes"] = Process.objects.all()
-        context["total_items"] = total_items
+        context["import_jobs"] = ImportJob.objects.filter(
+            user_id=self.request.user
+        ).order_by("-id")[:5]
         return context
 
     def post(self, request, *args, **kwargs):
         """
         Processa uma solicitação POST para criar uma nova tarefa.
 
-        Esta função trata do upload de um arquivo CSV, cria uma nova tarefa associada ao usuário e ao processo selecionado,
-        e atribui um robô para a tarefa se possível. Se nenhum robô estiver disponível, habilita a verificação de robôs.
+        Esta função trata do upload de um arquivo CSV: salva o arquivo no storage e agenda uma importação
+        (`ImportJob`) no Celery, que cria a tarefa, atribui um robô se possível e insere os itens. A
+        resposta não espera a importação; o dashboard acompanha o progresso. O campo `import_mode`
+        define o tratamento de duplicidades (SKIP, MERGE ou FORCE; padrão SKIP).
 
         Retorna:
         - HttpResponse: Redireciona para a página de tarefas após o processamento.
@@ -188,17 +464,61 @@ class DashboardListView(LoginRequiredMixin, ListView):
             # Retorne uma resposta de erro caso o arquivo não seja fornecido
             return redirect("tasks")
 
-        # Processa o arquivo
-        assigned_robot = read_file(file, request.user, process)
+        mode = request.POST.get("import_mode", ImportMode.SKIP)
+        if mode not in ImportMode.values:
+            mode = ImportMode.SKIP
 
-        # Se não houver robô disponível, habilita a tarefa periódica
-        if not assigned_robot:
-            task_check = PeriodicTask.objects.filter(
-                name="check_robots_every_minute"
-            ).first()
-            if task_check:
-                task_check.enabled = True
-                task_check.save()
+        # Salva o arquivo e agenda a importação em segundo plano
+        job = ImportJob.objects.create(
+            user_id=request.user,
+            process_id=process,
+            file=file,
+            file_name=file.name,
+            file_hash=get_file_hash(file),
+            mode=mode,
+        )
+        transaction.on_commit(lambda: import_file_task.delay(job.id))
 
-        # Redireciona para a página de tarefas após o processamento
+        # Redireciona para a página de tarefas, que acompanha a importação
         return redirect("tasks")
+
+
+class ImportJobProgressView(LoginRequiredMixin, View):
+    """
+    Progresso de uma importação de arquivo, consultado periodicamente pelo dashboard.
+
+    Requer que o usuário esteja autenticado e seja o dono da importação.
+    """
+
+    login_url = "login"
+
+    def get(self, request, pk):
+        """
+        Retorna o estado e os contadores de linhas da importação em JSON.
+        """
+        job = (
+            ImportJob.objects.filter(pk=pk, user_id=request.user)
+            .values(*IMPORT_JOB_PROGRESS_FIELDS)
+            .first()
+        )
+        if job is None:
+            raise Http404
+        return JsonResponse(job)
+
+
+class DashboardCacheStatsView(LoginRequiredMixin, View):
+    """
+    Acertos e falhas do cache do dashboard, para acompanhar se ele é útil.
+
+    Requer que o usuário esteja autenticado e seja da equipe (staff).
+    """
+
+    login_url = "login"
+
+    def get(self, request):
+        """
+        Retorna os contadores do cache em JSON.
+        """
+        if not request.user.is_staff:
+            raise Http404
+        return JsonResponse(get_cache_stats())
@@ -29,3 +29,23 @@ class Platform(TextChoices):
     POWER_AUTOMATE = 'POWER_AUTOMATE'
     PYTHON = 'PYTHON'
     OTHER = 'OTHER'
+
+
+class ImportStatus(TextChoices):
+    """
+    Definition of status options for task import jobs.
+    """
+    QUEUED = 'QUEUED'
+    PARSING = 'PARSING'
+    INSERTING = 'INSERTING'
+    DONE = 'DONE'
+    FAILED = 'FAILED'
+
+
+class ImportMode(TextChoices):
+    """
+    Definition of duplicate handling options for task import jobs.
+    """
+    SKIP = 'SKIP'
+    MERGE = 'MERGE'
+    FORCE = 'FORCE'
@@ -1,6 +1,52 @@
-from drf_yasg.inspectors import SwaggerAutoSchema
+from collections import OrderedDict
+
+from drf_yasg import openapi
+from drf_yasg.app_settings import swagger_settings
+from drf_yasg.inspectors import NotHandled, PaginatorInspector, SwaggerAutoSchema
+
+from apps.api.pagination import KeysetPagination
+
+
+class KeysetPaginationInspector(PaginatorInspector):
+    """
+    Documenta os parâmetros (`cursor`, `page_size`) e o envelope
+    (`next`, `results`) da KeysetPagination.
+    """
+
+    def get_paginator_parameters(self, paginator):
+        if not isinstance(paginator, KeysetPagination):
+            return NotHandled
+        return [
+            openapi.Parameter(
+                paginator.cursor_query_param,
+                openapi.IN_QUERY,
+                description='Cursor da próxima página (campo `next` da resposta anterior).',
+                type=openapi.TYPE_STRING,
+            ),
+            openapi.Parameter(
+                paginator.page_size_query_param,
+                openapi.IN_QUERY,
+                description=f'Itens por página (máximo {paginator.max_page_size}).',
+                type=openapi.TYPE_INTEGER,
+            ),
+        ]
+
+    def get_paginated_response(self, paginator, response_schema):
+        if not isinstance(paginator, KeysetPagination):
+            return NotHandled
+        return openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties=OrderedDict((
+                ('next', openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_URI, x_nullable=True)),
+                ('results', response_schema),
+            )),
+            required=['results'],
+        )
+
 
 class CustomSwaggerAutoSchema(SwaggerAutoSchema):
+    paginator_inspectors = [KeysetPaginationInspector] + swagger_settings.DEFAULT_PAGINATOR_INSPECTORS
+
     def get_tags(self, operation_keys=None):
         tags = super().get_tags(operation_keys)
         
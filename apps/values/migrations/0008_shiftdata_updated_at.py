@@ -0,0 +1,18 @@
+# Generated by Django 4.2.4 on 2026-10-18 06:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('values', '0007_alter_shiftdata_unique_together'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shiftdata',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
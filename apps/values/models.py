@@ -48,6 +48,7 @@ class ShiftData(models.Model):
     stage = models.CharField(max_length=50, blank=True, null=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"ShiftData para Task {self.task.id}, Item {self.item.id}"
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from apps.api.values_serializers import ValuesSerializer
 from .models import ShiftData
 
 
@@ -12,4 +13,21 @@ class ShiftDataSerializer(serializers.ModelSerializer):
 class ShiftDataMiniSerializer(serializers.ModelSerializer):
     class Meta:
         model = ShiftData
-        fields = ["recipiente"]
\ No newline at end of file
+        fields = ["recipiente"]
+
+
+class ShiftDataValuesSerializer(ValuesSerializer):
+    """
+    Versão somente leitura do ShiftDataSerializer a partir de `.values()`.
+    Mesma ordem de campos do `fields = '__all__'` do DRF.
+    """
+    model = ShiftData
+    fields = (
+        ['id']
+        + [
+            field.name
+            for field in ShiftData._meta.concrete_fields
+            if not field.primary_key and not field.is_relation
+        ]
+        + ['task', 'item']
+    )
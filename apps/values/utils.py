@@ -0,0 +1,50 @@
+from collections import defaultdict
+
+from django.db import transaction
+
+from apps.values.models import ShiftData
+
+
+def bulk_upsert_shift_data(task, rows):
+    """
+    Cria ou atualiza o ShiftData de vários itens de uma tarefa.
+
+    Usa `bulk_create(update_conflicts=True)` sobre a restrição única de
+    `item`, ou seja, um único INSERT ... ON CONFLICT DO UPDATE por conjunto
+    de campos enviados. Linhas com campos diferentes são agrupadas para que
+    campos não enviados não sejam sobrescritos, como no upsert individual.
+
+    Parâmetros:
+    - task (Task): Tarefa dona dos itens.
+    - rows (List[dict]): Dados validados, cada um com `item` (ID do item).
+
+    Retorna:
+    Dict[int, str]: Resultado por ID do item ('created' ou 'updated').
+    """
+    item_ids = [row['item'] for row in rows]
+    existing = set(
+        ShiftData.objects.filter(item_id__in=item_ids).values_list(
+            'item_id', flat=True
+        )
+    )
+
+    groups = defaultdict(list)
+    for row in rows:
+        data = dict(row)
+        item_id = data.pop('item')
+        fields = tuple(sorted(data))
+        groups[fields].append(ShiftData(task=task, item_id=item_id, **data))
+
+    with transaction.atomic():
+        for fields, objs in groups.items():
+            ShiftData.objects.bulk_create(
+                objs,
+                update_conflicts=True,
+                unique_fields=['item'],
+                update_fields=['task', 'updated_at', *fields],
+            )
+
+    return {
+        item_id: 'updated' if item_id in existing else 'created'
+        for item_id in item_ids
+    }
@@ -13,9 +13,8 @@ class ShiftDataViewSet(viewsets.ModelViewSet):
     serializer_class = ShiftDataSerializer
 
     @swagger_auto_schema(
-        operation_description="Listar todos os registros de ShiftData.",
+        operation_description="Listar os registros de ShiftData, paginados por cursor.",
         operation_summary="Lista todos os ShiftData",
-        responses={200: ShiftDataSerializer(many=True)},
     )
     def list(self, request, *args, **kwargs):
         """
@@ -6,7 +6,10 @@ bind = "0.0.0.0:8000"
 # Número de workers (geralmente 2-4 workers por CPU)
 workers = multiprocessing.cpu_count() * 2 + 1
 
-# Worker class (default é sync, mas pode usar gevent, eventlet etc.)
+# Worker class (default é sync, mas pode usar gevent, eventlet etc.).
+# Com sync, cada long-poll de `items/wait/` ocupa um worker: a quantidade de
+# esperas simultâneas é limitada por ITEM_WAIT_MAX_CONCURRENT, que deve ficar
+# abaixo de `workers`
 worker_class = "sync"
 
 # Logging